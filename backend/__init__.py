@@ -0,0 +1,4 @@
+# Module-level settings are read from the environment at import, so .env goes in first
+from backend.env import load_env
+
+load_env()
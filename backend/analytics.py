@@ -0,0 +1,221 @@
+"""
+Score analytics from precomputed rollups.
+
+session_rollups holds one row per (day, role, domain, mode) with the number of scored
+sessions, their score sum and sum of squares. Flush hooks fold every sessions insert,
+score update and delete into those rows with an upsert in the same transaction,
+so the request path, the write-behind buffer and interview answers all keep them current.
+The /analytics endpoints read rollup rows only: cost grows with the number of buckets,
+not sessions.
+
+Rebuild the rollups from the sessions table (first deploy, or after bulk loads that
+bypassed the ORM):
+
+    python -m backend.analytics backfill
+"""
+import argparse
+import datetime
+import math
+import os
+import time
+from collections import defaultdict
+
+from sqlalchemy import Date, cast, delete, event, func, insert, inspect, literal, select, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from backend.models import InterviewSession, SessionRollup, engine
+
+ANALYTICS_ROLLUPS = os.getenv("ANALYTICS_ROLLUPS", "1").lower() in ("1", "true", "yes")
+
+DIMENSIONS = ("role", "domain", "mode")
+UNKNOWN = "Unknown"
+
+
+def rollup_key(row):
+    created_at = row.created_at or datetime.datetime.utcnow()
+    return (created_at.date(), row.role or UNKNOWN, row.domain or UNKNOWN, row.mode or UNKNOWN)
+
+
+def _add(deltas, key, score, sign):
+    if score is None:
+        return
+    entry = deltas[key]
+    entry[0] += sign
+    entry[1] += sign * score
+    entry[2] += sign * score * score
+
+
+def _old_score(session, row, history):
+    """The score a re-scored row had in the database, also when it was expired before being set."""
+    if history.deleted:
+        return history.deleted[0]
+    if inspect(row).has_identity:
+        with session.no_autoflush:
+            return session.execute(select(InterviewSession.score).where(InterviewSession.id == row.id)).scalar()
+    return None
+
+
+def collect_deltas(session):
+    """
+    Rollup changes implied by the sessions rows this flush will insert, re-score or delete.
+    Runs before the flush, while deleted rows and old scores can still be read.
+    """
+    deltas = defaultdict(lambda: [0, 0.0, 0.0])
+    for row in session.new:
+        if isinstance(row, InterviewSession):
+            _add(deltas, rollup_key(row), row.score, +1)
+    for row in session.deleted:
+        if isinstance(row, InterviewSession):
+            _add(deltas, rollup_key(row), row.score, -1)
+    for row in session.dirty:
+        if not isinstance(row, InterviewSession) or row in session.deleted:
+            continue
+        history = inspect(row).attrs.score.history
+        if history.added:
+            _add(deltas, rollup_key(row), _old_score(session, row, history), -1)
+            _add(deltas, rollup_key(row), history.added[0], +1)
+    # a re-score (or a delete and insert in one bucket) leaves n alone but changes the sums
+    return {key: entry for key, entry in deltas.items() if any(entry)}
+
+
+def upsert_statement(dialect_insert):
+    stmt = dialect_insert(SessionRollup)
+    return stmt.on_conflict_do_update(
+        index_elements=["day", *DIMENSIONS],
+        set_={
+            "n": SessionRollup.n + stmt.excluded.n,
+            "score_sum": SessionRollup.score_sum + stmt.excluded.score_sum,
+            "score_sq_sum": SessionRollup.score_sq_sum + stmt.excluded.score_sq_sum,
+        },
+    )
+
+
+# Built once so the compiled form is reused from SQLAlchemy's statement cache
+UPSERTS = {"sqlite": upsert_statement(sqlite.insert), "postgresql": upsert_statement(postgresql.insert)}
+
+
+def apply_deltas(conn, deltas):
+    """Add deltas to their rollup rows with INSERT ... ON CONFLICT DO UPDATE."""
+    rows = [{"day": day, "role": role, "domain": domain, "mode": mode,
+             "n": n, "score_sum": score_sum, "score_sq_sum": score_sq_sum}
+            for (day, role, domain, mode), (n, score_sum, score_sq_sum) in sorted(deltas.items())]
+    upsert = UPSERTS.get(conn.dialect.name)
+    if upsert is not None:
+        conn.execute(upsert, rows)
+        return
+    # no upsert syntax: update, and insert the buckets that don't exist yet
+    for row in rows:
+        result = conn.execute(
+            update(SessionRollup)
+            .where(*(getattr(SessionRollup, name) == row[name] for name in ("day",) + DIMENSIONS))
+            .values(n=SessionRollup.n + row["n"], score_sum=SessionRollup.score_sum + row["score_sum"],
+                    score_sq_sum=SessionRollup.score_sq_sum + row["score_sq_sum"]))
+        if result.rowcount == 0:
+            conn.execute(insert(SessionRollup).values(**row))
+
+
+@event.listens_for(Session, "before_flush")
+def collect_rollup_deltas(session, flush_context, instances):
+    if ANALYTICS_ROLLUPS:
+        session.info["rollup_deltas"] = collect_deltas(session)
+
+
+@event.listens_for(Session, "after_flush")
+def update_rollups(session, flush_context):
+    deltas = session.info.pop("rollup_deltas", None)
+    if deltas:
+        apply_deltas(session.connection(), deltas)
+
+
+# ----------------- Queries -----------------
+def rollup_filters(role=None, domain=None, mode=None, start=None, end=None):
+    filters = []
+    for name, value in (("role", role), ("domain", domain), ("mode", mode)):
+        if value is not None:
+            filters.append(getattr(SessionRollup, name) == value)
+    if start is not None:
+        filters.append(SessionRollup.day >= start)
+    if end is not None:
+        filters.append(SessionRollup.day <= end)
+    return filters
+
+
+def stats(n, score_sum, score_sq_sum):
+    """Count, mean and sample standard deviation from the running sums."""
+    if not n:
+        return {"count": 0, "avg_score": None, "stddev": None}
+    mean = score_sum / n
+    variance = (score_sq_sum - score_sum * mean) / (n - 1) if n > 1 else 0.0
+    return {"count": n, "avg_score": round(mean, 3), "stddev": round(math.sqrt(max(variance, 0.0)), 3)}
+
+
+def period_start(day, bucket):
+    if bucket == "week":
+        return day - datetime.timedelta(days=day.weekday())  # Monday
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+async def trend(db, bucket="day", **filters):
+    """Score statistics per day, week or month, oldest first."""
+    stmt = (select(SessionRollup.day, func.sum(SessionRollup.n), func.sum(SessionRollup.score_sum),
+                   func.sum(SessionRollup.score_sq_sum))
+            .where(*rollup_filters(**filters))
+            .group_by(SessionRollup.day)
+            .order_by(SessionRollup.day))
+    periods = {}
+    for day, n, score_sum, score_sq_sum in (await db.execute(stmt)).all():
+        totals = periods.setdefault(period_start(day, bucket), [0, 0.0, 0.0])
+        totals[0] += n
+        totals[1] += score_sum
+        totals[2] += score_sq_sum
+    return [{"period": period.isoformat(), **stats(*totals)} for period, totals in periods.items()]
+
+
+async def breakdown(db, by="domain", order="asc", limit=None, **filters):
+    """Score statistics per role, domain or mode; lowest average first by default (weakest areas)."""
+    column = getattr(SessionRollup, by)
+    stmt = (select(column, func.sum(SessionRollup.n), func.sum(SessionRollup.score_sum),
+                   func.sum(SessionRollup.score_sq_sum))
+            .where(*rollup_filters(**filters))
+            .group_by(column))
+    groups = [{by: value, **stats(n, score_sum, score_sq_sum)}
+              for value, n, score_sum, score_sq_sum in (await db.execute(stmt)).all() if n]
+    groups.sort(key=lambda group: group["avg_score"], reverse=(order == "desc"))
+    return groups[:limit] if limit else groups
+
+
+# ----------------- Backfill -----------------
+def backfill(bind=engine):
+    """Rebuild session_rollups from the sessions table in one transaction. Returns the bucket count."""
+    day = (func.date(InterviewSession.created_at) if bind.dialect.name == "sqlite"
+           else cast(InterviewSession.created_at, Date))
+    dimensions = [func.coalesce(getattr(InterviewSession, name), literal(UNKNOWN)) for name in DIMENSIONS]
+    source = (select(day, *dimensions, func.count(InterviewSession.score), func.sum(InterviewSession.score),
+                     func.sum(InterviewSession.score * InterviewSession.score))
+              .where(InterviewSession.score.is_not(None))
+              .group_by(day, *dimensions))
+    with bind.begin() as conn:
+        if bind.dialect.name == "postgresql":
+            # hold off concurrent inserts so none are counted twice or missed
+            conn.execute(text("LOCK TABLE sessions IN SHARE MODE"))
+        conn.execute(delete(SessionRollup))
+        conn.execute(insert(SessionRollup).from_select(
+            ["day", *DIMENSIONS, "n", "score_sum", "score_sq_sum"], source))
+        return conn.execute(select(func.count()).select_from(SessionRollup)).scalar_one()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["backfill"])
+    parser.parse_args()
+
+    started = time.perf_counter()
+    buckets = backfill()
+    print(f"Rebuilt {buckets} rollup buckets in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
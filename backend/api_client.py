@@ -0,0 +1,91 @@
+"""
+HTTP client the Streamlit frontend uses to call this backend.
+
+One requests.Session per Streamlit server process (main.py caches it with
+st.cache_resource), so calls reuse keep-alive connections from a bounded pool
+instead of opening a connection per click. Every call has connect/read timeouts;
+connection failures and 502/503/504 (honouring Retry-After) are retried with
+backoff. Evaluations can be submitted to a small thread pool so the script thread
+doesn't block on the LLM: submit() returns a Future that a later rerun collects.
+
+Kept free of database/LLM imports, like backend/schemas.py.
+"""
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+BACKEND_URL = os.getenv("BACKEND_URL", "http://127.0.0.1:8000").rstrip("/")
+BACKEND_CONNECT_TIMEOUT = float(os.getenv("BACKEND_CONNECT_TIMEOUT", "3"))
+BACKEND_READ_TIMEOUT = float(os.getenv("BACKEND_READ_TIMEOUT", "120"))  # evaluations wait on the LLM
+BACKEND_RETRIES = int(os.getenv("BACKEND_RETRIES", "3"))
+BACKEND_POOL_SIZE = int(os.getenv("BACKEND_POOL_SIZE", "10"))
+BACKEND_WORKERS = int(os.getenv("BACKEND_WORKERS", "4"))  # background evaluations in flight
+
+
+class BackendClient:
+    def __init__(self, base_url=BACKEND_URL, connect_timeout=BACKEND_CONNECT_TIMEOUT,
+                 read_timeout=BACKEND_READ_TIMEOUT, retries=BACKEND_RETRIES, pool_size=BACKEND_POOL_SIZE,
+                 workers=BACKEND_WORKERS):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        # Connection errors are retried for every method (nothing reached the server);
+        # 5xx responses only for requests that are safe to repeat. PATCHing an answer
+        # replaces it, so it is; POST /interviews and /evaluate (which stores a row) are not.
+        retry = Retry(
+            total=retries,
+            read=0,
+            backoff_factor=0.3,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET", "PATCH"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="backend-client")
+
+    def request(self, method, path, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        resp = self.session.request(method, self.base_url + path, **kwargs)
+        resp.raise_for_status()
+        return resp
+
+    def start_interview(self, role, domain, mode, n):
+        return self.request("POST", "/interviews",
+                            json={"role": role, "domain": domain, "mode": mode, "n": n}).json()
+
+    def get_interview(self, interview_id):
+        return self.request("GET", f"/interviews/{interview_id}").json()
+
+    def answer(self, interview_id, index, answer="", skip=False):
+        """Evaluate and store an interview answer; returns {"index", "eval", "summary"}."""
+        return self.request("PATCH", f"/interviews/{interview_id}/answers/{index}",
+                            json={"answer": answer, "skip": skip}).json()
+
+    def evaluate(self, question, answer, mode, role="Unknown", domain="Unknown"):
+        """Stand-alone evaluation (no interview on the backend); returns {"eval": ...}."""
+        return self.request("POST", "/evaluate", json={"question": question, "answer": answer, "mode": mode,
+                                                       "role": role, "domain": domain}).json()
+
+    def stream(self, method, path, payload):
+        """Yield (event, data) pairs from a server-sent events endpoint."""
+        event = None
+        with self.request(method, path, json=payload, stream=True) as resp:
+            for line in resp.iter_lines(decode_unicode=True):
+                if line.startswith("event: "):
+                    event = line[len("event: "):]
+                elif line.startswith("data: "):
+                    yield event, json.loads(line[len("data: "):])
+
+    def submit(self, fn, *args, **kwargs):
+        """Run one of the calls above on the background pool; returns a concurrent.futures.Future."""
+        return self.executor.submit(fn, *args, **kwargs)
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
@@ -0,0 +1,166 @@
+import asyncio
+import datetime
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+
+from sqlalchemy import delete, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+
+from backend.models import AsyncSessionLocal, EvaluationCacheEntry
+from backend.shared_state import get_state
+
+EVAL_CACHE_SIZE = int(os.getenv("EVAL_CACHE_SIZE", "2048"))
+EVAL_CACHE_TTL = float(os.getenv("EVAL_CACHE_TTL", "3600"))  # seconds, in-process tier
+EVAL_CACHE_PERSIST = os.getenv("EVAL_CACHE_PERSIST", "0").lower() in ("1", "true", "yes")
+EVAL_CACHE_PERSIST_TTL = float(os.getenv("EVAL_CACHE_PERSIST_TTL", str(7 * 24 * 3600)))
+
+
+def upsert_statement(dialect_insert):
+    stmt = dialect_insert(EvaluationCacheEntry)
+    return stmt.on_conflict_do_update(index_elements=["key"], set_={
+        "result": stmt.excluded.result, "created_at": stmt.excluded.created_at})
+
+
+# concurrent identical evaluations all store the same key: INSERT ... ON CONFLICT, not merge()
+UPSERTS = {"sqlite": upsert_statement(sqlite.insert), "postgresql": upsert_statement(postgresql.insert)}
+
+
+def normalize(text):
+    """Collapse whitespace and case so trivially different submissions share a key."""
+    return " ".join(str(text or "").split()).casefold()
+
+
+def make_key(question, answer, mode, model, prompt_version):
+    parts = [normalize(question), normalize(answer), normalize(mode), model, str(prompt_version)]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class EvaluationCache:
+    """
+    Content-addressed cache for LLM evaluations.
+    In-process LRU with TTL, then the shared state backend when one is configured
+    (results one worker computed are hits in the others, for the same TTL), optionally
+    backed by the evaluation_cache table so results survive restarts.
+    """
+
+    def __init__(self, maxsize=EVAL_CACHE_SIZE, ttl=EVAL_CACHE_TTL,
+                 persist=EVAL_CACHE_PERSIST, persist_ttl=EVAL_CACHE_PERSIST_TTL, state=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.persist = persist
+        self.persist_ttl = persist_ttl
+        self._state = state
+        self._entries = OrderedDict()  # key -> (expires_at, result)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.shared_hits = 0
+        self.persistent_hits = 0
+
+    @property
+    def state(self):
+        """The shared state backend, or None when state is process-local."""
+        if self._state is None:
+            self._state = get_state()
+        return self._state if self._state.shared else None
+
+    async def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, result = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return dict(result)
+            del self._entries[key]
+            self.expirations += 1
+
+        if self.state is not None:
+            raw = await asyncio.to_thread(self.state.get, f"eval:{key}")
+            if raw is not None:
+                result = json.loads(raw)
+                self._remember(key, result)
+                self.hits += 1
+                self.shared_hits += 1
+                return dict(result)
+
+        if self.persist:
+            result = await self._load(key)
+            if result is not None:
+                self._remember(key, result)
+                self.hits += 1
+                self.persistent_hits += 1
+                return dict(result)
+
+        self.misses += 1
+        return None
+
+    async def set(self, key, result):
+        self._remember(key, result)
+        if self.state is not None:
+            await asyncio.to_thread(self.state.set, f"eval:{key}", json.dumps(result), self.ttl)
+        if self.persist:
+            await self._store(key, result)
+
+    def _remember(self, key, result):
+        self._entries[key] = (time.monotonic() + self.ttl, dict(result))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def _store(self, key, result):
+        row = {"key": key, "result": json.dumps(result), "created_at": datetime.datetime.utcnow()}
+        async with AsyncSessionLocal() as db:
+            upsert = UPSERTS.get(db.bind.dialect.name)
+            if upsert is not None:
+                await db.execute(upsert, [row])
+                await db.commit()
+                return
+            # no upsert syntax: insert, and overwrite if another writer got there first
+            try:
+                db.add(EvaluationCacheEntry(**row))
+                await db.commit()
+            except IntegrityError:
+                await db.rollback()
+                await db.execute(update(EvaluationCacheEntry).where(EvaluationCacheEntry.key == key)
+                                 .values(result=row["result"], created_at=row["created_at"]))
+                await db.commit()
+
+    async def _load(self, key):
+        async with AsyncSessionLocal() as db:
+            entry = await db.get(EvaluationCacheEntry, key)
+            if entry is None:
+                return None
+            if entry.created_at < datetime.datetime.utcnow() - datetime.timedelta(seconds=self.persist_ttl):
+                await db.execute(delete(EvaluationCacheEntry).where(EvaluationCacheEntry.key == key))
+                await db.commit()
+                return None
+            return json.loads(entry.result)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "persist": self.persist,
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "persistent_hits": self.persistent_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+evaluation_cache = EvaluationCache()
@@ -0,0 +1,22 @@
+"""
+Configuration from .env files (backend/.env, then ./.env), read once per deployment.
+
+backend/serve.py reads them before starting the workers, which inherit the environment
+and skip the files; any other entry point (uvicorn backend.main:app, the CLIs, the
+frontend) reads them when the backend package is first imported. Variables already
+set in the environment win over the files.
+"""
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+LOADED_MARKER = "BACKEND_ENV_LOADED"
+
+
+def load_env():
+    if os.environ.get(LOADED_MARKER):
+        return
+    load_dotenv(Path(__file__).parent / ".env")
+    load_dotenv()
+    os.environ[LOADED_MARKER] = "1"
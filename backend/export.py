@@ -0,0 +1,141 @@
+"""
+Constant-memory exports of the sessions table as NDJSON, CSV or PDF.
+
+Rows are streamed from the database in batches of EXPORT_BATCH_ROWS and encoded
+straight into the response, never materializing the full result. Finished exports
+are cached on disk, keyed by a hash of the format and of the exported session set
+(ids and scores), so repeating an export of unchanged data is a file download.
+"""
+import csv
+import hashlib
+import io
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from sqlalchemy import select
+
+from backend.models import AsyncSessionLocal, InterviewSession
+from backend.pdf import StreamingPDFWriter
+
+EXPORT_CACHE_DIR = Path(os.getenv("EXPORT_CACHE_DIR", str(Path(__file__).parent / ".export_cache")))
+EXPORT_CACHE_MAX_FILES = int(os.getenv("EXPORT_CACHE_MAX_FILES", "50"))
+EXPORT_BATCH_ROWS = int(os.getenv("EXPORT_BATCH_ROWS", "500"))
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "pdf": "application/pdf",
+}
+EXPORT_COLUMNS = [
+    InterviewSession.id,
+    InterviewSession.role,
+    InterviewSession.domain,
+    InterviewSession.mode,
+    InterviewSession.question,
+    InterviewSession.answer,
+    InterviewSession.score,
+    InterviewSession.feedback,
+    InterviewSession.created_at,
+]
+CSV_HEADER = [c.key for c in EXPORT_COLUMNS]
+
+
+async def session_set_key(fmt, filters):
+    """Hash of the format plus the (id, score) of every matching session, read in id order."""
+    digest = hashlib.sha256(fmt.encode())
+    stmt = (select(InterviewSession.id, InterviewSession.score).where(*filters)
+            .order_by(InterviewSession.id).execution_options(yield_per=10_000))
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(stmt)
+        async for batch in result.partitions():
+            digest.update(repr(batch).encode())
+    return digest.hexdigest()
+
+
+def cache_path(key, fmt):
+    return EXPORT_CACHE_DIR / f"{key}.{fmt}"
+
+
+async def session_batches(filters):
+    stmt = (select(*EXPORT_COLUMNS).where(*filters).order_by(InterviewSession.id)
+            .execution_options(yield_per=EXPORT_BATCH_ROWS))
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(stmt)
+        async for batch in result.partitions():
+            yield [row._asdict() for row in batch]
+
+
+def _jsonable(row):
+    return {k: v.isoformat() if hasattr(v, "isoformat") else v for k, v in row.items()}
+
+
+async def ndjson_chunks(filters):
+    async for batch in session_batches(filters):
+        yield "".join(json.dumps(_jsonable(row), ensure_ascii=False) + "\n" for row in batch).encode("utf-8")
+
+
+async def csv_chunks(filters):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(CSV_HEADER)
+    async for batch in session_batches(filters):
+        for row in batch:
+            writer.writerow([_jsonable(row)[k] for k in CSV_HEADER])
+        yield buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")
+
+
+async def pdf_chunks(filters, title="Interview Sessions Export"):
+    pdf = StreamingPDFWriter()
+    yield pdf.begin() + pdf.text(title, "Helvetica-Bold", 16, space_after=10)
+    count = 0
+    async for batch in session_batches(filters):
+        out = []
+        for row in batch:
+            count += 1
+            created = row["created_at"].strftime("%Y-%m-%d %H:%M") if row["created_at"] else "-"
+            score = "-" if row["score"] is None else row["score"]
+            out.append(pdf.text(f"#{row['id']}  {row['role']} / {row['domain']} / {row['mode']}  {created}  Score: {score}",
+                                "Helvetica-Bold", 11, space_after=2))
+            out.append(pdf.text(f"Q: {row['question'] or ''}", size=10, indent=10, space_after=2))
+            out.append(pdf.text(f"A: {row['answer'] or '(skipped)'}", size=10, indent=10, space_after=2))
+            out.append(pdf.text(f"Feedback: {row['feedback'] or ''}", size=10, indent=10, space_after=10))
+        yield b"".join(out)
+    yield pdf.text(f"{count} sessions", size=9) + pdf.finish()
+
+
+EXPORTERS = {"ndjson": ndjson_chunks, "csv": csv_chunks, "pdf": pdf_chunks}
+
+
+async def cached_export(fmt, filters, key):
+    """
+    Stream a fresh export while writing it to a temp file; the file becomes the cache
+    entry for `key` only once the export completed.
+    """
+    EXPORT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=EXPORT_CACHE_DIR, suffix=".part")
+    completed = False
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            async for chunk in EXPORTERS[fmt](filters):
+                tmp.write(chunk)
+                yield chunk
+        os.replace(tmp_name, cache_path(key, fmt))
+        completed = True
+        prune_cache()
+    finally:
+        if not completed and os.path.exists(tmp_name):
+            os.remove(tmp_name)
+
+
+def prune_cache(max_files=EXPORT_CACHE_MAX_FILES):
+    """Keep only the most recently written exports."""
+    files = sorted((p for p in EXPORT_CACHE_DIR.iterdir() if p.suffix != ".part"),
+                   key=lambda p: p.stat().st_mtime, reverse=True)
+    for stale in files[max_files:]:
+        stale.unlink(missing_ok=True)
@@ -0,0 +1,60 @@
+"""
+Running aggregates for one interview (answered/skipped counts, score sum for the
+average, strength and weakness counts), updated per answer in O(size of that answer)
+instead of being recomputed from every answer on each request or Streamlit rerun.
+
+Plain dicts and no imports, so the backend (stored on the interviews row) and the
+Streamlit app's Mock Mode (kept in st.session_state) share the same code.
+An answer entry is {"answer": str, "skipped": bool, "eval": evaluation dict}.
+"""
+TOP_ITEMS = 5
+
+
+def empty_summary():
+    return {"answered": 0, "skipped": 0, "scored": 0, "score_sum": 0.0, "strengths": {}, "weaknesses": {}}
+
+
+def _contribute(summary, entry, sign):
+    if entry is None:
+        return
+    if entry.get("skipped"):
+        summary["skipped"] += sign
+        return
+    summary["answered"] += sign
+    evaluation = entry.get("eval") or {}
+    if evaluation.get("score") is not None:  # fallbacks are unscored
+        summary["scored"] += sign
+        summary["score_sum"] += sign * evaluation["score"]
+    for field in ("strengths", "weaknesses"):
+        counts = summary[field]
+        for item in evaluation.get(field) or ():
+            count = counts.get(item, 0) + sign
+            if count > 0:
+                counts[item] = count
+            else:
+                counts.pop(item, None)
+
+
+def apply_answer(summary, old_entry, new_entry):
+    """Update summary in place for one question's answer changing from old_entry to new_entry (either may be None)."""
+    _contribute(summary, old_entry, -1)
+    _contribute(summary, new_entry, +1)
+    if not summary["scored"]:
+        summary["score_sum"] = 0.0  # drop float residue from subtracting scores
+    return summary
+
+
+def top_counts(counts, n=TOP_ITEMS):
+    return [item for item, _ in sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))[:n]]
+
+
+def summary_view(summary, n=TOP_ITEMS):
+    """What clients display: counts, the running average and the most frequent strengths/weaknesses."""
+    return {
+        "answered": summary["answered"],
+        "skipped": summary["skipped"],
+        "scored": summary["scored"],
+        "avg_score": round(summary["score_sum"] / summary["scored"], 2) if summary["scored"] else None,
+        "top_strengths": top_counts(summary["strengths"], n),
+        "top_weaknesses": top_counts(summary["weaknesses"], n),
+    }
@@ -0,0 +1,129 @@
+"""
+Server-side interview state (POST /interviews, PATCH /interviews/{id}/answers/{i}).
+
+Each interview row holds its questions, the latest answer entry per question and the
+running aggregates from backend/interview_summary.py. Recording an answer replaces
+that question's entry, adjusts the aggregates by the difference, and keeps a single
+sessions row per (interview, question) so /sessions and exports see interview answers
+too. The LLM call happens before any of this, outside the transaction.
+
+Updates are optimistic: the interviews row carries a version (see models.Interview),
+and the UPDATE only applies if nobody else has written the row since it was read.
+If another worker has, the transaction is rolled back and the answer is applied
+again to the fresh row.
+"""
+import asyncio
+import datetime
+import logging
+import weakref
+
+from sqlalchemy import select
+from sqlalchemy.orm.attributes import flag_modified
+from sqlalchemy.orm.exc import StaleDataError
+
+from backend.interview_summary import apply_answer, empty_summary, summary_view
+from backend.metrics import span
+from backend.models import Interview, InterviewSession
+
+logger = logging.getLogger(__name__)
+
+# Attempts at recording one answer when other workers keep updating the same interview
+RECORD_ATTEMPTS = 5
+
+# Serializes answer updates per interview within this process, so its own requests
+# don't conflict; other workers are covered by the version check
+_locks = weakref.WeakValueDictionary()
+
+
+def interview_lock(interview_id):
+    lock = _locks.get(interview_id)
+    if lock is None:
+        lock = _locks[interview_id] = asyncio.Lock()
+    return lock
+
+
+async def create_interview(db, role, domain, mode, questions, user_id=None):
+    interview = Interview(role=role, domain=domain, mode=mode, user_id=user_id, questions=questions,
+                          answers=[None] * len(questions), summary=empty_summary())
+    db.add(interview)
+    with span("db.commit"):
+        await db.commit()
+    return interview
+
+
+async def get_interview(db, interview_id, fresh=False):
+    stmt = select(Interview).where(Interview.id == interview_id)
+    if fresh:
+        stmt = stmt.execution_options(populate_existing=True)
+    return (await db.execute(stmt)).scalar_one_or_none()
+
+
+class InterviewConflict(Exception):
+    """The interview kept changing under us for RECORD_ATTEMPTS attempts."""
+
+
+async def record_answer(db, interview_id, index, answer, evaluation, skipped=False):
+    """
+    Store the answer (and its evaluation) for question `index` and update the aggregates.
+    Returns the updated interview, or None if it (or question `index`) no longer exists,
+    e.g. deleted while the answer was being evaluated. Raises InterviewConflict if other
+    workers keep updating it.
+    """
+    entry = {"answer": answer, "skipped": skipped, "eval": evaluation,
+             "answered_at": datetime.datetime.utcnow().isoformat()}
+    async with interview_lock(interview_id):
+        for _ in range(RECORD_ATTEMPTS):
+            try:
+                return await _record_answer(db, interview_id, index, entry)
+            except StaleDataError:
+                # another worker updated the interview between our read and write
+                await db.rollback()
+                logger.info("interview %s changed while recording answer %d, retrying", interview_id, index)
+    raise InterviewConflict(interview_id)
+
+
+async def _record_answer(db, interview_id, index, entry):
+    interview = await get_interview(db, interview_id, fresh=True)
+    if interview is None or not 0 <= index < len(interview.answers):
+        return None
+    answers = list(interview.answers)
+    apply_answer(interview.summary, answers[index], entry)
+    answers[index] = entry
+    interview.answers = answers
+    flag_modified(interview, "summary")
+
+    # one sessions row per answered question: replaced on re-answer, removed when skipped or unscored.
+    # Deleted through the ORM so the analytics rollups (flush hooks) see the removed score.
+    previous = await db.scalars(select(InterviewSession).where(InterviewSession.interview_id == interview_id,
+                                                                InterviewSession.question_index == index))
+    for row in previous:
+        await db.delete(row)
+    evaluation = entry["eval"]
+    if not entry["skipped"] and evaluation.get("score") is not None:
+        db.add(InterviewSession(
+            role=interview.role,
+            domain=interview.domain,
+            mode=interview.mode,
+            question=interview.questions[index].get("question"),
+            answer=entry["answer"],
+            score=evaluation["score"],
+            feedback=evaluation["feedback"],
+            interview_id=interview_id,
+            question_index=index,
+        ))
+    with span("db.commit"):
+        await db.commit()
+    return interview
+
+
+def interview_view(interview):
+    return {
+        "id": interview.id,
+        "role": interview.role,
+        "domain": interview.domain,
+        "mode": interview.mode,
+        "questions": interview.questions,
+        "answers": interview.answers,
+        "summary": summary_view(interview.summary),
+        "created_at": interview.created_at,
+    }
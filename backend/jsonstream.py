@@ -0,0 +1,112 @@
+import json
+
+
+class IncrementalObjectParser:
+    """
+    Incremental parser for a single JSON object arriving in chunks (e.g. a streamed
+    LLM completion). feed() returns the top-level (key, value) members completed by
+    the chunk, so callers can act on each field without waiting for the whole object.
+    Text before the opening brace (such as a ```json fence) is ignored.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self._pos = 0             # next character to scan
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._member_start = None  # index where the current top-level member begins
+        self.done = False
+
+    def feed(self, chunk):
+        self.text += chunk
+        members = []
+        text = self.text
+        for i in range(self._pos, len(text)):
+            if self.done:
+                break
+            ch = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+            if self._depth == 0:
+                if ch == "{":
+                    self._depth = 1
+                    self._member_start = i + 1
+                continue
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    members.extend(self._close_member(i))
+                    self.done = True
+            elif ch == "," and self._depth == 1:
+                members.extend(self._close_member(i))
+                self._member_start = i + 1
+        self._pos = len(text)
+        return members
+
+    def _close_member(self, end):
+        member = self.text[self._member_start:end].strip()
+        if not member:
+            return []
+        return list(json.loads("{" + member + "}").items())
+
+
+_decoder = json.JSONDecoder()
+
+
+def strip_trailing_commas(text):
+    """text with the commas directly before a closing } or ] removed, leaving strings alone."""
+    out = []
+    comma = None  # index in out of a comma that may turn out to be trailing
+    in_string = escape = False
+    for ch in text:
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+            comma = None
+        elif ch == ",":
+            comma = len(out)
+        elif ch in "}]":
+            if comma is not None:
+                del out[comma]
+            comma = None
+        elif not ch.isspace():
+            comma = None
+        out.append(ch)
+    return "".join(out)
+
+
+def extract_object(text, max_attempts=5):
+    """
+    The first JSON object embedded in text, ignoring anything around it: markdown
+    fences, a sentence before the object, trailing commentary, trailing commas.
+    Raises ValueError if there is none.
+    """
+    start = text.find("{")
+    for _ in range(max_attempts):
+        if start < 0:
+            break
+        try:
+            return _decoder.raw_decode(text, start)[0]
+        except json.JSONDecodeError:
+            try:
+                return _decoder.raw_decode(strip_trailing_commas(text[start:]))[0]
+            except json.JSONDecodeError:
+                start = text.find("{", start + 1)
+    raise ValueError("no JSON object found in the response")
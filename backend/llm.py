@@ -1,58 +1,189 @@
+import asyncio
+import hashlib
+import logging
 import os
-from pathlib import Path
-from dotenv import load_dotenv
 import json
-from openai import OpenAI
-# Load environment variables
-dotenv_path = Path(__file__).parent / ".env"
-load_dotenv(dotenv_path)
+from openai import AsyncOpenAI
+from backend.cache import evaluation_cache, make_key
+from backend.jsonstream import IncrementalObjectParser
+from backend.llm_gateway import LLMGateway
+from backend.metrics import ANSWER_PREPROCESSING, ANSWER_TOKENS_SAVED, EVAL_FALLBACKS, span
+from backend.prompt_budget import (EVAL_MAX_ANSWER_TOKENS, EVAL_SUMMARY_CHUNK_TOKENS, EVAL_SUMMARY_MAX_CHUNKS,
+                                   EVAL_SUMMARY_MODEL, LIST_ITEMS, chunk_text, compact_answer, response_max_tokens)
+from backend.question_bank import get_question_bank
+from backend.schemas import EVALUATION_RESPONSE_FORMAT, parse_evaluation, validate_evaluation
+from backend.semantic_cache import semantic_cache
+from backend.tokens import count_tokens, truncate_tokens
 
+logger = logging.getLogger(__name__)
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+# Bump whenever the evaluation prompt changes so cached results from the old prompt are not reused
+PROMPT_VERSION = 3
+# Max concurrent LLM calls made by evaluate_many (batch endpoint and re-evaluation CLI)
+EVAL_BATCH_CONCURRENCY = int(os.getenv("EVAL_BATCH_CONCURRENCY", "8"))
 
-client = OpenAI(api_key=OPENAI_API_KEY)
-# Hardcoded demo questions
-DEMO_QUESTIONS = [
-    {"id": 1, "question":"Explain the difference between process and thread.", "type":"concept","difficulty":"easy","hint":"Consider memory and scheduling."},
-    {"id": 2, "question":"How would you find a cycle in a directed graph? Give approach and complexity.", "type":"algorithm","difficulty":"medium","hint":"Think DFS and colors/stack."},
-    {"id": 3, "question":"Design a URL shortener service. Outline components and trade-offs.", "type":"system-design","difficulty":"hard","hint":"Consider database, hashing, collision handling."},
-    {"id": 4, "question":"Explain the difference between process and thread.", "type":"concept","difficulty":"easy","hint":"Consider memory and scheduling."},
-    {"id": 5, "question":"How would you find a cycle in a directed graph? Give approach and complexity.", "type":"algorithm","difficulty":"medium","hint":"Think DFS and colors/stack."},
-    
-]
-
-def generate_questions(role, domain, mode, n):
-    # just return first n questions from DEMO_QUESTIONS
-    return DEMO_QUESTIONS[:n]
-
-def evaluate_answer(question, answer, mode):
-    # your LLM feedback logic here
+def make_client():
+    return AsyncOpenAI(api_key=OPENAI_API_KEY)
+
+# structured-output mode for evaluations (EVAL_RESPONSE_FORMAT=text disables it)
+EVAL_CALL_OPTIONS = {"response_format": EVALUATION_RESPONSE_FORMAT} if EVALUATION_RESPONSE_FORMAT else {}
+# every LLM call goes through the gateway: rate limits, retries, deadlines, coalescing.
+# The client is created at app startup (gateway.connect()) or on the first call, not at import.
+gateway = LLMGateway(client_factory=make_client)
+
+def generate_questions(role, domain, mode, n, user_id=None):
+    # mixed-difficulty sample from the question bank, avoiding repeats for user_id
+    return get_question_bank().sample(role, domain, n, user_id=user_id)
+
+# ----------------- LLM-generated questions -----------------
+GENERATED_DIFFICULTIES = ("easy", "medium", "hard")
+
+def validate_generated_question(item):
+    """Normalize one generated question, or return None if it is unusable."""
+    if not isinstance(item, dict):
+        return None
+    text = " ".join(str(item.get("question", "")).split())
+    if not 15 <= len(text) <= 500 or not text.endswith(("?", ".")):
+        return None
+    difficulty = str(item.get("difficulty", "medium")).lower()
     return {
-        "score": 7.5,
-        "strengths": ["Clear explanation", "Good structure"],
-        "weaknesses": ["Add real-world example", "Minor inaccuracies"],
-        "feedback": f"Your answer for '{question}' is decent but could improve.",
-        "suggested_improvement": "Provide examples and be more precise.",
-        "resources": [
-            "https://www.interviewbit.com/technical-interview-questions/",
-            "https://www.geeksforgeeks.org/hr-interview-questions-and-answers/"
-        ]
+        "question": text,
+        "type": str(item.get("type") or "concept")[:40],
+        "difficulty": difficulty if difficulty in GENERATED_DIFFICULTIES else "medium",
+        "hint": " ".join(str(item.get("hint") or "").split())[:300],
     }
 
+async def generate_llm_questions(role, domain, mode, n):
+    """
+    Ask the LLM for n new interview questions. Returns only the questions that pass
+    validate_generated_question; raises if the call or the JSON parsing fails.
+    """
+    prompt = f"""
+You are an interviewer preparing questions.
+Role: {role}
+Domain: {domain}
+Mode: {mode} (Technical or Behavioral)
+Write {n} distinct interview questions of mixed difficulty and return strictly JSON in this format:
+{{
+  "questions": [
+    {{"question": "...", "type": "concept|algorithm|system-design|behavioral", "difficulty": "easy|medium|hard", "hint": "..."}}
+  ]
+}}
+"""
+    response = await gateway.complete(
+        model=MODEL,
+        messages=[
+            {"role": "system", "content": "You are a helpful interviewer."},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.9
+    )
+    data = json.loads(response.choices[0].message.content)
+    items = data.get("questions", []) if isinstance(data, dict) else []
+    return [q for q in map(validate_generated_question, items) if q is not None]
 
+# ----------------- Answer preprocessing (token budget) -----------------
+def summary_messages(chunk, max_words):
+    return [
+        {"role": "system", "content": "You condense interview answers without judging them."},
+        {"role": "user", "content": f"""
+Condense this part of a candidate's interview answer to at most {max_words} words.
+Keep every technical claim, example, number and the order of the argument; do not add, correct or evaluate anything.
 
+{chunk}
+"""}
+    ]
 
-# ----------------- LLM-powered answer evaluator -----------------
-def evaluate_answer(question, answer, mode):
+async def summarize_answer(text):
     """
-    Sends candidate answer to OpenAI LLM for evaluation.
-    Returns JSON with score, strengths, weaknesses, feedback, suggested improvement, resources.
-    Works with any question passed in (demo, future LLM-generated, or hardcoded).
+    Condense an over-long answer with the cheaper EVAL_SUMMARY_MODEL, one call per chunk
+    (run concurrently), so the summaries together fit EVAL_MAX_ANSWER_TOKENS.
+    Returns (summary, tokens used by the summary calls).
     """
+    chunks = await asyncio.to_thread(chunk_text, text, EVAL_SUMMARY_CHUNK_TOKENS)
+    per_chunk = max(64, EVAL_MAX_ANSWER_TOKENS // len(chunks))
+    responses = await asyncio.gather(*(
+        gateway.complete(
+            key="summary:" + hashlib.sha256(f"{EVAL_SUMMARY_MODEL}:{per_chunk}:{chunk}".encode()).hexdigest(),
+            model=EVAL_SUMMARY_MODEL,
+            messages=summary_messages(chunk, per_chunk * 3 // 4),
+            temperature=0,
+            max_tokens=per_chunk
+        )
+        for chunk in chunks
+    ))
+    summary = "\n\n".join(response.choices[0].message.content.strip() for response in responses)
+    used = sum(response.usage.total_tokens for response in responses if response.usage)
+    return summary, used
+
+def _compact(answer):
+    """(original tokens, compacted text, its tokens)"""
+    original = count_tokens(answer)
+    with span("prompt.compact"):
+        text = compact_answer(answer)
+    return original, text, count_tokens(text)
+
+def _truncate(text, max_tokens):
+    text = truncate_tokens(text, max_tokens)
+    return text, count_tokens(text)
+
+async def _offload(answer, fn, *args):
+    """Run tokenizing/compaction in a thread when the answer can exceed the budget (a token is at least a character)."""
+    if len(answer) > EVAL_MAX_ANSWER_TOKENS:
+        return await asyncio.to_thread(fn, *args)
+    return fn(*args)
+
+async def prepare_answer(answer):
+    """
+    Fit the candidate answer into EVAL_MAX_ANSWER_TOKENS before it goes into the prompt:
+    compact it, and if it is still too long summarize it chunk by chunk (very long
+    answers are first cut to what the chunk limit allows; if summarizing fails the
+    answer is truncated instead). Returns (text, token report).
+    Answers longer than the budget (up to EVAL_MAX_ANSWER_CHARS) are tokenized and
+    compacted in a worker thread, off the event loop.
+    """
+    original, text, tokens = await _offload(answer, _compact, answer)
+    steps = ["compacted"] if tokens < original else []
+    summary_tokens = 0
+
+    if tokens > EVAL_MAX_ANSWER_TOKENS:
+        summarizable = EVAL_SUMMARY_CHUNK_TOKENS * EVAL_SUMMARY_MAX_CHUNKS
+        if tokens > summarizable:
+            text, _ = await asyncio.to_thread(_truncate, text, summarizable)
+            steps.append("truncated")
+        try:
+            with span("prompt.summarize"):
+                summary, summary_tokens = await summarize_answer(text)
+            text = summary
+            steps.append("summarized")
+        except Exception as e:
+            logger.warning("summarizing a %d-token answer failed (%s); truncating it instead", tokens, e)
+        tokens = await _offload(text, count_tokens, text)
+        if tokens > EVAL_MAX_ANSWER_TOKENS:
+            text, tokens = await asyncio.to_thread(_truncate, text, EVAL_MAX_ANSWER_TOKENS)
+            if "truncated" not in steps:
+                steps.append("truncated")
+
+    for step in steps:
+        ANSWER_PREPROCESSING.labels(step).inc()
+    ANSWER_TOKENS_SAVED.observe(original - tokens)
+    return text, {
+        "answer_tokens": original,
+        "prompt_answer_tokens": tokens,
+        "tokens_saved": original - tokens,
+        "summary_tokens": summary_tokens,
+        "steps": steps,
+        "max_tokens": response_max_tokens(),
+    }
+
+# ----------------- LLM-powered answer evaluator -----------------
+def build_messages(question, answer, mode, condensed=False):
+    answer_label = "Candidate Answer (condensed from a much longer answer)" if condensed else "Candidate Answer"
     prompt = f"""
 You are an interview evaluator.
 Question: {question}
-Candidate Answer: {answer}
+{answer_label}: {answer}
 Mode: {mode} (Technical or Behavioral)
 Evaluate the answer and return strictly JSON in this format:
 {{
@@ -63,29 +194,140 @@ Evaluate the answer and return strictly JSON in this format:
   "suggested_improvement": "...",
   "resources": ["...","..."]
 }}
+Keep strengths, weaknesses and resources to at most {LIST_ITEMS} short items each,
+feedback under 80 words and suggested_improvement under 150 words.
 """
+    return [
+        {"role": "system", "content": "You are a helpful interviewer and evaluator."},
+        {"role": "user", "content": prompt}
+    ]
+
+def fallback_result(error):
+    # returned when the LLM fails; unscored and flagged, so it is never cached or stored as a real score
+    EVAL_FALLBACKS.labels(type(error).__name__).inc()
+    return {
+        "score": None,
+        "fallback": True,
+        "strengths": [],
+        "weaknesses": [],
+        "feedback": f"Could not evaluate using AI. Reason: {str(error)}",
+        "suggested_improvement": "",
+        "resources": []
+    }
+
+def is_fallback(result):
+    return bool(result.get("fallback"))
+
+async def cached_evaluation(question, answer, mode, cache_key):
+    """Exact-match cache first, then (if enabled) a near-duplicate answer to the same question."""
+    with span("cache.lookup"):
+        cached = await evaluation_cache.get(cache_key)
+    if cached is None and semantic_cache.enabled:
+        with span("cache.semantic_lookup"):
+            cached = semantic_cache.lookup(question, answer, mode)
+    return cached
+
+async def remember_evaluation(question, answer, mode, cache_key, data):
+    """Cache a successful evaluation; a failing cache write is logged, never surfaced to the caller."""
+    with span("cache.store"):
+        try:
+            await evaluation_cache.set(cache_key, data)
+            if semantic_cache.enabled:
+                semantic_cache.add(question, answer, mode, data)
+        except Exception:
+            logger.exception("Could not cache evaluation %s", cache_key[:12])
+
+async def evaluate_answer(question, answer, mode):
+    """
+    Sends candidate answer to OpenAI LLM for evaluation.
+    Returns an EvaluationResult dict: score, strengths, weaknesses, feedback, suggested improvement, resources.
+    Works with any question passed in (demo, future LLM-generated, or hardcoded).
+    Successful evaluations are cached by (question, answer, mode, MODEL, PROMPT_VERSION),
+    and near-duplicate answers can reuse them through the semantic cache; identical
+    evaluations already in flight share one LLM call. If the LLM cannot be reached the
+    fallback result (score None, fallback True) is returned.
+    The answer is fitted to the token budget first (prepare_answer); the result's
+    "tokens" entry reports what that saved.
+    """
+    cache_key = make_key(question, answer, mode, MODEL, PROMPT_VERSION)
+    cached = await cached_evaluation(question, answer, mode, cache_key)
+    if cached is not None:
+        return {**cached, "tokens": {"cached": True}}
+
+    prompt_answer, tokens = await prepare_answer(answer)
+    try:
+        with span("llm.call"):
+            response = await gateway.complete(
+                key=cache_key,
+                model=MODEL,
+                messages=build_messages(question, prompt_answer, mode, condensed="summarized" in tokens["steps"]),
+                temperature=0.7,
+                max_tokens=tokens["max_tokens"],
+                **EVAL_CALL_OPTIONS
+            )
+        text = response.choices[0].message.content
+        # validated straight from the JSON text; fences and surrounding prose are tolerated
+        with span("llm.parse"):
+            data = parse_evaluation(text).model_dump(exclude={"tokens"})
+    except Exception as e:
+        return {**fallback_result(e), "tokens": tokens}
+
+    await remember_evaluation(question, answer, mode, cache_key, data)
+    return {**data, "tokens": tokens}
+
+async def stream_evaluation(question, answer, mode):
+    """
+    Streaming variant of evaluate_answer.
+    Yields ("field", (name, value)) as soon as each top-level field of the completion is
+    complete, then ("done", result) with the full evaluation (or the fallback).
+    """
+    cache_key = make_key(question, answer, mode, MODEL, PROMPT_VERSION)
+    cached = await cached_evaluation(question, answer, mode, cache_key)
+    if cached is not None:
+        for name, value in cached.items():
+            yield "field", (name, value)
+        yield "done", {**cached, "tokens": {"cached": True}}
+        return
+
+    prompt_answer, tokens = await prepare_answer(answer)
+    parser = IncrementalObjectParser()
+    data = {}
     try:
-        response = client.chat.completions.create(
+        stream = gateway.stream(
             model=MODEL,
-            messages=[
-                {"role": "system", "content": "You are a helpful interviewer and evaluator."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7
+            messages=build_messages(question, prompt_answer, mode, condensed="summarized" in tokens["steps"]),
+            temperature=0.7,
+            max_tokens=tokens["max_tokens"],
+            **EVAL_CALL_OPTIONS
         )
-        text = response.choices[0].message.content
-        # parse JSON safely
-        data = json.loads(text)
-        if not isinstance(data, dict):
-            raise ValueError("Response not dict")
-        return data
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            for name, value in parser.feed(delta):
+                data[name] = value
+                yield "field", (name, value)
+        if not parser.done:
+            raise ValueError("Incomplete JSON in streamed response")
+        data = validate_evaluation(data).model_dump(exclude={"tokens"})
     except Exception as e:
-        # fallback if LLM fails
-        return {
-            "score": 5,
-            "strengths": [],
-            "weaknesses": [],
-            "feedback": f"Could not evaluate using AI. Reason: {str(e)}",
-            "suggested_improvement": "",
-            "resources": []
-        }
+        yield "done", {**fallback_result(e), "tokens": tokens}
+        return
+
+    await remember_evaluation(question, answer, mode, cache_key, data)
+    yield "done", {**data, "tokens": tokens}
+
+async def evaluate_many(items, concurrency=EVAL_BATCH_CONCURRENCY):
+    """
+    Evaluates (question, answer, mode) tuples concurrently, at most `concurrency` at a time.
+    Returns results in input order; an item that raised is returned as its exception.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def evaluate_one(question, answer, mode):
+        async with semaphore:
+            return await evaluate_answer(question, answer, mode)
+
+    return await asyncio.gather(*(evaluate_one(*item) for item in items), return_exceptions=True)
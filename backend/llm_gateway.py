@@ -0,0 +1,328 @@
+"""
+Shared gateway for every chat-completion call the backend makes.
+
+- Client-side rate limiting: token buckets for requests per minute (LLM_RPM) and
+  tokens per minute (LLM_TPM); tokens are estimated before the call and corrected
+  with the reported usage afterwards. 0 disables a limit.
+- At most LLM_MAX_CONCURRENCY calls in flight.
+- Retries of 429s, timeouts, connection errors and 5xx with jittered exponential
+  backoff ("full jitter"), honouring Retry-After. A 429 pauses every caller, not
+  just the one that got it.
+- A per-call deadline (LLM_DEADLINE_S) covering waiting, retries and the call itself;
+  when it cannot be met LLMUnavailable is raised instead of queueing forever.
+- Single-flight: concurrent calls with the same key share one upstream request.
+
+With a shared STATE_BACKEND (see backend/shared_state.py) the RPM/TPM buckets and the
+429 pause are shared by every worker process, so the limits hold for the deployment
+rather than per worker. Concurrency slots and single-flight stay per process.
+
+The OpenAI client's own retries are turned off so that all retrying happens here.
+The client and the state backend are set up on first use (or by connect() at startup),
+not at import.
+"""
+import asyncio
+import logging
+import os
+import random
+import time
+
+import openai
+
+from backend.metrics import LLM_LATENCY, record_llm_usage
+from backend.shared_state import get_state
+from backend.tokens import count_message_tokens
+
+logger = logging.getLogger(__name__)
+
+LLM_RPM = float(os.getenv("LLM_RPM", "500"))
+LLM_TPM = float(os.getenv("LLM_TPM", "200000"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_BACKOFF_BASE_MS = float(os.getenv("LLM_BACKOFF_BASE_MS", "250"))
+LLM_BACKOFF_MAX_MS = float(os.getenv("LLM_BACKOFF_MAX_MS", "8000"))
+LLM_DEADLINE_S = float(os.getenv("LLM_DEADLINE_S", "30"))
+LLM_COALESCE = os.getenv("LLM_COALESCE", "1").lower() in ("1", "true", "yes")
+# Completion tokens assumed when a call does not set max_tokens
+LLM_EXPECTED_COMPLETION_TOKENS = int(os.getenv("LLM_EXPECTED_COMPLETION_TOKENS", "300"))
+
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+
+class LLMUnavailable(Exception):
+    """The call could not be completed within its deadline or retry budget."""
+
+
+def estimate_tokens(messages, max_tokens=None):
+    """Prompt tokens plus the completion budget (max_tokens, or the expected size)."""
+    return count_message_tokens(messages) + (max_tokens or LLM_EXPECTED_COMPLETION_TOKENS)
+
+
+class TokenBucket:
+    """
+    Refills `per_minute` units per minute, up to one minute's worth. Waiters are served in order.
+    Given a shared `state` backend, the bucket lives there under `name` and is shared by all workers.
+    """
+
+    def __init__(self, per_minute, name=None, state=None):
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.tokens = per_minute
+        self.updated = time.monotonic()
+        self.name = name
+        self.state = state if state is not None and state.shared else None
+        self._lock = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount, deadline):
+        """Take `amount` units, waiting for them if needed. Returns the seconds waited."""
+        if not self.capacity:
+            return 0.0
+        amount = min(amount, self.capacity)
+        started = time.monotonic()
+        if self.state is not None:
+            while True:
+                wait = await asyncio.to_thread(self.state.take, self.name, amount, self.capacity, self.rate)
+                if not wait:
+                    return time.monotonic() - started
+                if time.monotonic() + wait > deadline:
+                    raise LLMUnavailable("rate limit budget exhausted before the deadline")
+                await asyncio.sleep(wait)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return time.monotonic() - started
+                wait = (amount - self.tokens) / self.rate
+                if time.monotonic() + wait > deadline:
+                    raise LLMUnavailable("rate limit budget exhausted before the deadline")
+                await asyncio.sleep(wait)
+
+    def refund(self, amount):
+        """Give back over-estimated units (or take more when amount is negative)."""
+        if not self.capacity:
+            return
+        if self.state is not None:
+            asyncio.get_running_loop().run_in_executor(None, self.state.take, self.name, -amount,
+                                                       self.capacity, self.rate)
+            return
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+def retry_after_seconds(error):
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class LLMGateway:
+    def __init__(self, client=None, rpm=LLM_RPM, tpm=LLM_TPM, max_concurrency=LLM_MAX_CONCURRENCY,
+                 max_retries=LLM_MAX_RETRIES, backoff_base_ms=LLM_BACKOFF_BASE_MS,
+                 backoff_max_ms=LLM_BACKOFF_MAX_MS, deadline_s=LLM_DEADLINE_S, coalesce=LLM_COALESCE,
+                 client_factory=None, state=None):
+        self._client = client.with_options(max_retries=0) if client is not None else None
+        self._client_factory = client_factory
+        self._state = None
+        self.requests = TokenBucket(rpm, "llm:requests")
+        self.tokens = TokenBucket(tpm, "llm:tokens")
+        if state is not None:
+            self._use_state(state)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base_ms / 1000
+        self.backoff_max = backoff_max_ms / 1000
+        self.deadline_s = deadline_s
+        self.coalesce = coalesce
+        self._loop = None
+        self._slots = None
+        self._inflight = {}           # coalescing key -> task of the leading call
+        self._paused_until = 0.0      # set from 429 Retry-After, respected by every caller
+        self.calls = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.coalesced = 0
+        self.throttle_wait_s = 0.0
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = self._client_factory().with_options(max_retries=0)
+        return self._client
+
+    @property
+    def state(self):
+        """The shared state backend, resolved by connect() or the first call rather than at import."""
+        if self._state is None:
+            self._use_state(get_state())
+        return self._state
+
+    def _use_state(self, state):
+        self._state = state
+        for bucket in (self.requests, self.tokens):
+            bucket.state = state if state.shared else None
+
+    def connect(self):
+        """Create the client and open the shared state now (app startup) instead of on the first call."""
+        self._use_state(self.state)
+        return self.client
+
+    async def _pause_remaining(self):
+        """Seconds left of a Retry-After pause set by this or (with a shared state backend) another worker."""
+        pause = self._paused_until - time.monotonic()
+        if self.requests.state is not None:
+            until = await asyncio.to_thread(self.state.get, "llm:paused_until")
+            if until is not None:
+                pause = max(pause, float(until) - time.time())
+        return pause
+
+    def _pause(self, seconds):
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        if self.requests.state is not None:
+            asyncio.get_running_loop().run_in_executor(None, self.state.set, "llm:paused_until",
+                                                       str(time.time() + seconds), seconds + 1)
+
+    def _bind_loop(self):
+        # asyncio primitives belong to one event loop; recreate them when a new one is running
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._use_state(self.state)  # buckets are shared from the first call on
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+            self.requests._lock = asyncio.Lock()
+            self.tokens._lock = asyncio.Lock()
+            self._inflight = {}
+
+    def backoff(self, attempt, error):
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        return max(delay, retry_after_seconds(error) or 0.0)
+
+    async def _create(self, deadline, params):
+        """One upstream create() call with rate limiting, retries and the deadline applied."""
+        estimate = estimate_tokens(params["messages"], params.get("max_tokens"))
+        attempt = 0
+        while True:
+            pause = await self._pause_remaining()
+            if pause > 0:
+                if time.monotonic() + pause > deadline:
+                    raise LLMUnavailable("upstream is rate limiting and the deadline is too close")
+                await asyncio.sleep(pause)
+            self.throttle_wait_s += await self.requests.acquire(1, deadline)
+            self.throttle_wait_s += await self.tokens.acquire(estimate, deadline)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise LLMUnavailable("deadline exceeded")
+            self.calls += 1
+            started = time.perf_counter()
+            try:
+                response = await self.client.with_options(timeout=remaining).chat.completions.create(**params)
+                LLM_LATENCY.labels(params["model"], "ok").observe(time.perf_counter() - started)
+                return response, estimate
+            except RETRYABLE_ERRORS as e:
+                LLM_LATENCY.labels(params["model"], type(e).__name__).observe(time.perf_counter() - started)
+                if isinstance(e, openai.RateLimitError):
+                    self.rate_limited += 1
+                    retry_after = retry_after_seconds(e)
+                    if retry_after:
+                        self._pause(retry_after)
+                delay = self.backoff(attempt, e)
+                if attempt >= self.max_retries or time.monotonic() + delay >= deadline:
+                    raise LLMUnavailable(f"{type(e).__name__} after {attempt + 1} attempts: {e}") from e
+                attempt += 1
+                self.retries += 1
+                logger.info("LLM call failed with %s, retry %d in %.2fs", type(e).__name__, attempt, delay)
+                await asyncio.sleep(delay)
+
+    def _record_usage(self, model, usage, estimate):
+        record_llm_usage(model, usage)
+        if usage is not None and usage.total_tokens:
+            self.tokens.refund(estimate - usage.total_tokens)
+
+    async def _complete(self, deadline, params):
+        try:
+            async with self._slots:
+                response, estimate = await self._create(deadline, params)
+        except Exception:
+            self.failed += 1
+            raise
+        self.succeeded += 1
+        self._record_usage(params["model"], getattr(response, "usage", None), estimate)
+        return response
+
+    async def complete(self, key=None, deadline_s=None, **params):
+        """
+        chat.completions.create(**params) through the gateway. Calls sharing a `key`
+        while one is in flight wait for that call instead of making their own.
+        Raises LLMUnavailable when the call cannot be made within the deadline.
+        """
+        self._bind_loop()
+        deadline = time.monotonic() + (deadline_s or self.deadline_s)
+        if key is None or not self.coalesce:
+            return await self._complete(deadline, params)
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(self._complete(deadline, params))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._call_finished(key, t))
+        # a cancelled caller (client disconnect) must not cancel the call for the others
+        return await asyncio.shield(task)
+
+    def _call_finished(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved even if every waiter went away
+
+    async def stream(self, deadline_s=None, **params):
+        """
+        Streaming chat completion. Only opening the stream is retried; the chunks are
+        yielded as they arrive while the call holds a concurrency slot. Usage is
+        requested as a final chunk (which has no choices).
+        """
+        self._bind_loop()
+        deadline = time.monotonic() + (deadline_s or self.deadline_s)
+        params = {**params, "stream": True, "stream_options": {"include_usage": True}}
+        async with self._slots:
+            try:
+                stream, estimate = await self._create(deadline, params)
+                async for chunk in stream:
+                    if getattr(chunk, "usage", None) is not None:
+                        self._record_usage(params["model"], chunk.usage, estimate)
+                    yield chunk
+            except Exception:
+                self.failed += 1
+                raise
+        self.succeeded += 1
+
+    def stats(self):
+        return {
+            "calls": self.calls,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "coalesced": self.coalesced,
+            "in_flight_keys": len(self._inflight),
+            "throttle_wait_s": round(self.throttle_wait_s, 3),
+            "limits": {"rpm": self.requests.capacity, "tpm": self.tokens.capacity,
+                       "max_concurrency": self.max_concurrency, "deadline_s": self.deadline_s},
+            # not self.state: reading stats (e.g. metrics registration at import) must not open the backend
+            "state": self._state.describe() if self._state is not None else None,
+        }
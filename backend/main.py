@@ -1,10 +1,62 @@
-from fastapi import FastAPI
+import base64
+import datetime
+import json
+import logging
+import time
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, HTTPException, Query
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from backend import llm
-from backend.models import SessionLocal, InterviewSession
+from typing import List, Optional
+from pydantic import BaseModel, Field
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend import analytics, export, llm
+from backend.cache import evaluation_cache
+from backend.metrics import MetricsMiddleware, metrics_payload, register_stats, span
+from backend.profiling import PROFILING_ENABLED, ProfilerMiddleware
+from backend.prompt_budget import EVAL_MAX_ANSWER_CHARS, EVAL_MAX_QUESTION_CHARS
+from backend.semantic_cache import semantic_cache
+from backend.question_bank import get_question_bank
+from backend.schemas import EvaluateResponse, EvaluationResult
+from backend.question_pool import QUESTION_POOL_PREFILL, QUESTION_SOURCE, prefill_keys, question_pool
+from backend.tokens import get_encoding
+from backend.interview_summary import summary_view
+from backend.interviews import InterviewConflict, create_interview, get_interview, interview_view, record_answer
+from backend.models import DB_AUTO_MIGRATE, AsyncSessionLocal, InterviewSession, async_engine, get_db, init_db
+from backend.writebehind import EVAL_WRITE_BEHIND, write_buffer
 
-app = FastAPI(title="LLM Interview Backend")
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app):
+    if DB_AUTO_MIGRATE:
+        init_db()        # single-process mode; backend/serve.py migrates once before starting workers
+    llm.gateway.connect()  # create the LLM client in this worker, not at import
+    get_question_bank()  # load and index the question bank once at startup
+    get_encoding()       # load the tokenizer before the first request needs it
+    if EVAL_WRITE_BEHIND:
+        write_buffer.start()
+    if QUESTION_SOURCE == "llm":
+        await question_pool.start(prefill_keys() if QUESTION_POOL_PREFILL else ())
+    yield
+    await question_pool.stop()
+    await write_buffer.stop()
+
+app = FastAPI(title="LLM Interview Backend", lifespan=lifespan)
+
+# Request latency per route + Server-Timing header with per-stage spans (see backend/metrics.py)
+app.add_middleware(MetricsMiddleware)
+if PROFILING_ENABLED:
+    # requests sent with an X-Profile header get a sampling profile instead of their response
+    app.add_middleware(ProfilerMiddleware)
+register_stats({
+    "evaluation_cache": evaluation_cache.stats,
+    "semantic_cache": semantic_cache.stats,
+    "llm_gateway": lambda: llm.gateway.stats(),
+    "write_behind": write_buffer.stats,
+    "question_pool": question_pool.stats,
+})
 
 # CORS (to allow frontend to call backend)
 app.add_middleware(
@@ -21,46 +73,416 @@ class GenerateRequest(BaseModel):
     domain: str
     mode: str
     n: int
+    user_id: Optional[str] = None  # avoid repeating questions this user has already seen
 
 class EvaluateRequest(BaseModel):
-    question: str
-    answer: str
-    mode: str
+    # longer answers are accepted but compacted/summarized to the prompt token budget
+    question: str = Field(..., max_length=EVAL_MAX_QUESTION_CHARS)
+    answer: str = Field(..., max_length=EVAL_MAX_ANSWER_CHARS)
+    mode: str = Field(..., max_length=32)
+    role: str = Field("Unknown", max_length=128)
+    domain: str = Field("Unknown", max_length=128)
+
+class BatchItem(BaseModel):
+    question: str = Field(..., max_length=EVAL_MAX_QUESTION_CHARS)
+    answer: str = Field(..., max_length=EVAL_MAX_ANSWER_CHARS)
+    mode: str = Field(..., max_length=32)
+    # saved with the batch's role/domain unless set here
+    role: Optional[str] = Field(None, max_length=128)
+    domain: Optional[str] = Field(None, max_length=128)
+
+class BatchEvaluateRequest(BaseModel):
+    items: List[BatchItem] = Field(..., min_length=1, max_length=100)
+    role: str = Field("Unknown", max_length=128)
+    domain: str = Field("Unknown", max_length=128)
+
+class CreateInterviewRequest(BaseModel):
+    role: str = Field(..., max_length=128)
+    domain: str = Field(..., max_length=128)
+    mode: str = Field(..., max_length=32)
+    n: int = Field(3, ge=1, le=20)
+    user_id: Optional[str] = None
+    questions: Optional[List[dict]] = None  # use these instead of generating (e.g. Mock Mode questions)
+
+class AnswerRequest(BaseModel):
+    answer: str = Field("", max_length=EVAL_MAX_ANSWER_CHARS)
+    skip: bool = False
+
+async def save_sessions(db, rows):
+    """Persist evaluation rows: queued on the write-behind buffer when enabled, otherwise committed now"""
+    if EVAL_WRITE_BEHIND:
+        await write_buffer.add(rows)
+        return
+    db.add_all(rows)
+    with span("db.commit"):
+        await db.commit()
 
 @app.get("/")
 def root():
     return {"message": "Backend is running!"}
 
+async def pick_questions(role, domain, mode, n, user_id=None):
+    if QUESTION_SOURCE != "llm":
+        return llm.generate_questions(role, domain, mode, n, user_id)
+
+    # Pre-generated questions first (never waits on the LLM); top up from the bank if the pool runs dry
+    questions = await question_pool.pop(role, domain, mode, n)
+    if len(questions) < n:
+        questions += llm.generate_questions(role, domain, mode, n - len(questions), user_id)
+    return questions
+
 @app.post("/generate")
-def generate_questions(request: GenerateRequest):
-    questions = llm.generate_questions(request.role, request.domain, request.mode, request.n)
+async def generate_questions(request: GenerateRequest):
+    questions = await pick_questions(request.role, request.domain, request.mode, request.n, request.user_id)
     return {"questions": questions}
 
-@app.post("/evaluate")
-def evaluate_answer(request: EvaluateRequest):
-    result = llm.evaluate_answer(request.question, request.answer, request.mode)
+@app.post("/evaluate", response_model=EvaluateResponse)
+async def evaluate_answer(request: EvaluateRequest, db: AsyncSession = Depends(get_db)):
+    result = await llm.evaluate_answer(request.question, request.answer, request.mode)
+    if llm.is_fallback(result):
+        # the LLM was unavailable: report it, but don't store a made-up score
+        return {"eval": result}
 
     # Save to DB
-    db = SessionLocal()
     session_entry = InterviewSession(
-        role="Unknown",   # could pass from frontend later
-        domain="Unknown", # same here
+        role=request.role,
+        domain=request.domain,
         mode=request.mode,
         question=request.question,
         answer=request.answer,
         score=result["score"],
         feedback=result["feedback"]
     )
-    db.add(session_entry)
-    db.commit()
-    db.close()
+    await save_sessions(db, [session_entry])
 
     return {"eval": result}
 
+def sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.post("/evaluate/stream")
+async def evaluate_answer_stream(request: EvaluateRequest):
+    """
+    Server-sent events version of /evaluate.
+    Emits a `field` event per completed evaluation field, then a `done` event with the
+    full result and timings (time_to_first_field_ms, total_ms).
+    """
+    started = time.perf_counter()
+
+    async def events():
+        first_field_ms = None
+        async for kind, payload in llm.stream_evaluation(request.question, request.answer, request.mode):
+            if kind == "field":
+                if first_field_ms is None:
+                    first_field_ms = (time.perf_counter() - started) * 1000
+                name, value = payload
+                yield sse("field", {"name": name, "value": value})
+                continue
+
+            result = payload
+            if not llm.is_fallback(result):
+                # the response outlives the route's dependencies, so open a session here
+                async with AsyncSessionLocal() as db:
+                    await save_sessions(db, [InterviewSession(
+                        role=request.role,
+                        domain=request.domain,
+                        mode=request.mode,
+                        question=request.question,
+                        answer=request.answer,
+                        score=result["score"],
+                        feedback=result["feedback"]
+                    )])
+            total_ms = (time.perf_counter() - started) * 1000
+            logger.info("evaluate/stream time_to_first_field_ms=%s total_ms=%.1f", first_field_ms, total_ms)
+            yield sse("done", {"eval": result, "time_to_first_field_ms": first_field_ms, "total_ms": total_ms})
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.post("/evaluate/batch")
+async def evaluate_batch(request: BatchEvaluateRequest, db: AsyncSession = Depends(get_db)):
+    """
+    Evaluate a whole interview at once; results come back in request order.
+    Each result says whether it was `saved`. `failed` counts the items without a real
+    evaluation: errors plus `unscored` ones (the LLM was unavailable and the unscored
+    fallback came back, which is not saved).
+    """
+    outcomes = await llm.evaluate_many([(item.question, item.answer, item.mode) for item in request.items])
+
+    results = []
+    rows = []
+    errors = unscored = 0
+    for index, (item, outcome) in enumerate(zip(request.items, outcomes)):
+        if isinstance(outcome, Exception):
+            results.append({"index": index, "error": str(outcome), "saved": False})
+            errors += 1
+            continue
+        if llm.is_fallback(outcome):
+            results.append({"index": index, "eval": outcome, "saved": False})
+            unscored += 1
+            continue
+        results.append({"index": index, "eval": outcome, "saved": True})
+        rows.append(InterviewSession(
+            role=item.role or request.role,
+            domain=item.domain or request.domain,
+            mode=item.mode,
+            question=item.question,
+            answer=item.answer,
+            score=outcome["score"],
+            feedback=outcome["feedback"]
+        ))
+
+    # Save all real (non-fallback) evaluations in one insert
+    if rows:
+        await save_sessions(db, rows)
+
+    return {"results": results, "failed": errors + unscored, "unscored": unscored}
+
+@app.post("/interviews", status_code=201)
+async def start_interview(request: CreateInterviewRequest, db: AsyncSession = Depends(get_db)):
+    """
+    Start an interview whose questions, answers and running summary live on the server,
+    so a client can restore it (GET /interviews/{id}) instead of keeping it all itself.
+    """
+    questions = request.questions
+    if questions is None:
+        questions = await pick_questions(request.role, request.domain, request.mode, request.n, request.user_id)
+    interview = await create_interview(db, request.role, request.domain, request.mode, questions, request.user_id)
+    return interview_view(interview)
+
+@app.get("/interviews/{interview_id}")
+async def read_interview(interview_id: str, db: AsyncSession = Depends(get_db)):
+    interview = await get_interview(db, interview_id)
+    if interview is None:
+        raise HTTPException(status_code=404, detail="Interview not found")
+    return interview_view(interview)
+
+# the interview (or the question) was deleted while the answer was being evaluated
+INTERVIEW_GONE = "Interview or question no longer exists"
+INTERVIEW_BUSY = "Interview is being updated concurrently; retry"
+
+@app.exception_handler(InterviewConflict)
+async def interview_conflict(request, exc):
+    return JSONResponse({"detail": INTERVIEW_BUSY}, status_code=409)
+
+@app.patch("/interviews/{interview_id}/answers/{index}")
+async def answer_question(interview_id: str, index: int, request: AnswerRequest, stream: bool = False,
+                          db: AsyncSession = Depends(get_db)):
+    """
+    Record (or replace) the answer to question `index`: evaluates it, stores it and
+    updates the interview's summary incrementally. `skip=true` records a skipped
+    question without an evaluation. With `stream=true` the evaluation is sent as
+    server-sent events like /evaluate/stream, and the `done` event carries the summary;
+    if the interview is gone by the time the answer is recorded, the stream ends with an
+    `error` event (status 404) instead, or 409 if other workers kept updating it.
+    """
+    interview = await get_interview(db, interview_id)
+    if interview is None:
+        raise HTTPException(status_code=404, detail="Interview not found")
+    if not 0 <= index < len(interview.questions):
+        raise HTTPException(status_code=404, detail="Question index out of range")
+    question = interview.questions[index].get("question", "")
+    mode = interview.mode
+    await db.close()  # don't hold a connection while the LLM runs
+
+    if request.skip:
+        evaluation = EvaluationResult(feedback="Skipped").model_dump(exclude={"tokens"})
+        interview = await record_answer(db, interview_id, index, "", evaluation, skipped=True)
+        if interview is None:
+            raise HTTPException(status_code=404, detail=INTERVIEW_GONE)
+        return {"index": index, "eval": evaluation, "summary": summary_view(interview.summary)}
+
+    if not stream:
+        result = await llm.evaluate_answer(question, request.answer, mode)
+        interview = await record_answer(db, interview_id, index, request.answer, result)
+        if interview is None:
+            raise HTTPException(status_code=404, detail=INTERVIEW_GONE)
+        return {"index": index, "eval": result, "summary": summary_view(interview.summary)}
+
+    started = time.perf_counter()
+
+    async def events():
+        first_field_ms = None
+        async for kind, payload in llm.stream_evaluation(question, request.answer, mode):
+            if kind == "field":
+                if first_field_ms is None:
+                    first_field_ms = (time.perf_counter() - started) * 1000
+                name, value = payload
+                yield sse("field", {"name": name, "value": value})
+                continue
+
+            result = payload
+            try:
+                async with AsyncSessionLocal() as session:
+                    updated = await record_answer(session, interview_id, index, request.answer, result)
+            except InterviewConflict:
+                yield sse("error", {"status": 409, "detail": INTERVIEW_BUSY, "index": index, "eval": result})
+                return
+            if updated is None:
+                yield sse("error", {"status": 404, "detail": INTERVIEW_GONE, "index": index, "eval": result})
+                return
+            total_ms = (time.perf_counter() - started) * 1000
+            yield sse("done", {"index": index, "eval": result, "summary": summary_view(updated.summary),
+                               "time_to_first_field_ms": first_field_ms, "total_ms": total_ms})
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# Columns returned by GET /sessions?fields=summary (leaves out the large answer/feedback text)
+SESSION_SUMMARY_COLUMNS = [
+    InterviewSession.id,
+    InterviewSession.role,
+    InterviewSession.domain,
+    InterviewSession.mode,
+    InterviewSession.question,
+    InterviewSession.score,
+    InterviewSession.created_at,
+]
+SESSION_FULL_COLUMNS = SESSION_SUMMARY_COLUMNS + [InterviewSession.answer, InterviewSession.feedback]
+
+def encode_cursor(created_at, session_id):
+    raw = json.dumps([created_at.isoformat(), session_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor):
+    try:
+        created_at, session_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.datetime.fromisoformat(created_at), int(session_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def session_filters(role=None, domain=None, mode=None, min_score=None, max_score=None):
+    """WHERE clauses shared by the session listing endpoints"""
+    filters = []
+    if role is not None:
+        filters.append(InterviewSession.role == role)
+    if domain is not None:
+        filters.append(InterviewSession.domain == domain)
+    if mode is not None:
+        filters.append(InterviewSession.mode == mode)
+    if min_score is not None:
+        filters.append(InterviewSession.score >= min_score)
+    if max_score is not None:
+        filters.append(InterviewSession.score <= max_score)
+    return filters
+
 @app.get("/sessions")
-def get_sessions():
-    """Fetch all past interview sessions"""
-    db = SessionLocal()
-    sessions = db.query(InterviewSession).all()
-    db.close()
-    return sessions
+async def get_sessions(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    role: Optional[str] = None,
+    domain: Optional[str] = None,
+    mode: Optional[str] = None,
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+    fields: str = Query("full", pattern="^(full|summary)$"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Past interview sessions, newest first, one page at a time.
+    Pass the returned `next_cursor` back as `cursor` to fetch the following page;
+    `fields=summary` leaves out the answer and feedback text.
+    """
+    columns = SESSION_SUMMARY_COLUMNS if fields == "summary" else SESSION_FULL_COLUMNS
+    filters = session_filters(role, domain, mode, min_score, max_score)
+    if cursor:
+        created_at, session_id = decode_cursor(cursor)
+        # row-value comparison so the planner can range-scan the (created_at, id) indexes
+        filters.append(tuple_(InterviewSession.created_at, InterviewSession.id) < tuple_(created_at, session_id))
+
+    stmt = (
+        select(*columns)
+        .where(*filters)
+        .order_by(InterviewSession.created_at.desc(), InterviewSession.id.desc())
+        .limit(limit + 1)
+    )
+    rows = (await db.execute(stmt)).all()
+
+    items = [row._asdict() for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(last["created_at"], last["id"])
+    return {"items": items, "next_cursor": next_cursor}
+
+@app.get("/export/sessions")
+async def export_sessions(
+    format: str = Query("ndjson", pattern="^(ndjson|csv|pdf)$"),
+    role: Optional[str] = None,
+    domain: Optional[str] = None,
+    mode: Optional[str] = None,
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+):
+    """
+    Export every matching session as NDJSON, CSV or a PDF report, streamed in constant memory.
+    Repeated exports of an unchanged session set are served from the export cache.
+    """
+    filters = session_filters(role, domain, mode, min_score, max_score)
+    key = await export.session_set_key(format, filters)
+    path = export.cache_path(key, format)
+    headers = {"Content-Disposition": f'attachment; filename="sessions-{key[:12]}.{format}"'}
+    if path.exists():
+        return FileResponse(path, media_type=export.EXPORT_FORMATS[format], headers={**headers, "X-Export-Cache": "hit"})
+    return StreamingResponse(export.cached_export(format, filters, key), media_type=export.EXPORT_FORMATS[format],
+                             headers={**headers, "X-Export-Cache": "miss"})
+
+@app.get("/analytics/trend")
+async def analytics_trend(
+    bucket: str = Query("day", pattern="^(day|week|month)$"),
+    role: Optional[str] = None,
+    domain: Optional[str] = None,
+    mode: Optional[str] = None,
+    start: Optional[datetime.date] = None,
+    end: Optional[datetime.date] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """Session count, average score and standard deviation per day/week/month (from the daily rollups)"""
+    points = await analytics.trend(db, bucket, role=role, domain=domain, mode=mode, start=start, end=end)
+    return {"bucket": bucket, "points": points}
+
+@app.get("/analytics/breakdown")
+async def analytics_breakdown(
+    by: str = Query("domain", pattern="^(role|domain|mode)$"),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    role: Optional[str] = None,
+    domain: Optional[str] = None,
+    mode: Optional[str] = None,
+    start: Optional[datetime.date] = None,
+    end: Optional[datetime.date] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Score statistics per role, domain or mode, weakest (lowest average) first unless
+    order=desc. Same filters as /analytics/trend.
+    """
+    groups = await analytics.breakdown(db, by, order, limit, role=role, domain=domain, mode=mode,
+                                       start=start, end=end)
+    return {"by": by, "groups": groups}
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus scrape endpoint"""
+    payload, content_type = metrics_payload()
+    return Response(payload, media_type=content_type)
+
+@app.get("/cache/stats")
+def cache_stats():
+    """Hit/miss/eviction counters for the evaluation cache and the semantic (near-duplicate) cache"""
+    return {**evaluation_cache.stats(), "semantic": semantic_cache.stats()}
+
+@app.get("/db/stats")
+def db_stats():
+    """Connection pool status and write-behind buffer counters"""
+    return {"pool": async_engine.pool.status(), "write_behind": {"enabled": EVAL_WRITE_BEHIND, **write_buffer.stats()}}
+
+@app.get("/llm/stats")
+def llm_stats():
+    """LLM gateway counters: calls, retries, 429s, coalesced requests and rate-limit waits"""
+    return llm.gateway.stats()
+
+@app.get("/pool/stats")
+def pool_stats():
+    """Pre-generated question pool: buffer depths and refill lag"""
+    return {"source": QUESTION_SOURCE, **question_pool.stats()}
@@ -0,0 +1,165 @@
+"""
+Prometheus metrics and a lightweight span API.
+
+    with span("llm.parse"):
+        data = json.loads(text)
+
+A span records its duration in the stage_duration_seconds histogram and, inside an
+HTTP request, in that request's Server-Timing header (durations summed per stage), so
+one response shows where its time went. MetricsMiddleware times every request per
+route template; the counters kept by the caches, the gateway and the buffers are
+exported through StatsCollector when /metrics is scraped.
+
+With several worker processes, backend/serve.py sets PROMETHEUS_MULTIPROC_DIR before
+starting them: every worker then writes its histogram and counter samples to files in
+that directory, and /metrics sums them across workers, whichever worker answers the
+scrape. The StatsCollector gauges are in-process counters and stay per worker; in that
+mode they carry a `pid` label naming the worker that answered.
+"""
+import contextvars
+import os
+import time
+from contextlib import contextmanager
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client import multiprocess
+from prometheus_client.core import GaugeMetricFamily
+
+# prometheus_client also reads this at import to decide where samples are kept
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+TOKEN_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+
+REQUEST_LATENCY = Histogram("http_request_duration_seconds", "HTTP request latency, until the last body chunk",
+                            ["method", "route", "status"], buckets=LATENCY_BUCKETS)
+STAGE_LATENCY = Histogram("stage_duration_seconds", "Duration of instrumented stages (spans)",
+                          ["stage"], buckets=LATENCY_BUCKETS)
+DB_QUERY_LATENCY = Histogram("db_query_duration_seconds", "SQL statement execution time",
+                             ["statement"], buckets=LATENCY_BUCKETS)
+LLM_LATENCY = Histogram("llm_request_duration_seconds", "Upstream LLM call latency per attempt",
+                        ["model", "outcome"], buckets=LATENCY_BUCKETS)
+# llm_tokens_sum is the total token usage
+LLM_TOKENS = Histogram("llm_tokens", "Tokens per LLM call, from the response usage",
+                       ["model", "kind"], buckets=TOKEN_BUCKETS)
+ANSWER_TOKENS_SAVED = Histogram("answer_tokens_saved", "Answer tokens removed from the prompt by compaction/summarization",
+                                buckets=(0, 16, 64, 256, 1024, 4096, 16384, 65536))
+ANSWER_PREPROCESSING = Counter("answer_preprocessing", "Answers compacted, summarized or truncated", ["step"])
+EVAL_FALLBACKS = Counter("evaluation_fallbacks", "Evaluations answered with the unscored fallback", ["reason"])
+
+_request_spans = contextvars.ContextVar("request_spans", default=None)
+
+
+@contextmanager
+def span(stage):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - started)
+
+
+def record_stage(stage, seconds):
+    STAGE_LATENCY.labels(stage).observe(seconds)
+    _add_to_request(stage, seconds)
+
+
+def record_query(statement, seconds):
+    verb = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else "other"
+    DB_QUERY_LATENCY.labels(verb).observe(seconds)
+    _add_to_request(f"db.{verb}", seconds)
+
+
+def _add_to_request(stage, seconds):
+    spans = _request_spans.get()
+    if spans is not None:
+        spans[stage] = spans.get(stage, 0.0) + seconds
+
+
+def record_llm_usage(model, usage):
+    if usage is None:
+        return
+    for kind, value in (("prompt", usage.prompt_tokens), ("completion", usage.completion_tokens)):
+        if value:
+            LLM_TOKENS.labels(model, kind).observe(value)
+
+
+def server_timing(spans):
+    return ", ".join(f"{stage.replace('.', '-')};dur={seconds * 1000:.1f}" for stage, seconds in spans.items())
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing each request per route template (not raw path, to keep label
+    cardinality bounded) until its last body chunk, so streamed responses count in full.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        started = time.perf_counter()
+        spans = {}
+        token = _request_spans.set(spans)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if spans:
+                    message["headers"] = [*message.get("headers", []),
+                                          (b"server-timing", server_timing(spans).encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_spans.reset(token)
+            route = scope.get("route")
+            REQUEST_LATENCY.labels(scope["method"], route.path if route else "unmatched",
+                                   str(status)).observe(time.perf_counter() - started)
+
+
+class StatsCollector:
+    """
+    Exports the numeric fields of existing stats() dicts as gauges at scrape time,
+    e.g. {"evaluation_cache": evaluation_cache.stats} -> evaluation_cache_hit_ratio.
+    """
+
+    def __init__(self, sources, labels=None):
+        self.sources = sources
+        self.labels = labels or {}
+
+    def collect(self):
+        for prefix, stats in self.sources.items():
+            for key, value in stats().items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    gauge = GaugeMetricFamily(f"{prefix}_{key}", f"{prefix} {key.replace('_', ' ')}",
+                                              labels=list(self.labels))
+                    gauge.add_metric(list(self.labels.values()), value)
+                    yield gauge
+
+
+def scrape_registry():
+    """The registry /metrics serves: the process's own, or one merging every worker's files."""
+    if not MULTIPROC_DIR:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+SCRAPE_REGISTRY = scrape_registry()
+
+
+def register_stats(sources):
+    """Export stats() dicts on /metrics (see StatsCollector), labelled per worker in multiprocess mode."""
+    labels = {"pid": str(os.getpid())} if MULTIPROC_DIR else None
+    SCRAPE_REGISTRY.register(StatsCollector(sources, labels))
+
+
+def metrics_payload():
+    return generate_latest(SCRAPE_REGISTRY), CONTENT_TYPE_LATEST
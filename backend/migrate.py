@@ -0,0 +1,27 @@
+"""
+One-shot schema migration: create missing tables, add columns and indexes introduced
+since the database was created. Safe to run repeatedly.
+
+    python -m backend.migrate
+
+Run it once per deploy before starting the workers (backend/serve.py does this) instead
+of letting every worker race on schema creation at startup.
+"""
+import argparse
+import time
+
+from backend.models import engine, init_db
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.parse_args()
+
+    started = time.perf_counter()
+    init_db()
+    print(f"Schema up to date on {engine.url.render_as_string(hide_password=True)} "
+          f"({time.perf_counter() - started:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
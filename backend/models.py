@@ -1,18 +1,96 @@
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Float
+from sqlalchemy import create_engine, event, inspect, text, Column, Integer, String, Text, Date, DateTime, Float, Index, JSON
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import datetime
 import os
-from dotenv import load_dotenv
+import time
+import uuid
+from backend.metrics import record_query
 
-load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")  # PostgreSQL URL
+# Create/upgrade the schema on app startup. Fine for a single process; multi-worker
+# deployments (backend/serve.py) run `python -m backend.migrate` once and turn this off.
+DB_AUTO_MIGRATE = os.getenv("DB_AUTO_MIGRATE", "1").lower() in ("1", "true", "yes")
+
+# Connection pool settings (ignored for in-memory SQLite, which uses a single static connection)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds; -1 disables
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1").lower() in ("1", "true", "yes")
+
+# Applied to every new SQLite connection: WAL lets readers run alongside the writer,
+# NORMAL sync is durable under WAL except on power loss, busy_timeout waits out lock contention
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "cache_size": -20000,  # KiB
+    "temp_store": "MEMORY",
+    "foreign_keys": "ON",
+}
+
+# Async drivers used by the request path (the sync engine is kept for create_all / scripts)
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+def to_async_url(url):
+    """Map a sync DATABASE_URL (sqlite://, postgresql://) onto its asyncio driver."""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if url.get_driver_name() in ("aiosqlite", "asyncpg") or backend not in ASYNC_DRIVERS:
+        return url
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+def engine_options(url):
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # per-statement timing for /metrics (db_query_duration_seconds) and the Server-Timing header
+    record_query(statement, time.perf_counter() - context._query_started)
 
 Base = declarative_base()
-engine = create_engine(DATABASE_URL)
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
 SessionLocal = sessionmaker(bind=engine)
 
+async_engine = create_async_engine(to_async_url(DATABASE_URL), **engine_options(DATABASE_URL))
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+if engine.dialect.name == "sqlite":
+    event.listen(engine, "connect", set_sqlite_pragmas)
+    event.listen(async_engine.sync_engine, "connect", set_sqlite_pragmas)
+for _engine in (engine, async_engine.sync_engine):
+    event.listen(_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(_engine, "after_cursor_execute", after_cursor_execute)
+
+async def get_db():
+    """Request-scoped session for FastAPI routes (Depends(get_db)); closed and rolled back even if the route raises."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
 class InterviewSession(Base):
     __tablename__ = "sessions"
     id = Column(Integer, primary_key=True, index=True)
@@ -24,9 +102,107 @@ class InterviewSession(Base):
     score = Column(Float)
     feedback = Column(Text)
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    # Set when the answer belongs to an interview (PATCH /interviews/{id}/answers/{i})
+    interview_id = Column(String(32), nullable=True)
+    question_index = Column(Integer, nullable=True)
 
-def init_db():
-    Base.metadata.create_all(bind=engine)
+    # Back the keyset pagination on (created_at, id) used by GET /sessions, alone and
+    # behind the role/domain/mode filters: each filter combination has an index whose
+    # equality prefix it matches (or extends, e.g. role+mode walks the role index), so pages
+    # are read in order instead of sorting every matching row. Score ranges are checked
+    # while walking whichever index the role/domain/mode filters pick.
+    __table_args__ = (
+        Index("ix_sessions_created_at_id", "created_at", "id"),
+        Index("ix_sessions_role_domain_mode_created_at", "role", "domain", "mode", "created_at", "id"),
+        Index("ix_sessions_role_domain_created_at", "role", "domain", "created_at", "id"),
+        Index("ix_sessions_role_created_at", "role", "created_at", "id"),
+        Index("ix_sessions_domain_created_at", "domain", "created_at", "id"),
+        Index("ix_sessions_mode_created_at", "mode", "created_at", "id"),
+        Index("ix_sessions_interview", "interview_id", "question_index"),
+    )
 
-# Create tables automatically
-init_db()
+class Interview(Base):
+    """One interview run: its questions, the answer to each, and running aggregates (see backend/interviews.py)."""
+    __tablename__ = "interviews"
+    id = Column(String(32), primary_key=True, default=lambda: uuid.uuid4().hex)
+    role = Column(String)
+    domain = Column(String)
+    mode = Column(String)
+    user_id = Column(String, nullable=True)
+    questions = Column(JSON)  # question dicts, in order
+    answers = Column(JSON)    # per question: None or {"answer", "skipped", "eval", "answered_at"}
+    summary = Column(JSON)    # backend/interview_summary.py aggregates
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+    # Bumped on every update, which only applies if the version is still the one read
+    # (UPDATE ... WHERE id = ? AND version = ?), so concurrent writers can't overwrite each other
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    __mapper_args__ = {"version_id_col": version}
+
+class SessionRollup(Base):
+    """
+    Daily per-(role, domain, mode) aggregates of scored sessions, kept up to date on every
+    sessions insert/update/delete (see backend/analytics.py) so /analytics reads buckets, not rows.
+    """
+    __tablename__ = "session_rollups"
+    day = Column(Date, primary_key=True)
+    role = Column(String, primary_key=True)
+    domain = Column(String, primary_key=True)
+    mode = Column(String, primary_key=True)
+    n = Column(Integer, nullable=False, default=0)               # scored sessions
+    score_sum = Column(Float, nullable=False, default=0.0)
+    score_sq_sum = Column(Float, nullable=False, default=0.0)    # for the standard deviation
+
+    __table_args__ = (
+        Index("ix_session_rollups_filters", "role", "domain", "mode", "day"),
+    )
+
+class GeneratedQuestion(Base):
+    """LLM-generated question kept in the pre-generated pool (see backend/question_pool.py)."""
+    __tablename__ = "generated_questions"
+    id = Column(Integer, primary_key=True)
+    role = Column(String)
+    domain = Column(String)
+    mode = Column(String)
+    question = Column(Text)
+    type = Column(String)
+    difficulty = Column(String)
+    hint = Column(Text)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    served_at = Column(DateTime, nullable=True)  # NULL while still in the pool
+
+    __table_args__ = (
+        Index("ix_generated_questions_pool", "role", "domain", "mode", "served_at"),
+    )
+
+class EvaluationCacheEntry(Base):
+    """Persistent tier of the evaluation cache (see backend/cache.py)."""
+    __tablename__ = "evaluation_cache"
+    key = Column(String(64), primary_key=True)
+    result = Column(Text)  # JSON-encoded evaluation
+    created_at = Column(DateTime, default=datetime.datetime.utcnow, index=True)
+
+# Columns added to existing tables after they were first created; create_all won't add them
+ADDED_COLUMNS = {
+    "sessions": {"interview_id": "VARCHAR(32)", "question_index": "INTEGER"},
+    "interviews": {"version": "INTEGER NOT NULL DEFAULT 1"},
+}
+
+def add_missing_columns(conn):
+    """Lightweight migration: ALTER TABLE ... ADD COLUMN for each ADDED_COLUMNS entry the table lacks."""
+    for table, columns in ADDED_COLUMNS.items():
+        existing = {column["name"] for column in inspect(conn).get_columns(table)}
+        for name, ddl in columns.items():
+            if name not in existing:
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}"))
+
+def init_db():
+    """Create missing tables, columns and indexes. Idempotent; see backend/migrate.py."""
+    with engine.begin() as conn:
+        Base.metadata.create_all(bind=conn)
+        add_missing_columns(conn)
+        # create_all skips existing tables, so add indexes introduced after a table was created
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=conn, checkfirst=True)
@@ -0,0 +1,194 @@
+"""
+Offline (no-LLM) answer scorer: the heuristic behind Mock Mode, plus a batch engine for
+grading large practice datasets.
+
+mock_evaluate_answer scores one answer and is what the Streamlit app calls.
+score_batch/evaluate_batch produce identical results for many answers at once. This
+is a batched loop, not vectorized matching: the features are still extracted per
+answer in Python (each answer lower-cased once and checked against the term tuple),
+because for a handful of literal terms CPython's substring search beats a regex
+alternation and NumPy's string functions (which convert to fixed-width UTF-32 first).
+Only the score arithmetic runs on NumPy arrays, so the gain over per-call scoring is
+modest (~1.3x). score_jsonl reuses pre-serialized JSON for the 8 possible non-score
+variants and can spread chunks over a process pool; --workers is capped at the CPU
+cores this process may use, since on a single core the pool only adds pickling and
+is slower than scoring in-process.
+
+    python -m backend.offline_scorer answers.jsonl scored.jsonl --workers 4
+
+Input lines are JSON objects with "answer" (and optionally "id", "question", "mode");
+each output line is {"id": ..., <evaluation>} in input order. Use "-" for stdin/stdout.
+Deliberately free of database/LLM imports so the frontend can use it directly.
+"""
+import argparse
+import json
+import os
+import sys
+from multiprocessing import Pool
+
+import numpy as np
+
+KEY_TERMS = ["complexity","time","space","edge case","scalable","tests","trade-off","STAR","impact"]
+
+def mock_evaluate_answer(question_text, answer_text, mode):
+    score = 4.0
+    words = answer_text.strip().split()
+    if len(words) > 15: score += 2.0
+    if len(words) > 60: score += 2.0
+    key_terms = KEY_TERMS
+    matches = sum(1 for k in key_terms if k in answer_text.lower())
+    score += min(matches, 2)
+    score = max(0, min(10, score))
+    strengths = ["Good detail and explanation"] if len(words) > 15 else []
+    weaknesses = ["Answer too short — add more specifics"] if len(words) <= 15 else []
+    strengths += ["Used relevant keywords"] if matches else []
+    weaknesses += ["Missing technical keywords or trade-offs"] if not matches else []
+    feedback = "Nice attempt. " + ("Expand with edge-cases and complexity analysis." if "complexity" not in answer_text.lower() else "Good complexity analysis.")
+    suggested = "Mention time/space complexity and give one edge-case or test example."
+    resources = ["Cracking the Coding Interview (book)", "System Design Primer (GitHub)"]
+    return {
+        "score": round(score,1),
+        "strengths": strengths,
+        "weaknesses": weaknesses,
+        "feedback": feedback,
+        "suggested_improvement": suggested,
+        "resources": resources
+    }
+
+# ----------------- Batch engine -----------------
+# mock_evaluate_answer matches terms against the lower-cased answer, so a term with
+# capitals ("STAR") can never match; leaving it out keeps parity.
+MATCHABLE_TERMS = tuple(k for k in KEY_TERMS if k == k.lower())
+COMPLEXITY_INDEX = MATCHABLE_TERMS.index("complexity")
+SUGGESTED = "Mention time/space complexity and give one edge-case or test example."
+RESOURCES = ["Cracking the Coding Interview (book)", "System Design Primer (GitHub)"]
+
+
+def score_batch(answers):
+    """
+    Features and scores for a list of answer strings, as NumPy arrays:
+    words, matches (distinct key terms), has_complexity and score.
+    Word counts and term matches are computed per answer in Python; the score is array math.
+    """
+    n = len(answers)
+    terms = MATCHABLE_TERMS
+    words = np.fromiter(map(len, map(str.split, answers)), dtype=np.int64, count=n)
+    present = np.array([[term in lowered for term in terms] for lowered in map(str.lower, answers)],
+                       dtype=bool).reshape(n, len(terms))
+    matches = present.sum(axis=1)
+
+    score = 4.0 + 2.0 * (words > 15) + 2.0 * (words > 60) + np.minimum(matches, 2)
+    return {
+        "words": words,
+        "matches": matches,
+        "has_complexity": present[:, COMPLEXITY_INDEX],
+        "score": np.round(np.clip(score, 0, 10), 1),
+    }
+
+
+def _variant(detailed, matched, complexity):
+    """The non-score part of an evaluation; only 8 combinations exist."""
+    return {
+        "strengths": (["Good detail and explanation"] if detailed else []) + (["Used relevant keywords"] if matched else []),
+        "weaknesses": ([] if detailed else ["Answer too short — add more specifics"]) + ([] if matched else ["Missing technical keywords or trade-offs"]),
+        "feedback": "Nice attempt. " + ("Good complexity analysis." if complexity else "Expand with edge-cases and complexity analysis."),
+        "suggested_improvement": SUGGESTED,
+        "resources": RESOURCES,
+    }
+
+
+VARIANTS = {(d, m, c): _variant(d, m, c) for d in (False, True) for m in (False, True) for c in (False, True)}
+# Pre-serialized JSON for each variant, so JSONL output only formats the id and score
+VARIANT_JSON = {key: json.dumps(value, ensure_ascii=False)[1:-1] for key, value in VARIANTS.items()}
+
+
+def evaluate_batch(answers):
+    """Evaluations for many answers; element i equals mock_evaluate_answer(..., answers[i], ...)."""
+    f = score_batch(answers)
+    out = []
+    for score, words, matches, complexity in zip(f["score"].tolist(), f["words"].tolist(),
+                                                 f["matches"].tolist(), f["has_complexity"].tolist()):
+        variant = VARIANTS[(words > 15, matches > 0, complexity)]
+        out.append({
+            "score": score,
+            "strengths": list(variant["strengths"]),
+            "weaknesses": list(variant["weaknesses"]),
+            "feedback": variant["feedback"],
+            "suggested_improvement": variant["suggested_improvement"],
+            "resources": list(variant["resources"]),
+        })
+    return out
+
+
+def score_lines(lines):
+    """Score a chunk of JSONL input lines; returns the matching JSONL output text."""
+    records = [json.loads(line) for line in lines]
+    f = score_batch([r.get("answer") or "" for r in records])
+    out = []
+    for record, score, words, matches, complexity in zip(records, f["score"].tolist(), f["words"].tolist(),
+                                                         f["matches"].tolist(), f["has_complexity"].tolist()):
+        out.append('{"id": %s, "score": %r, %s}\n' % (
+            json.dumps(record.get("id")), score, VARIANT_JSON[(words > 15, matches > 0, complexity)]))
+    return "".join(out)
+
+
+def _chunks(stream, size):
+    chunk = []
+    for line in stream:
+        if line.strip():
+            chunk.append(line)
+            if len(chunk) == size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def usable_cores():
+    """CPU cores this process may run on (its affinity mask where the OS has one)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def score_jsonl(src, dst, batch_size=10_000, workers=1):
+    """
+    Stream JSONL answers from src to scored JSONL in dst, in order; returns the number scored.
+    `workers` is capped at usable_cores(); with one, chunks are scored in this process.
+    """
+    count = 0
+    workers = min(workers, usable_cores())
+    if workers > 1:
+        with Pool(workers) as pool:
+            for chunk_out in pool.imap(score_lines, _chunks(src, batch_size)):
+                dst.write(chunk_out)
+                count += chunk_out.count("\n")
+    else:
+        for chunk in _chunks(src, batch_size):
+            dst.write(score_lines(chunk))
+            count += len(chunk)
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="JSONL file of answers, or - for stdin")
+    parser.add_argument("output", help="JSONL file for the evaluations, or - for stdout")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    src = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    dst = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        count = score_jsonl(src, dst, args.batch_size, args.workers)
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if dst is not sys.stdout:
+            dst.close()
+    print(f"Scored {count} answers", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Minimal streaming PDF writer. Unlike reportlab's canvas, which keeps the whole document
+until save(), each page is serialized as soon as it is full, so memory stays constant
+however many pages are written; only the byte offsets of objects are kept for the
+final xref table. Text uses the standard Helvetica fonts and is wrapped to the page
+width using reportlab's font metrics, with per-word widths cached (reportlab's own
+stringWidth is pure Python without its optional C accelerator).
+
+Deliberately free of database/LLM imports so the frontend can use it directly.
+"""
+import zlib
+
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfbase import pdfmetrics
+
+FONTS = {"Helvetica": b"F1", "Helvetica-Bold": b"F2"}
+# Object numbers 1-4 are fixed; pages and their content streams are numbered from 5 on
+CATALOG, PAGES, FONT_REGULAR, FONT_BOLD = 1, 2, 3, 4
+
+
+_WORD_WIDTHS = {font: {} for font in FONTS}  # font -> word -> width in 1/1000 em
+WORD_CACHE_MAX = 50_000
+
+
+def _word_width(word, font):
+    cache = _WORD_WIDTHS[font]
+    width = cache.get(word)
+    if width is None:
+        widths = pdfmetrics.getFont(font).widths  # indexed by WinAnsi code
+        width = sum(widths[b] for b in word.encode("cp1252", errors="replace"))
+        if len(cache) < WORD_CACHE_MAX:
+            cache[word] = width
+    return width
+
+
+def wrap(text, font, size, max_width):
+    """Greedy word wrap to max_width points; words wider than a line are split."""
+    limit = max_width * 1000 / size
+    space = _word_width(" ", font)
+    lines, line, used = [], [], 0
+    for word in str(text).split():
+        width = _word_width(word, font)
+        while width > limit:
+            # hard-split an over-long word
+            cut = len(word)
+            while cut > 1 and _word_width(word[:cut], font) > limit:
+                cut = max(1, cut * 3 // 4)
+            if line:
+                lines.append(" ".join(line))
+                line, used = [], 0
+            lines.append(word[:cut])
+            word = word[cut:]
+            width = _word_width(word, font)
+        needed = width + (space if line else 0)
+        if line and used + needed > limit:
+            lines.append(" ".join(line))
+            line, used = [word], width
+        else:
+            line.append(word)
+            used += needed
+    if line:
+        lines.append(" ".join(line))
+    return lines
+
+
+def _escape(text):
+    data = text.encode("cp1252", errors="replace")  # WinAnsiEncoding
+    return data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+class StreamingPDFWriter:
+    """
+    Usage: each call returns the bytes to append to the output (possibly empty).
+
+        pdf = StreamingPDFWriter()
+        yield pdf.begin()
+        yield pdf.text("Title", "Helvetica-Bold", 16)
+        yield pdf.text(long_text, size=10, indent=10)
+        yield pdf.finish()
+    """
+
+    def __init__(self, pagesize=letter, margin=40, compress=True):
+        self.width, self.height = pagesize
+        self.margin = margin
+        self.compress = compress
+        self._offset = 0
+        self._offsets = {}
+        self._next_obj = 5
+        self._page_ids = []
+        self._ops = []
+        self._y = self.height - margin
+
+    def _object(self, number, body):
+        self._offsets[number] = self._offset
+        data = b"%d 0 obj\n" % number + body + b"\nendobj\n"
+        self._offset += len(data)
+        return data
+
+    def begin(self):
+        header = b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"
+        self._offset = len(header)
+        out = [header, self._object(CATALOG, b"<< /Type /Catalog /Pages 2 0 R >>")]
+        for number, name in ((FONT_REGULAR, b"Helvetica"), (FONT_BOLD, b"Helvetica-Bold")):
+            out.append(self._object(number, b"<< /Type /Font /Subtype /Type1 /BaseFont /" + name +
+                                    b" /Encoding /WinAnsiEncoding >>"))
+        return b"".join(out)
+
+    def text(self, text, font="Helvetica", size=10, indent=0, space_after=4):
+        """Add wrapped text; returns the bytes of any pages that filled up."""
+        out = []
+        leading = size * 1.25
+        lines = wrap(text, font, size, self.width - 2 * self.margin - indent) or [""]
+        for line in lines:
+            if self._y - leading < self.margin:
+                out.append(self.page_break())
+            self._y -= leading
+            self._ops.append(b"BT /%s %g Tf %g %g Td (%s) Tj ET" % (
+                FONTS[font], size, self.margin + indent, self._y, _escape(line)))
+        self._y -= space_after
+        return b"".join(out)
+
+    def space(self, points):
+        self._y -= points
+        return b""
+
+    def page_break(self):
+        """Finish the current page and return its bytes."""
+        content = b"\n".join(self._ops)
+        self._ops = []
+        self._y = self.height - self.margin
+        page_id, content_id = self._next_obj, self._next_obj + 1
+        self._next_obj += 2
+        self._page_ids.append(page_id)
+        if self.compress:
+            content = zlib.compress(content)
+            stream = b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(content) + content + b"\nendstream"
+        else:
+            stream = b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream"
+        page = (b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %g %g] /Contents %d 0 R "
+                b"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> >>" % (self.width, self.height, content_id))
+        return self._object(page_id, page) + self._object(content_id, stream)
+
+    def finish(self):
+        out = []
+        if self._ops or not self._page_ids:
+            out.append(self.page_break())
+        kids = b" ".join(b"%d 0 R" % i for i in self._page_ids)
+        out.append(self._object(PAGES, b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % len(self._page_ids)))
+        xref_offset = self._offset
+        size = self._next_obj
+        xref = [b"xref\n0 %d\n" % size, b"0000000000 65535 f \n"]
+        for number in range(1, size):
+            xref.append(b"%010d 00000 n \n" % self._offsets[number])
+        xref.append(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, xref_offset))
+        out.append(b"".join(xref))
+        return b"".join(out)
+
+
+def session_pdf_bytes(session_meta, qa_list):
+    """One interview's summary (the frontend's "Download PDF summary"), with answers and feedback wrapped in full."""
+    pdf = StreamingPDFWriter()
+    out = [pdf.begin()]
+    out.append(pdf.text(f"Interview Summary — {session_meta['role']} ({session_meta['mode']})", "Helvetica-Bold", 16, space_after=8))
+    out.append(pdf.text(f"Domain: {session_meta['domain']}   Questions: {len(qa_list)}   Avg score: {session_meta.get('avg_score','-')}",
+                        size=11, space_after=10))
+    for i, item in enumerate(qa_list, start=1):
+        evals = item.get('eval', {}) or {}
+        out.append(pdf.text(f"Q{i}: {item['question']}", "Helvetica-Bold", 12, space_after=2))
+        out.append(pdf.text("Answer: " + (item.get('answer', '(skipped)') or '(skipped)'), size=10, indent=10, space_after=2))
+        score = evals.get('score')
+        out.append(pdf.text(f"Score: {'-' if score is None else score}  Feedback: {evals.get('feedback','')}", size=10, indent=10, space_after=12))
+    out.append(pdf.finish())
+    return b"".join(out)
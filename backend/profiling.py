@@ -0,0 +1,55 @@
+"""
+Per-request sampling profiler (pyinstrument), for finding where a slow request spends
+its time in production-like runs.
+
+Enabled with PROFILING_ENABLED=1; then a request carrying an `X-Profile` header is run
+under the profiler and answered with the profile instead of its normal response:
+`X-Profile: html` (default) for the interactive report, `X-Profile: text` for a call
+tree. Requests without the header are not affected. pyinstrument is an optional
+dependency, only imported when a profiled request arrives.
+
+    curl -H "X-Profile: text" -X POST localhost:8000/evaluate -d '{...}' -H "Content-Type: application/json"
+"""
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0").lower() in ("1", "true", "yes")
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "1"))
+
+
+class ProfilerMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        mode = dict(scope["headers"]).get(b"x-profile")
+        if mode is None:
+            return await self.app(scope, receive, send)
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            logger.warning("X-Profile requested but pyinstrument is not installed")
+            return await self.app(scope, receive, send)
+
+        async def discard(message):
+            # the profiled response is replaced by the report
+            pass
+
+        profiler = Profiler(interval=PROFILE_INTERVAL_MS / 1000, async_mode="enabled")
+        profiler.start()
+        try:
+            await self.app(scope, receive, discard)
+        finally:
+            profiler.stop()
+
+        if mode.strip().lower() == b"text":
+            body, content_type = profiler.output_text(unicode=True).encode(), b"text/plain; charset=utf-8"
+        else:
+            body, content_type = profiler.output_html().encode(), b"text/html; charset=utf-8"
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", content_type), (b"content-length", str(len(body)).encode())]})
+        await send({"type": "http.response.body", "body": body})
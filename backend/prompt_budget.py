@@ -0,0 +1,127 @@
+"""
+Token budget for evaluation prompts.
+
+Answers are compacted (whitespace, boilerplate lines, repeated paragraphs) before they
+are embedded in the prompt. If an answer is still longer than EVAL_MAX_ANSWER_TOKENS,
+llm.prepare_answer splits it with chunk_text and has the cheaper EVAL_SUMMARY_MODEL
+condense each chunk. The evaluation's max_tokens is sized from the per-field
+budgets that the prompt asks the model to respect.
+"""
+import os
+import re
+
+from backend.tokens import count_tokens
+
+EVAL_MAX_ANSWER_TOKENS = int(os.getenv("EVAL_MAX_ANSWER_TOKENS", "1500"))
+EVAL_MAX_ANSWER_CHARS = int(os.getenv("EVAL_MAX_ANSWER_CHARS", "200000"))  # request validation limit
+EVAL_MAX_QUESTION_CHARS = int(os.getenv("EVAL_MAX_QUESTION_CHARS", "2000"))
+EVAL_SUMMARY_MODEL = os.getenv("EVAL_SUMMARY_MODEL", "gpt-4o-mini")
+EVAL_SUMMARY_CHUNK_TOKENS = int(os.getenv("EVAL_SUMMARY_CHUNK_TOKENS", "2000"))
+EVAL_SUMMARY_MAX_CHUNKS = int(os.getenv("EVAL_SUMMARY_MAX_CHUNKS", "12"))
+
+# Output tokens per field of the evaluation JSON; the prompt states the matching limits
+LIST_ITEMS = 3
+RESPONSE_FIELD_BUDGETS = {
+    "score": 4,
+    "strengths": LIST_ITEMS * 25,
+    "weaknesses": LIST_ITEMS * 25,
+    "feedback": 120,                # ~80 words
+    "suggested_improvement": 210,   # ~150 words
+    "resources": LIST_ITEMS * 25,
+}
+JSON_OVERHEAD_TOKENS = 8  # key, quotes and punctuation per field
+
+
+def response_max_tokens():
+    """max_tokens for an evaluation: the field budgets plus JSON syntax, with 25% headroom."""
+    budget = sum(RESPONSE_FIELD_BUDGETS.values()) + JSON_OVERHEAD_TOKENS * len(RESPONSE_FIELD_BUDGETS)
+    return int(budget * 1.25)
+
+
+_GREETING = re.compile(r"^(hi|hello|hey|dear)\b[\s,!:]*(\w+[\s,.!:]*){0,3}$", re.IGNORECASE)
+_SIGN_OFF = re.compile(
+    r"^(thanks|thank you|many thanks|best|best regards|kind regards|regards|cheers|sincerely"
+    r"|i hope (this|that) helps|hope (this|that) helps|let me know if you have (any )?(other |more )?questions)"
+    r"[\s,.!]*(\w+[\s,.!]*){0,2}$",
+    re.IGNORECASE,
+)
+_NAME = re.compile(r"^\w+([ .-]\w+){0,2}\.?$")
+_FILLER = re.compile(r"^(as an ai( language model)?\b.*|[-=_*~#.]{3,})$", re.IGNORECASE)
+_INVISIBLE = re.compile("[\u200b\u200c\u200d\u2060\ufeff]")
+_INLINE_SPACE = re.compile(r"(?<=\S)[ \t\u00a0]+")
+
+
+def _strip_greeting_and_sign_off(lines):
+    lines = list(lines)
+    while lines and not lines[0].strip():
+        lines.pop(0)
+    if lines and _GREETING.match(lines[0].strip()):
+        lines.pop(0)
+    while True:
+        while lines and not lines[-1].strip():
+            lines.pop()
+        if not lines:
+            break
+        last = lines[-1].strip()
+        previous = next((line.strip() for line in reversed(lines[:-1]) if line.strip()), "")
+        if _SIGN_OFF.match(last):
+            lines.pop()
+        elif _NAME.match(last) and _SIGN_OFF.match(previous):
+            lines.pop()  # the name under a sign-off; the sign-off goes next round
+        else:
+            break
+    return lines
+
+
+def compact_answer(text):
+    """
+    Drop what costs tokens but carries no content: zero-width characters, runs of
+    spaces (leading indentation is kept for code), an opening greeting, closing
+    sign-offs, separator lines, and paragraphs repeated verbatim.
+    """
+    text = _INVISIBLE.sub("", text).replace("\r\n", "\n").replace("\r", "\n")
+    lines = _strip_greeting_and_sign_off(text.split("\n"))
+    paragraphs, seen = [], set()
+    for paragraph in re.split(r"\n\s*\n", "\n".join(lines)):
+        kept = []
+        for line in paragraph.split("\n"):
+            line = _INLINE_SPACE.sub(" ", line.rstrip())
+            if line.strip() and not _FILLER.match(line.strip()):
+                kept.append(line)
+        if not kept:
+            continue
+        block = "\n".join(kept)
+        fingerprint = " ".join(block.split()).casefold()
+        if fingerprint in seen:
+            continue
+        seen.add(fingerprint)
+        paragraphs.append(block)
+    return "\n\n".join(paragraphs)
+
+
+def chunk_text(text, chunk_tokens=EVAL_SUMMARY_CHUNK_TOKENS):
+    """
+    Split text into pieces of at most ~chunk_tokens tokens, preferring paragraph, then
+    sentence, then word boundaries.
+    """
+    chunks, current, used = [], [], 0
+
+    def pieces(block, separators):
+        if count_tokens(block) <= chunk_tokens or not separators:
+            yield block
+            return
+        sep, rest = separators[0], separators[1:]
+        for part in re.split(sep, block):
+            if part.strip():
+                yield from pieces(part, rest)
+
+    for piece in pieces(text, [r"\n\s*\n", r"(?<=[.!?])\s+", r"\s+"]):
+        size = count_tokens(piece)
+        if current and used + size > chunk_tokens:
+            chunks.append(" ".join(current))
+            current, used = [], 0
+        current.append(piece)
+        used += size
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
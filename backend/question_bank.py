@@ -0,0 +1,135 @@
+"""
+Question store loaded once from a JSON file (backend/data/questions.json by default,
+override with QUESTION_BANK_PATH). Questions are deduplicated by normalized text
+within each (role, domain) and indexed by (role, domain, type, difficulty), so
+sampling a mixed-difficulty set costs O(n) random picks regardless of bank size.
+
+Deliberately free of database/LLM imports: the Streamlit frontend uses it directly.
+"""
+import json
+import os
+import random
+import re
+from collections import OrderedDict
+from pathlib import Path
+
+QUESTION_BANK_PATH = os.getenv("QUESTION_BANK_PATH", str(Path(__file__).parent / "data" / "questions.json"))
+DIFFICULTY_ORDER = ["easy", "medium", "hard"]
+SEEN_USERS_MAX = int(os.getenv("QUESTION_SEEN_USERS_MAX", "10000"))
+# Random probes per pick before falling back to a scan of the remaining candidates
+MAX_PROBES = 8
+
+_NON_WORD = re.compile(r"[^\w\s]")
+
+
+def normalize_question(text):
+    return " ".join(_NON_WORD.sub(" ", text.casefold()).split())
+
+
+class QuestionBank:
+    def __init__(self, questions):
+        self.questions = []
+        self._domains = {}      # role -> [domain, ...] in file order
+        self._by_key = {}       # (role, domain, type, difficulty) -> [question index]
+        self._by_difficulty = {}  # (role, domain) -> {difficulty: [question index]}
+        self._seen = OrderedDict()  # user_id -> set of question ids already served (LRU over users)
+        seen_text = set()
+        for q in questions:
+            role, domain = q["role"], q["domain"]
+            text_key = (role, domain, normalize_question(q["question"]))
+            if text_key in seen_text:
+                continue
+            seen_text.add(text_key)
+            index = len(self.questions)
+            self.questions.append(q)
+            domains = self._domains.setdefault(role, [])
+            if domain not in domains:
+                domains.append(domain)
+            self._by_key.setdefault((role, domain, q.get("type"), q.get("difficulty")), []).append(index)
+            self._by_difficulty.setdefault((role, domain), {}).setdefault(q.get("difficulty"), []).append(index)
+
+    @classmethod
+    def load(cls, path=QUESTION_BANK_PATH):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def __len__(self):
+        return len(self.questions)
+
+    def roles(self):
+        return list(self._domains)
+
+    def domains(self, role):
+        return list(self._domains.get(role, []))
+
+    def lookup(self, role, domain, type=None, difficulty=None):
+        """All questions for (role, domain), optionally narrowed to a type and/or difficulty."""
+        if type is not None and difficulty is not None:
+            return [self.questions[i] for i in self._by_key.get((role, domain, type, difficulty), [])]
+        buckets = self._by_difficulty.get((role, domain), {})
+        indices = buckets.get(difficulty, []) if difficulty is not None else [i for b in buckets.values() for i in b]
+        return [self.questions[i] for i in indices if type is None or self.questions[i].get("type") == type]
+
+    def sample(self, role, domain, n, user_id=None, rng=random):
+        """
+        Up to n distinct questions for (role, domain), cycling through difficulties
+        (easy, medium, hard, then anything else) so the set is mixed. Falls back to the
+        role's General domain like the original bank. With a user_id, questions already
+        served to that user are avoided until the pool runs out.
+        """
+        buckets = self._by_difficulty.get((role, domain)) or self._by_difficulty.get((role, "General")) or {}
+        if not buckets or n <= 0:
+            return []
+        order = [d for d in DIFFICULTY_ORDER if d in buckets] + [d for d in buckets if d not in DIFFICULTY_ORDER]
+        seen = self._seen_for(user_id)
+        chosen = []
+        chosen_ids = set()
+
+        for avoid_seen in (True, False):
+            exhausted = set()
+            while len(chosen) < n and len(exhausted) < len(order):
+                for difficulty in order:
+                    if len(chosen) >= n:
+                        break
+                    if difficulty in exhausted:
+                        continue
+                    pick = self._pick(buckets[difficulty], chosen_ids, seen if avoid_seen else (), rng)
+                    if pick is None:
+                        exhausted.add(difficulty)
+                        continue
+                    chosen.append(pick)
+                    chosen_ids.add(pick["id"])
+            if len(chosen) >= n or not seen:
+                break
+
+        if user_id is not None:
+            seen.update(chosen_ids)
+        return [dict(q) for q in chosen]
+
+    def _pick(self, bucket, chosen_ids, seen, rng):
+        for _ in range(MAX_PROBES):
+            q = self.questions[bucket[rng.randrange(len(bucket))]]
+            if q["id"] not in chosen_ids and q["id"] not in seen:
+                return q
+        remaining = [i for i in bucket if self.questions[i]["id"] not in chosen_ids and self.questions[i]["id"] not in seen]
+        return self.questions[rng.choice(remaining)] if remaining else None
+
+    def _seen_for(self, user_id):
+        if user_id is None:
+            return set()
+        seen = self._seen.pop(user_id, None) or set()
+        self._seen[user_id] = seen
+        while len(self._seen) > SEEN_USERS_MAX:
+            self._seen.popitem(last=False)
+        return seen
+
+
+_bank = None
+
+
+def get_question_bank():
+    """The process-wide bank, loaded on first use."""
+    global _bank
+    if _bank is None:
+        _bank = QuestionBank.load()
+    return _bank
@@ -0,0 +1,220 @@
+import asyncio
+import datetime
+import logging
+import os
+import time
+
+from sqlalchemy import func, select, update
+
+from backend import llm
+from backend.models import AsyncSessionLocal, GeneratedQuestion
+from backend.question_bank import get_question_bank, normalize_question
+from backend.shared_state import get_state
+
+logger = logging.getLogger(__name__)
+
+# "llm" serves /generate from the pre-generated pool, "bank" (default) from the static question bank
+QUESTION_SOURCE = os.getenv("QUESTION_SOURCE", "bank").lower()
+QUESTION_POOL_LOW = int(os.getenv("QUESTION_POOL_LOW", "5"))     # refill when a pool drops below this
+QUESTION_POOL_HIGH = int(os.getenv("QUESTION_POOL_HIGH", "20"))  # ...and top it up to this
+QUESTION_POOL_BATCH = int(os.getenv("QUESTION_POOL_BATCH", "5"))  # questions requested per LLM call
+QUESTION_POOL_WORKERS = int(os.getenv("QUESTION_POOL_WORKERS", "2"))
+QUESTION_POOL_PREFILL = os.getenv("QUESTION_POOL_PREFILL", "1").lower() in ("1", "true", "yes")
+REFILL_LEASE_TTL = 300  # seconds; a refill lease outlives a crashed worker by at most this
+MODES = ("Technical", "Behavioral")
+POOL_COLUMNS = (GeneratedQuestion.id, GeneratedQuestion.question, GeneratedQuestion.type,
+                GeneratedQuestion.difficulty, GeneratedQuestion.hint)
+
+
+class QuestionPool:
+    """
+    Pool of validated LLM-generated questions per (role, domain, mode), kept between the
+    low and high watermarks by background refill workers. pop() never waits on the LLM.
+
+    The generated_questions table is the pool, shared by every worker process: pop()
+    claims unserved rows with one UPDATE ... RETURNING (SKIP LOCKED on PostgreSQL), so
+    no two workers serve the same question, and the watermarks apply to the pool as a
+    whole. A refill only runs in the worker holding that key's lease in the shared state
+    backend (backend/shared_state.py), so generation isn't repeated per worker.
+    """
+
+    def __init__(self, low=QUESTION_POOL_LOW, high=QUESTION_POOL_HIGH, batch=QUESTION_POOL_BATCH,
+                 workers=QUESTION_POOL_WORKERS, generate=None, state=None):
+        self.low = low
+        self.high = high
+        self.batch = batch
+        self.workers = workers
+        self.generate = generate or llm.generate_llm_questions
+        self._state = state
+        self._depths = {}            # key -> unserved questions in the pool, as last seen by this worker
+        self._queue = asyncio.Queue()
+        self._queued = {}            # key -> monotonic time the refill was requested
+        self._tasks = []
+        self.generated = 0
+        self.rejected = 0
+        self.failures = 0
+        self.served = 0
+        self.refills = 0
+        self.skipped_refills = 0     # another worker held the lease
+        self.last_refill_lag = None
+        self.max_refill_lag = 0.0
+        self._total_refill_lag = 0.0
+
+    @property
+    def state(self):
+        if self._state is None:
+            self._state = get_state()
+        return self._state
+
+    async def start(self, prefill_keys=()):
+        for _ in range(self.workers):
+            self._tasks.append(asyncio.create_task(self._worker()))
+        for key in prefill_keys:
+            self._request_refill(key)
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def depth(self, role, domain, mode):
+        return self._depths.get((role, domain, mode), 0)
+
+    async def pop(self, role, domain, mode, n):
+        """
+        Up to n questions claimed from the pool (marked served in the same statement),
+        without waiting on the LLM; schedules a refill when the pool runs low.
+        """
+        key = (role, domain, mode)
+        candidates = (
+            select(GeneratedQuestion.id)
+            .where(*self._filters(key))
+            .order_by(GeneratedQuestion.id)
+            .limit(n)
+            .with_for_update(skip_locked=True)  # PostgreSQL; SQLite serializes writers anyway
+        )
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(
+                update(GeneratedQuestion)
+                .where(GeneratedQuestion.id.in_(candidates.scalar_subquery()), GeneratedQuestion.served_at.is_(None))
+                .values(served_at=datetime.datetime.utcnow())
+                .returning(*POOL_COLUMNS)
+                .execution_options(synchronize_session=False)
+            )).all()
+            await db.commit()
+            self._depths[key] = await self._count(db, key)
+        self.served += len(rows)
+        if self._depths[key] < self.low:
+            self._request_refill(key)
+        return [self._public(row) for row in sorted(rows, key=lambda row: row.id)]
+
+    def _request_refill(self, key):
+        if key not in self._queued:
+            self._queued[key] = time.monotonic()
+            self._queue.put_nowait(key)
+
+    async def _worker(self):
+        while True:
+            key = await self._queue.get()
+            try:
+                await self._refill(key)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.failures += 1
+                logger.exception("question pool refill failed for %s", key)
+            finally:
+                requested = self._queued.pop(key, None)
+                if requested is not None:
+                    self._record_lag(time.monotonic() - requested)
+
+    async def _refill(self, key):
+        lease = "pool:refill:" + "/".join(key)
+        if not await self._call_state(self.state.add, lease, "1", REFILL_LEASE_TTL):
+            self.skipped_refills += 1
+            return
+        try:
+            role, domain, mode = key
+            while True:
+                async with AsyncSessionLocal() as db:
+                    texts = (await db.execute(
+                        select(GeneratedQuestion.question).where(*self._filters(key)))).scalars().all()
+                self._depths[key] = len(texts)
+                if len(texts) >= self.high:
+                    break
+                candidates = await self.generate(role, domain, mode, self.batch)
+                known = {normalize_question(text) for text in texts}
+                fresh = []
+                for q in candidates:
+                    text_key = normalize_question(q["question"])
+                    if text_key in known:
+                        self.rejected += 1
+                        continue
+                    known.add(text_key)
+                    fresh.append(q)
+                if not fresh:
+                    break
+                await self._persist(key, fresh)
+                self.generated += len(fresh)
+            self.refills += 1
+        finally:
+            await self._call_state(self.state.delete, lease)
+
+    async def _call_state(self, method, *args):
+        if not self.state.shared:
+            return method(*args)
+        return await asyncio.to_thread(method, *args)
+
+    async def _persist(self, key, questions):
+        role, domain, mode = key
+        async with AsyncSessionLocal() as db:
+            db.add_all([GeneratedQuestion(role=role, domain=domain, mode=mode, **q) for q in questions])
+            await db.commit()
+
+    @staticmethod
+    def _filters(key):
+        role, domain, mode = key
+        return (GeneratedQuestion.role == role, GeneratedQuestion.domain == domain,
+                GeneratedQuestion.mode == mode, GeneratedQuestion.served_at.is_(None))
+
+    async def _count(self, db, key):
+        return (await db.execute(select(func.count()).select_from(GeneratedQuestion)
+                                 .where(*self._filters(key)))).scalar_one()
+
+    def _record_lag(self, lag):
+        self.last_refill_lag = lag
+        self.max_refill_lag = max(self.max_refill_lag, lag)
+        self._total_refill_lag += lag
+
+    @staticmethod
+    def _public(row):
+        return {"id": f"gen-{row.id}", "question": row.question, "type": row.type,
+                "difficulty": row.difficulty, "hint": row.hint}
+
+    def stats(self):
+        completed = self.refills + self.failures
+        return {
+            "buffers": {"/".join(key): depth for key, depth in self._depths.items()},
+            "low_watermark": self.low,
+            "high_watermark": self.high,
+            "refills_pending": len(self._queued),
+            "refills": self.refills,
+            "refills_skipped": self.skipped_refills,
+            "refill_failures": self.failures,
+            "generated": self.generated,
+            "rejected_duplicates": self.rejected,
+            "served": self.served,
+            "last_refill_lag_s": self.last_refill_lag,
+            "max_refill_lag_s": self.max_refill_lag,
+            "avg_refill_lag_s": self._total_refill_lag / completed if completed else None,
+        }
+
+
+def prefill_keys():
+    """Every (role, domain, mode) combination offered by the question bank."""
+    bank = get_question_bank()
+    return [(role, domain, mode) for role in bank.roles() for domain in bank.domains(role) for mode in MODES]
+
+
+question_pool = QuestionPool()
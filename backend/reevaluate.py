@@ -0,0 +1,75 @@
+"""
+Re-score exported interview sessions (the "Download JSON" files from the Streamlit app).
+
+    python -m backend.reevaluate exports/ --out rescored/ --concurrency 8
+
+Every answered question in every *.json file under the input directory is sent to
+llm.evaluate_many in one go, so the concurrency limit applies across all files.
+Skipped questions keep their original evaluation. Each file is written to --out with
+fresh evaluations and a recomputed avg_score.
+"""
+import argparse
+import asyncio
+import json
+from pathlib import Path
+
+from backend import llm
+
+
+def load_sessions(directory):
+    sessions = []
+    for path in sorted(Path(directory).glob("*.json")):
+        with open(path, encoding="utf-8") as f:
+            sessions.append((path, json.load(f)))
+    return sessions
+
+
+async def reevaluate(sessions, concurrency):
+    items, targets = [], []
+    for _, session in sessions:
+        mode = session.get("meta", {}).get("mode", "Technical")
+        for qa in session.get("qa", []):
+            if qa.get("answer"):
+                items.append((qa["question"], qa["answer"], mode))
+                targets.append(qa)
+
+    outcomes = await llm.evaluate_many(items, concurrency=concurrency)
+
+    failed = 0
+    for qa, outcome in zip(targets, outcomes):
+        if isinstance(outcome, Exception):
+            qa["reevaluation_error"] = str(outcome)
+            failed += 1
+        elif llm.is_fallback(outcome):
+            # keep the previous evaluation rather than replacing it with an unscored fallback
+            qa["reevaluation_error"] = outcome["feedback"]
+            failed += 1
+        else:
+            qa["eval"] = outcome
+
+    for _, session in sessions:
+        scores = [qa["eval"]["score"] for qa in session.get("qa", []) if (qa.get("eval") or {}).get("score") is not None]
+        session.setdefault("meta", {})["avg_score"] = f"{sum(scores) / len(scores):.2f}" if scores else "-"
+    return len(items), failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input_dir")
+    parser.add_argument("--out", required=True, help="directory for the re-scored files")
+    parser.add_argument("--concurrency", type=int, default=llm.EVAL_BATCH_CONCURRENCY)
+    args = parser.parse_args()
+
+    sessions = load_sessions(args.input_dir)
+    total, failed = asyncio.run(reevaluate(sessions, args.concurrency))
+
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for path, session in sessions:
+        with open(out_dir / path.name, "w", encoding="utf-8") as f:
+            json.dump(session, f, indent=2)
+    print(f"Re-evaluated {total} answers in {len(sessions)} sessions ({failed} failed) -> {out_dir}")
+
+
+if __name__ == "__main__":
+    main()
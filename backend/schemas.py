@@ -0,0 +1,146 @@
+"""
+Validated evaluation results.
+
+EvaluationResult is the shape of every evaluation the backend returns (LLM result,
+cached, or the unscored fallback) and the /evaluate response model. LLM output is
+parsed with parse_evaluation: well-formed JSON is validated straight from the string
+by pydantic-core, and anything else goes through the tolerant path (markdown fences,
+prose around the object, "7/10" scores, a string where a list belongs).
+
+EVALUATION_RESPONSE_FORMAT asks the model for schema-conforming JSON in the first place.
+Kept free of database/LLM imports so the frontend can use it directly.
+"""
+import os
+import re
+from typing import List, Optional
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+
+from backend.jsonstream import extract_object
+
+# "json_schema" (structured outputs), "json_object" (JSON mode) or "text" for servers that support neither
+EVAL_RESPONSE_FORMAT = os.getenv("EVAL_RESPONSE_FORMAT", "json_schema").lower()
+
+LIST_FIELDS = ("strengths", "weaknesses", "resources")
+TEXT_FIELDS = ("feedback", "suggested_improvement")
+
+
+class TokenReport(BaseModel):
+    """What prompt budgeting did to the answer (see llm.prepare_answer)."""
+    cached: bool = False
+    answer_tokens: Optional[int] = None
+    prompt_answer_tokens: Optional[int] = None
+    tokens_saved: Optional[int] = None
+    summary_tokens: Optional[int] = None
+    steps: List[str] = []
+    max_tokens: Optional[int] = None
+
+
+class EvaluationResult(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    score: Optional[float] = Field(None, ge=0, le=10)  # None only for the fallback
+    strengths: List[str] = []
+    weaknesses: List[str] = []
+    feedback: str = ""
+    suggested_improvement: str = ""
+    resources: List[str] = []
+    fallback: bool = False
+    tokens: Optional[TokenReport] = None
+
+
+class EvaluateResponse(BaseModel):
+    eval: EvaluationResult
+
+
+EVALUATION_JSON_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "score": {"type": "number", "description": "0-10"},
+        "strengths": {"type": "array", "items": {"type": "string"}},
+        "weaknesses": {"type": "array", "items": {"type": "string"}},
+        "feedback": {"type": "string"},
+        "suggested_improvement": {"type": "string"},
+        "resources": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["score", "strengths", "weaknesses", "feedback", "suggested_improvement", "resources"],
+    "additionalProperties": False,
+}
+
+RESPONSE_FORMATS = {
+    "json_schema": {"type": "json_schema",
+                    "json_schema": {"name": "evaluation", "strict": True, "schema": EVALUATION_JSON_SCHEMA}},
+    "json_object": {"type": "json_object"},
+}
+EVALUATION_RESPONSE_FORMAT = RESPONSE_FORMATS.get(EVAL_RESPONSE_FORMAT)  # None: plain text
+
+
+class EvaluationParseError(ValueError):
+    """The completion did not contain a usable evaluation."""
+
+
+_SCORE = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+def _loose_score(value):
+    if isinstance(value, str):
+        match = _SCORE.search(value)  # "7/10", "Score: 7.5"
+        value = float(match.group()) if match else None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return min(10.0, max(0.0, float(value)))
+    return None
+
+
+def coerce_evaluation(data):
+    """Best-effort repair of a near-miss evaluation dict before validation."""
+    data = dict(data)
+    data["score"] = _loose_score(data.get("score"))
+    for name in LIST_FIELDS:
+        value = data.get(name)
+        if value is None:
+            data[name] = []
+        elif isinstance(value, str):
+            data[name] = [value] if value.strip() else []
+        elif isinstance(value, list):
+            data[name] = [item if isinstance(item, str) else str(item) for item in value]
+    for name in TEXT_FIELDS:
+        value = data.get(name)
+        if value is None:
+            data[name] = ""
+        elif isinstance(value, list):
+            data[name] = " ".join(map(str, value))
+        elif not isinstance(value, str):
+            data[name] = str(value)
+    return data
+
+
+def validate_evaluation(data):
+    """EvaluationResult from an already-decoded dict (e.g. a streamed completion)."""
+    if not isinstance(data, dict):
+        raise EvaluationParseError("evaluation is not a JSON object")
+    try:
+        result = EvaluationResult.model_validate(data)
+    except ValidationError:
+        try:
+            result = EvaluationResult.model_validate(coerce_evaluation(data))
+        except ValidationError as e:
+            raise EvaluationParseError(str(e)) from e
+    if result.score is None:
+        raise EvaluationParseError("evaluation has no score")
+    return result
+
+
+def parse_evaluation(text):
+    """EvaluationResult from a completion's text; raises EvaluationParseError if there is none."""
+    try:
+        result = EvaluationResult.model_validate_json(text)
+    except ValidationError:
+        # fenced, wrapped in prose, or with near-miss field types
+        try:
+            data = extract_object(text)
+        except ValueError as e:
+            raise EvaluationParseError(str(e)) from e
+        return validate_evaluation(data)
+    if result.score is None:
+        raise EvaluationParseError("evaluation has no score")
+    return result
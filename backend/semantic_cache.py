@@ -0,0 +1,209 @@
+"""
+Near-duplicate answer cache. Answers are embedded with a hashed TF-IDF vectorizer
+(word unigrams + bigrams, signed feature hashing, no model download) and kept in a
+per-(question, mode) NumPy matrix of previously scored answers. A new answer whose
+cosine similarity to a stored one reaches SEMANTIC_CACHE_THRESHOLD reuses that
+evaluation (or, with SEMANTIC_CACHE_BLEND, a similarity-weighted score over the
+closest matches) instead of calling the LLM.
+
+Memory is bounded by SEMANTIC_CACHE_MAX_ENTRIES vectors overall and
+SEMANTIC_CACHE_MAX_PER_QUESTION per question; least recently used answers and
+questions are evicted first.
+"""
+import math
+import os
+import re
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+from backend.cache import normalize
+
+SEMANTIC_CACHE = os.getenv("SEMANTIC_CACHE", "0").lower() in ("1", "true", "yes")
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.9"))
+SEMANTIC_CACHE_BLEND = os.getenv("SEMANTIC_CACHE_BLEND", "0").lower() in ("1", "true", "yes")
+SEMANTIC_CACHE_DIM = int(os.getenv("SEMANTIC_CACHE_DIM", "1024"))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "5000"))
+SEMANTIC_CACHE_MAX_PER_QUESTION = int(os.getenv("SEMANTIC_CACHE_MAX_PER_QUESTION", "200"))
+SEMANTIC_CACHE_MIN_TOKENS = int(os.getenv("SEMANTIC_CACHE_MIN_TOKENS", "5"))
+BLEND_TOP_K = 3
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:['-][a-z0-9]+)*")
+
+
+class HashedTfidfVectorizer:
+    """Signed hashing of word unigrams and bigrams into `dim` buckets; IDF is tracked per bucket."""
+
+    def __init__(self, dim=SEMANTIC_CACHE_DIM):
+        self.dim = dim
+        self.doc_freq = np.zeros(dim, dtype=np.float32)
+        self.docs = 0
+
+    @staticmethod
+    def tokenize(text):
+        return _TOKEN.findall(text.lower())
+
+    def term_frequencies(self, tokens):
+        """Sublinear (1 + log tf) hashed term frequencies."""
+        counts = {}
+        for feature in tokens + [a + " " + b for a, b in zip(tokens, tokens[1:])]:
+            h = zlib.crc32(feature.encode("utf-8"))
+            bucket = h % self.dim
+            sign = 1.0 if h & 0x80000000 else -1.0
+            counts[bucket] = counts.get(bucket, 0.0) + sign
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for bucket, count in counts.items():
+            if count:
+                vector[bucket] = math.copysign(1.0 + math.log(abs(count)), count)
+        return vector
+
+    def observe(self, tf):
+        self.doc_freq += tf != 0
+        self.docs += 1
+
+    def forget(self, tf):
+        self.doc_freq -= tf != 0
+        self.docs -= 1
+
+    def idf(self):
+        return np.log((1.0 + self.docs) / (1.0 + self.doc_freq)) + 1.0
+
+
+class QuestionIndex:
+    """Term-frequency matrix of scored answers for one (question, mode), grown by doubling."""
+
+    def __init__(self, dim):
+        self.matrix = np.zeros((4, dim), dtype=np.float32)
+        self.results = []
+        self.last_used = []
+        self.size = 0
+
+    def add(self, tf, result, tick):
+        if self.size == len(self.matrix):
+            self.matrix = np.vstack([self.matrix, np.zeros_like(self.matrix)])
+        self.matrix[self.size] = tf
+        self.results.append(result)
+        self.last_used.append(tick)
+        self.size += 1
+
+    def remove(self, row):
+        """Drop one entry (swapping the last row into its place); returns its tf vector."""
+        tf = self.matrix[row].copy()
+        last = self.size - 1
+        self.matrix[row] = self.matrix[last]
+        self.results[row] = self.results[last]
+        self.last_used[row] = self.last_used[last]
+        self.results.pop()
+        self.last_used.pop()
+        self.size -= 1
+        return tf
+
+    def similarities(self, query, idf):
+        weighted = self.matrix[:self.size] * idf
+        q = query * idf
+        norms = np.linalg.norm(weighted, axis=1) * (np.linalg.norm(q) or 1.0)
+        norms[norms == 0] = 1.0
+        return weighted @ q / norms
+
+
+class SemanticCache:
+    def __init__(self, enabled=SEMANTIC_CACHE, threshold=SEMANTIC_CACHE_THRESHOLD, blend=SEMANTIC_CACHE_BLEND,
+                 dim=SEMANTIC_CACHE_DIM, max_entries=SEMANTIC_CACHE_MAX_ENTRIES,
+                 max_per_question=SEMANTIC_CACHE_MAX_PER_QUESTION, min_tokens=SEMANTIC_CACHE_MIN_TOKENS):
+        self.enabled = enabled
+        self.threshold = threshold
+        self.blend = blend
+        self.max_entries = max_entries
+        self.max_per_question = max_per_question
+        self.min_tokens = min_tokens
+        self.vectorizer = HashedTfidfVectorizer(dim)
+        self._indexes = OrderedDict()  # (question, mode) -> QuestionIndex, least recently used first
+        self._tick = 0
+        self.entries = 0
+        self.lookups = 0
+        self.hits = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(question, mode):
+        return normalize(question), normalize(mode)
+
+    def lookup(self, question, answer, mode):
+        """A stored evaluation for a near-duplicate answer, or None."""
+        tokens = self.vectorizer.tokenize(answer)
+        if len(tokens) < self.min_tokens:
+            return None
+        self.lookups += 1
+        index = self._indexes.get(self._key(question, mode))
+        if index is None or index.size == 0:
+            return None
+
+        sims = index.similarities(self.vectorizer.term_frequencies(tokens), self.vectorizer.idf())
+        best = int(np.argmax(sims))
+        if sims[best] < self.threshold:
+            return None
+
+        self.hits += 1
+        self._tick += 1
+        self._indexes.move_to_end(self._key(question, mode))
+        index.last_used[best] = self._tick
+        result = dict(index.results[best])
+        if self.blend:
+            close = [i for i in np.argsort(-sims)[:BLEND_TOP_K] if sims[i] >= self.threshold]
+            weights = sims[close]
+            scores = np.array([float(index.results[i]["score"]) for i in close])
+            result["score"] = round(float(weights @ scores / weights.sum()), 1)
+        return result
+
+    def add(self, question, answer, mode, result):
+        tokens = self.vectorizer.tokenize(answer)
+        if len(tokens) < self.min_tokens:
+            return
+        key = self._key(question, mode)
+        index = self._indexes.get(key)
+        if index is None:
+            index = self._indexes[key] = QuestionIndex(self.vectorizer.dim)
+        self._indexes.move_to_end(key)
+
+        tf = self.vectorizer.term_frequencies(tokens)
+        self._tick += 1
+        index.add(tf, dict(result), self._tick)
+        self.vectorizer.observe(tf)
+        self.entries += 1
+
+        if index.size > self.max_per_question:
+            self._evict_from(index)
+        while self.entries > self.max_entries:
+            oldest_key, oldest = next(iter(self._indexes.items()))
+            self._evict_from(oldest)
+            if oldest.size == 0:
+                del self._indexes[oldest_key]
+
+    def _evict_from(self, index):
+        row = int(np.argmin(index.last_used))
+        self.vectorizer.forget(index.remove(row))
+        self.entries -= 1
+        self.evictions += 1
+
+    def memory_bytes(self):
+        return sum(index.matrix.nbytes for index in self._indexes.values()) + self.vectorizer.doc_freq.nbytes
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "threshold": self.threshold,
+            "blend": self.blend,
+            "questions": len(self._indexes),
+            "entries": self.entries,
+            "max_entries": self.max_entries,
+            "evictions": self.evictions,
+            "memory_bytes": self.memory_bytes(),
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "llm_calls_saved": self.hits,
+            "savings_rate": self.hits / self.lookups if self.lookups else 0.0,
+        }
+
+
+semantic_cache = SemanticCache()
@@ -0,0 +1,107 @@
+"""
+Production launcher: migrate the schema once, then run the API in N worker processes.
+
+    python -m backend.serve --workers 4 --port 8000
+
+- `python -m backend.migrate` runs here, once, before any worker starts; workers get
+  DB_AUTO_MIGRATE=0 so they don't race on schema creation.
+- With more than one worker and no STATE_BACKEND set, the shared state backend
+  defaults to sqlite, so the LLM rate limits and the evaluation cache are shared
+  across workers (see backend/shared_state.py). STATE_BACKEND=memory with several
+  workers is refused unless --allow-per-worker-state is passed.
+- Each worker creates its database pools, LLM client, tokenizer and question bank on
+  lifespan startup, not at import in this process.
+- With more than one worker, PROMETHEUS_MULTIPROC_DIR is set (a fresh temporary
+  directory unless already set; stale sample files in it are removed) so /metrics
+  sums the histograms and counters of all workers (see backend/metrics.py).
+- On SIGTERM/SIGINT workers stop accepting connections, finish in-flight requests for
+  up to --graceful-timeout seconds, then run lifespan shutdown (write-behind flush).
+
+`uvicorn backend.main:app` still works for development (one process, migrating on startup).
+"""
+import argparse
+import glob
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+from backend.env import load_env
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=os.getenv("HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1))))
+    parser.add_argument("--state-backend", choices=["memory", "sqlite", "redis"],
+                        help="shared state backend (default: $STATE_BACKEND, else sqlite with several workers)")
+    parser.add_argument("--allow-per-worker-state", action="store_true",
+                        help="allow STATE_BACKEND=memory with several workers (each keeps its own limits and caches)")
+    parser.add_argument("--no-migrate", action="store_true", help="skip the migration step (already run by the deploy)")
+    parser.add_argument("--graceful-timeout", type=float, default=30.0)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    # .env was read when the backend package was imported; workers inherit the environment
+    load_env()
+    if args.state_backend:
+        os.environ["STATE_BACKEND"] = args.state_backend
+    elif args.workers > 1:
+        os.environ.setdefault("STATE_BACKEND", "sqlite")
+    if os.environ.get("STATE_BACKEND", "memory").lower() == "memory" and args.workers > 1:
+        if not args.allow_per_worker_state:
+            parser.error(f"STATE_BACKEND=memory with {args.workers} workers would give each worker its own rate "
+                         "limits, caches and pool leases; use sqlite or redis, or pass --allow-per-worker-state")
+        logger.warning("STATE_BACKEND=memory with %d workers: rate limits and caches are per worker", args.workers)
+
+    if not args.no_migrate:
+        from backend.models import engine, init_db
+
+        started = time.perf_counter()
+        init_db()
+        engine.dispose()
+        logger.info("schema migrated in %.2fs", time.perf_counter() - started)
+    os.environ["DB_AUTO_MIGRATE"] = "0"
+
+    metrics_dir = prepare_metrics_dir() if args.workers > 1 else None
+
+    import uvicorn
+
+    logger.info("starting %d worker(s) on %s:%d (state backend: %s)", args.workers, args.host, args.port,
+                os.environ.get("STATE_BACKEND", "memory"))
+    try:
+        uvicorn.run("backend.main:app", host=args.host, port=args.port, workers=args.workers,
+                    timeout_graceful_shutdown=args.graceful_timeout, log_level=args.log_level)
+    finally:
+        if metrics_dir:
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+
+
+def prepare_metrics_dir():
+    """
+    Point the workers' prometheus_client at a shared sample directory (multiprocess
+    mode). Returns the directory if it was created here and should be removed on exit.
+    Workers are spawned fresh, so they read the variable when they import the client.
+    """
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if not path:
+        path = tempfile.mkdtemp(prefix="backend-metrics-")
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = path
+        created = path
+    else:
+        os.makedirs(path, exist_ok=True)
+        # samples left by a previous run would be summed into this one
+        for stale in glob.glob(os.path.join(path, "*.db")):
+            os.remove(stale)
+        created = None
+    logger.info("prometheus multiprocess mode, samples in %s", path)
+    return created
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+State shared by every worker process: cached values and rate-limit token buckets.
+
+STATE_BACKEND picks where it lives:
+
+- memory (default): this process only; what a single worker needs.
+- sqlite: a small SQLite file (STATE_URL, default ./shared_state.db) that every worker
+  on the host opens; bucket updates run in BEGIN IMMEDIATE transactions.
+- redis: a Redis-compatible server at STATE_URL (redis://localhost:6379/0; Valkey,
+  KeyDB, ...); needs `pip install redis`. Buckets are updated by a Lua script.
+
+The interface is synchronous and cheap (sub-millisecond locally); async callers use
+it through asyncio.to_thread unless the backend is in-process (`shared` is False).
+Values are strings; callers serialize. `add` sets a key only if it is absent, which
+makes it a lease: one worker at a time gets it until it is deleted or expires.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+STATE_BACKEND = os.getenv("STATE_BACKEND", "memory").lower()
+STATE_URL = os.getenv("STATE_URL", "")
+PURGE_INTERVAL = 60  # seconds between sweeps of expired values, per process
+
+
+class MemoryState:
+    """Process-local state; buckets and values are not seen by other workers."""
+
+    shared = False
+
+    def __init__(self):
+        self._values = {}   # key -> (expires_at or None, value)
+        self._buckets = {}  # name -> [tokens, updated]
+        self._lock = threading.Lock()
+        self._next_purge = 0.0
+
+    def get(self, key):
+        entry = self._values.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.time():
+            self._values.pop(key, None)
+            return None
+        return value
+
+    def set(self, key, value, ttl=None):
+        now = time.time()
+        self._values[key] = (now + ttl if ttl else None, value)
+        if now >= self._next_purge:
+            self._next_purge = now + PURGE_INTERVAL
+            for stale in [k for k, (expires_at, _) in list(self._values.items())
+                          if expires_at is not None and expires_at <= now]:
+                self._values.pop(stale, None)
+
+    def add(self, key, value, ttl=None):
+        """Set key only if it is missing or expired; True when this call set it (a lease)."""
+        with self._lock:
+            if self.get(key) is not None:
+                return False
+            self.set(key, value, ttl)
+            return True
+
+    def delete(self, key):
+        self._values.pop(key, None)
+
+    def take(self, name, amount, capacity, rate):
+        """
+        Take `amount` units from bucket `name` (refilling `rate` units/s up to `capacity`).
+        Returns 0.0 when taken, otherwise the seconds until enough units will be there.
+        A negative amount gives units back.
+        """
+        with self._lock:
+            now = time.time()
+            tokens, updated = self._buckets.get(name, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            if amount <= tokens or amount < 0:
+                self._buckets[name] = [min(capacity, tokens - amount), now]
+                return 0.0
+            self._buckets[name] = [tokens, now]
+            return (amount - tokens) / rate
+
+    def describe(self):
+        return {"backend": "memory"}
+
+
+class SQLiteState:
+    """State in a SQLite file shared by the worker processes of one host."""
+
+    shared = True
+
+    def __init__(self, path):
+        self.path = path or "shared_state.db"
+        self._local = threading.local()
+        self._next_purge = 0.0
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT, expires_at REAL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_kv_expires_at ON kv (expires_at)")
+            conn.execute("CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, tokens REAL, updated REAL)")
+
+    def _connect(self):
+        # one connection per thread (sqlite3 connections are not shared across threads)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._connect().execute("SELECT value, expires_at FROM kv WHERE key = ?", (key,)).fetchone()
+        if row is None or (row[1] is not None and row[1] <= time.time()):
+            return None
+        return row[0]
+
+    def set(self, key, value, ttl=None):
+        now = time.time()
+        conn = self._connect()
+        conn.execute("INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+                     (key, value, now + ttl if ttl else None))
+        if now >= self._next_purge:
+            # expired rows are skipped on read; delete them here so the table doesn't keep growing
+            self._next_purge = now + PURGE_INTERVAL
+            conn.execute("DELETE FROM kv WHERE expires_at <= ?", (now,))
+
+    def add(self, key, value, ttl=None):
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            conn.execute("DELETE FROM kv WHERE key = ? AND expires_at <= ?", (key, now))
+            added = conn.execute("INSERT OR IGNORE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+                                 (key, value, now + ttl if ttl else None)).rowcount == 1
+            conn.execute("COMMIT")
+            return added
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def delete(self, key):
+        self._connect().execute("DELETE FROM kv WHERE key = ?", (key,))
+
+    def take(self, name, amount, capacity, rate):
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            row = conn.execute("SELECT tokens, updated FROM buckets WHERE name = ?", (name,)).fetchone()
+            tokens, updated = row if row else (capacity, now)
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            wait = 0.0
+            if amount <= tokens or amount < 0:
+                tokens = min(capacity, tokens - amount)
+            else:
+                wait = (amount - tokens) / rate
+            conn.execute("INSERT OR REPLACE INTO buckets (name, tokens, updated) VALUES (?, ?, ?)",
+                         (name, tokens, now))
+            conn.execute("COMMIT")
+            return wait
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def describe(self):
+        return {"backend": "sqlite", "path": self.path}
+
+
+# KEYS[1] bucket; ARGV amount, capacity, rate, now. Same arithmetic as MemoryState.take.
+TAKE_SCRIPT = """
+local amount, capacity, rate, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3]), tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if amount <= tokens or amount < 0 then
+  tokens = math.min(capacity, tokens - amount)
+else
+  wait = (amount - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+return tostring(wait)
+"""
+
+
+class RedisState:
+    """State in a Redis-compatible server."""
+
+    shared = True
+
+    def __init__(self, url):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("STATE_BACKEND=redis needs the redis package: pip install redis") from e
+        self.url = url or "redis://localhost:6379/0"
+        self.redis = redis.Redis.from_url(self.url, decode_responses=True)
+        self._take = self.redis.register_script(TAKE_SCRIPT)
+
+    def get(self, key):
+        return self.redis.get(key)
+
+    def set(self, key, value, ttl=None):
+        self.redis.set(key, value, ex=max(1, int(ttl)) if ttl else None)
+
+    def add(self, key, value, ttl=None):
+        return bool(self.redis.set(key, value, ex=max(1, int(ttl)) if ttl else None, nx=True))
+
+    def delete(self, key):
+        self.redis.delete(key)
+
+    def take(self, name, amount, capacity, rate):
+        return float(self._take(keys=[f"bucket:{name}"], args=[amount, capacity, rate, time.time()]))
+
+    def describe(self):
+        return {"backend": "redis", "url": self.url}
+
+
+BACKENDS = {"memory": lambda url: MemoryState(), "sqlite": SQLiteState, "redis": RedisState}
+
+_state = None
+
+
+def get_state():
+    """The configured backend, created on first use (so each worker opens its own connections)."""
+    global _state
+    if _state is None:
+        if STATE_BACKEND not in BACKENDS:
+            raise ValueError(f"unknown STATE_BACKEND {STATE_BACKEND!r} (expected one of {', '.join(BACKENDS)})")
+        _state = BACKENDS[STATE_BACKEND](STATE_URL)
+    return _state
@@ -0,0 +1,115 @@
+"""
+Local token counting for prompt budgeting.
+
+Uses tiktoken with an encoding file shipped in backend/data/tiktoken (TIKTOKEN_CACHE_DIR,
+put there at build time by `python -m backend.tokens fetch`, which tiktoken checks
+against its published hash). Loading never touches the network unless
+TOKENIZER_DOWNLOAD=1, so an offline or firewalled host starts immediately. Without the
+file (or tiktoken), token counts fall back to an approximation that splits on word
+pieces of up to 6 characters and punctuation, which tracks BPE counts for English prose
+within roughly 15%; a warning says so once per process.
+"""
+import argparse
+import json
+import logging
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+TOKENIZER_ENCODING = os.getenv("TOKENIZER_ENCODING", "o200k_base")
+TOKENIZER_DIR = Path(os.getenv("TIKTOKEN_CACHE_DIR", Path(__file__).parent / "data" / "tiktoken"))
+TOKENIZER_DOWNLOAD = os.getenv("TOKENIZER_DOWNLOAD", "0").lower() in ("1", "true", "yes")
+# encoding name -> file name in TOKENIZER_DIR (tiktoken's cache key), written by `fetch`
+MANIFEST = TOKENIZER_DIR / "encodings.json"
+
+_APPROX_TOKEN = re.compile(r"\w{1,6}|[^\w\s]")
+
+
+def _manifest():
+    try:
+        return json.loads(MANIFEST.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def is_vendored(name=TOKENIZER_ENCODING):
+    filename = _manifest().get(name)
+    return filename is not None and (TOKENIZER_DIR / filename).exists()
+
+
+def _load(name):
+    os.environ["TIKTOKEN_CACHE_DIR"] = str(TOKENIZER_DIR)
+    import tiktoken
+    return tiktoken.get_encoding(name)
+
+
+@lru_cache(maxsize=1)
+def get_encoding():
+    if not (is_vendored() or TOKENIZER_DOWNLOAD):
+        logger.warning("tiktoken encoding %s is not in %s (run `python -m backend.tokens fetch`); "
+                       "using approximate token counts", TOKENIZER_ENCODING, TOKENIZER_DIR)
+        return None
+    try:
+        return _load(TOKENIZER_ENCODING)
+    except Exception as e:  # not installed, or the file is missing/corrupt and can't be fetched
+        logger.warning("tiktoken encoding %s unavailable (%s); using approximate token counts",
+                       TOKENIZER_ENCODING, e)
+        return None
+
+
+def count_tokens(text):
+    encoding = get_encoding()
+    if encoding is None:
+        return len(_APPROX_TOKEN.findall(text))
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def count_message_tokens(messages):
+    # ~4 tokens of chat framing per message
+    return sum(count_tokens(str(m.get("content", ""))) + 4 for m in messages)
+
+
+def truncate_tokens(text, max_tokens):
+    """The longest prefix of text that is at most max_tokens tokens."""
+    encoding = get_encoding()
+    if encoding is None:
+        for i, match in enumerate(_APPROX_TOKEN.finditer(text)):
+            if i == max_tokens:
+                return text[:match.start()].rstrip()
+        return text
+    tokens = encoding.encode(text, disallowed_special=())
+    return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
+
+
+def fetch(names):
+    """Download encodings into TOKENIZER_DIR (hash-checked by tiktoken) and record them in the manifest."""
+    TOKENIZER_DIR.mkdir(parents=True, exist_ok=True)
+    manifest = _manifest()
+    for name in names:
+        if is_vendored(name):
+            print(f"{name}: already in {TOKENIZER_DIR}")
+            continue
+        before = set(os.listdir(TOKENIZER_DIR))
+        _load(name)
+        added = [f for f in set(os.listdir(TOKENIZER_DIR)) - before if not f.endswith(".tmp")]
+        if len(added) != 1:
+            raise RuntimeError(f"expected one new file in {TOKENIZER_DIR} for {name}, found {added}")
+        manifest[name] = added[0]
+        print(f"{name}: {TOKENIZER_DIR / added[0]}")
+    MANIFEST.write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vendor tiktoken encodings for offline token counting.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    fetch_parser = sub.add_parser("fetch", help=f"download encodings into {TOKENIZER_DIR}")
+    fetch_parser.add_argument("names", nargs="*", default=[TOKENIZER_ENCODING])
+    args = parser.parse_args()
+    fetch(args.names)
+
+
+if __name__ == "__main__":
+    main()
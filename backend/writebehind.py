@@ -0,0 +1,147 @@
+import asyncio
+import logging
+import os
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient
+
+from backend.metrics import span
+from backend.models import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+EVAL_WRITE_BEHIND = os.getenv("EVAL_WRITE_BEHIND", "0").lower() in ("1", "true", "yes")
+EVAL_WRITE_BEHIND_MS = float(os.getenv("EVAL_WRITE_BEHIND_MS", "200"))
+EVAL_WRITE_BEHIND_ROWS = int(os.getenv("EVAL_WRITE_BEHIND_ROWS", "100"))
+EVAL_WRITE_BEHIND_MAX_PENDING = int(os.getenv("EVAL_WRITE_BEHIND_MAX_PENDING", "10000"))
+EVAL_WRITE_BEHIND_ATTEMPTS = int(os.getenv("EVAL_WRITE_BEHIND_ATTEMPTS", "3"))
+
+
+class WriteBehindBuffer:
+    """
+    Collects ORM rows and group-commits them every `interval_ms` or as soon as
+    `max_rows` are pending, whichever comes first. One transaction per flush
+    instead of one per evaluation.
+
+    At most `max_pending` rows wait in memory: once the buffer is full, add()
+    commits the caller's rows itself, so a slow or unavailable database pushes
+    back on requests instead of growing the buffer. A row whose flush fails is
+    retried with the next flush, up to `max_attempts` commits in total, then
+    logged and dropped.
+    """
+
+    def __init__(self, session_factory=AsyncSessionLocal, interval_ms=EVAL_WRITE_BEHIND_MS,
+                 max_rows=EVAL_WRITE_BEHIND_ROWS, max_pending=EVAL_WRITE_BEHIND_MAX_PENDING,
+                 max_attempts=EVAL_WRITE_BEHIND_ATTEMPTS):
+        self.session_factory = session_factory
+        self.interval = interval_ms / 1000
+        self.max_rows = max_rows
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self._pending = []  # (row, failed commit attempts so far)
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self._lock = asyncio.Lock()
+        self.rows_written = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.dropped_rows = 0
+        self.direct_writes = 0
+
+    async def add(self, rows):
+        """Queue rows for the next flush; commit them now if the buffer is full."""
+        if len(self._pending) + len(rows) > self.max_pending:
+            self._wakeup.set()
+            await self._commit(rows)
+            self.direct_writes += 1
+            self.rows_written += len(rows)
+            return
+        self._pending.extend((row, 0) for row in rows)
+        if len(self._pending) >= self.max_rows:
+            self._wakeup.set()
+
+    async def _commit(self, rows):
+        async with self.session_factory() as db:
+            db.add_all(rows)
+            with span("db.commit"):
+                await db.commit()
+
+    async def flush(self):
+        async with self._lock:
+            batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            rows = [row for row, _ in batch]
+            try:
+                await self._commit(rows)
+            except Exception:
+                self.failed_flushes += 1
+                logger.exception("write-behind flush of %d rows failed", len(rows))
+                # put the rows back so the next flush retries them, unless they're out of attempts
+                for row in rows:
+                    reset_for_retry(row)
+                retry = [(row, attempts + 1) for row, attempts in batch if attempts + 1 < self.max_attempts]
+                dropped = len(batch) - len(retry)
+                if dropped:
+                    self.dropped_rows += dropped
+                    logger.error("write-behind dropped %d rows after %d failed attempts", dropped, self.max_attempts)
+                self._pending[:0] = retry
+                return 0
+            self.rows_written += len(rows)
+            self.flushes += 1
+            return len(rows)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush loop and write out whatever is still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def stats(self):
+        return {
+            "pending": len(self._pending),
+            "rows_written": self.rows_written,
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+            "dropped_rows": self.dropped_rows,
+            "direct_writes": self.direct_writes,
+            "interval_ms": self.interval * 1000,
+            "max_rows": self.max_rows,
+            "max_pending": self.max_pending,
+        }
+
+
+def reset_for_retry(row):
+    """
+    Make a row from a failed commit insertable again. Its session flushed it (assigning
+    an autoincrement id) and was closed, which leaves it detached as if it existed;
+    added to the next session like that, it would be skipped instead of inserted.
+    """
+    state = inspect(row, raiseerr=False)
+    if state is None or state.transient:
+        return
+    make_transient(row)
+    column = state.mapper.local_table.autoincrement_column
+    if column is not None:
+        setattr(row, state.mapper.get_property_by_column(column).key, None)
+
+
+write_buffer = WriteBehindBuffer()
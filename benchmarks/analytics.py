@@ -0,0 +1,155 @@
+"""
+/analytics latency from the daily rollups vs the same aggregates computed from sessions.
+
+Fills a throwaway SQLite database with --rows scored sessions spread over a year
+(10M by default; the fill takes a few minutes), rebuilds session_rollups with the
+backfill job, then times:
+
+- GET /analytics/trend (day and month buckets) and /analytics/breakdown?by=domain,
+  unfiltered and with a role/domain/mode filter
+- the equivalent GROUP BY queries run directly against the sessions table
+
+Rollup queries scan (days x roles x domains x modes) rows, so they should not grow
+with --rows; the ad hoc queries do. Finally, the cost the rollup flush hooks add to
+each insert: --inserts single-row commits through the ORM with the rollups on and off.
+
+    python -m benchmarks.analytics --rows 10000000
+"""
+import argparse
+import asyncio
+import datetime
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+
+ROLES = ["Software Engineer", "Product Manager", "Data Analyst"]
+DOMAINS = ["General", "Backend", "Frontend", "Machine Learning", "System Design"]
+MODES = ["Technical", "Behavioral"]
+FILTER = {"role": "Software Engineer", "domain": "Backend", "mode": "Technical"}
+WHERE = "WHERE role = 'Software Engineer' AND domain = 'Backend' AND mode = 'Technical'"
+
+AD_HOC = {
+    "trend day": "SELECT date(created_at), count(score), avg(score) FROM sessions {where} GROUP BY 1",
+    "trend month": "SELECT strftime('%Y-%m', created_at), count(score), avg(score) FROM sessions {where} GROUP BY 1",
+    "breakdown domain": "SELECT domain, count(score), avg(score) FROM sessions {where} GROUP BY 1 ORDER BY 3",
+}
+ENDPOINTS = {
+    "trend day": ("/analytics/trend", {"bucket": "day"}),
+    "trend month": ("/analytics/trend", {"bucket": "month"}),
+    "breakdown domain": ("/analytics/breakdown", {"by": "domain"}),
+}
+
+
+def fill(db_path, rows, batch=100_000):
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    start = datetime.datetime(2024, 1, 1)
+    step = 365 * 86400 / rows
+    rng = random.Random(7)
+    sql = ("INSERT INTO sessions (role, domain, mode, question, answer, score, feedback, created_at) "
+           "VALUES (?, ?, ?, ?, ?, ?, ?, ?)")
+    for offset in range(0, rows, batch):
+        conn.executemany(sql, [
+            (rng.choice(ROLES), rng.choice(DOMAINS), rng.choice(MODES), f"Question {i % 500}", "answer",
+             round(rng.uniform(0, 10), 1), "feedback",
+             (start + datetime.timedelta(seconds=i * step)).isoformat(sep=" ", timespec="microseconds"))
+            for i in range(offset, min(rows, offset + batch))
+        ])
+        conn.commit()
+    conn.close()
+
+
+def median_ms(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(timings)
+
+
+async def endpoint_ms(http, path, params, repeat):
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        resp = await http.get(path, params=params)
+        resp.raise_for_status()
+        timings.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(timings)
+
+
+async def time_queries(db_path, repeat):
+    import httpx
+    from backend.main import app
+
+    conn = sqlite3.connect(db_path)
+    print(f"\n{'query':<18} {'filter':<9} {'rollups ms':>11} {'sessions ms':>12}")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as http:
+        for label, filtered in (("all", False), ("filtered", True)):
+            for name, (path, params) in ENDPOINTS.items():
+                params = dict(params, **FILTER) if filtered else params
+                rollup = await endpoint_ms(http, path, params, repeat)
+                sql = AD_HOC[name].format(where=WHERE if filtered else "")
+                ad_hoc = median_ms(lambda: conn.execute(sql).fetchall(), max(1, repeat // 5))
+                print(f"{name:<18} {label:<9} {rollup:>11.2f} {ad_hoc:>12.1f}")
+    conn.close()
+
+
+async def insert_cost(inserts):
+    from backend import analytics
+    from backend.models import AsyncSessionLocal, InterviewSession
+
+    results = {}
+    for enabled in (False, True):
+        analytics.ANALYTICS_ROLLUPS = enabled
+        t0 = time.perf_counter()
+        for i in range(inserts):
+            async with AsyncSessionLocal() as db:
+                db.add(InterviewSession(role=ROLES[i % 3], domain=DOMAINS[i % 5], mode=MODES[i % 2],
+                                        question="q", answer="a", score=5.0, feedback="f"))
+                await db.commit()
+        results[enabled] = (time.perf_counter() - t0) / inserts * 1000
+    analytics.ANALYTICS_ROLLUPS = True
+    print(f"\nsingle-row insert+commit: {results[False]:.3f} ms without rollups, "
+          f"{results[True]:.3f} ms with (+{results[True] - results[False]:.3f} ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--inserts", type=int, default=500)
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="bench-analytics-"), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ.setdefault("OPENAI_API_KEY", "sk-fake")
+
+    from backend.analytics import backfill
+    from backend.models import init_db
+
+    init_db()
+
+    t0 = time.perf_counter()
+    fill(db_path, args.rows)
+    print(f"inserted {args.rows} rows in {time.perf_counter() - t0:.1f}s")
+    t0 = time.perf_counter()
+    buckets = backfill()
+    print(f"backfill: {buckets} rollup buckets in {time.perf_counter() - t0:.1f}s")
+
+    conn = sqlite3.connect(db_path)
+    expected = conn.execute("SELECT count(score), sum(score) FROM sessions").fetchone()
+    actual = conn.execute("SELECT sum(n), sum(score_sum) FROM session_rollups").fetchone()
+    conn.close()
+    assert expected[0] == actual[0] and abs(expected[1] - actual[1]) < 1e-6 * expected[1], (expected, actual)
+
+    asyncio.run(time_queries(db_path, args.repeat))
+    asyncio.run(insert_cost(args.inserts))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Peak Python memory and throughput of GET /export/sessions for growing session tables.
+
+For each --rows size, fills a throwaway SQLite database and downloads the export in
+every format with the body consumed chunk by chunk (as a client saving to disk would),
+tracking the peak traced allocation (server and client share this process; tracemalloc
+also slows everything down, so treat the timings as relative). Peak memory should stay flat as rows grow.
+The export cache is pointed at a temp dir and cleared between runs.
+
+    python -m benchmarks.export_memory --rows 10000 100000
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+
+async def download(http, fmt):
+    size = 0
+    async with http.stream("GET", "/export/sessions", params={"format": fmt}) as resp:
+        resp.raise_for_status()
+        async for chunk in resp.aiter_bytes():
+            size += len(chunk)
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--port", type=int, default=9120)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix="bench-export-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{tmpdir}/bench.db"
+    os.environ["EXPORT_CACHE_DIR"] = f"{tmpdir}/cache"
+    os.environ.setdefault("OPENAI_API_KEY", "sk-fake")
+
+    import threading
+    import httpx
+    import uvicorn
+    from benchmarks.sessions_pagination import fill
+    from backend.main import app
+
+    # A real server: httpx's ASGITransport would buffer the whole response body
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=args.port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+
+    filled = 0
+    print(f"{'rows':>8} {'format':>7} {'MiB out':>8} {'seconds':>8} {'peak MiB':>9}")
+    for rows in sorted(args.rows):
+        fill(f"{tmpdir}/bench.db", rows - filled)
+        filled = rows
+        for fmt in ("ndjson", "csv", "pdf"):
+            shutil.rmtree(f"{tmpdir}/cache", ignore_errors=True)
+            tracemalloc.start()
+            t0 = time.perf_counter()
+
+            async def run():
+                async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=None) as http:
+                    return await download(http, fmt)
+
+            size = asyncio.run(run())
+            elapsed = time.perf_counter() - t0
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{rows:>8} {fmt:>7} {size / 2**20:>8.1f} {elapsed:>8.1f} {peak / 2**20:>9.1f}")
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Local stand-in for the OpenAI chat completions API, used by the benchmarks.
+Replies with a canned evaluation after a configurable delay so the backend can be
+load tested without network access or an API key. Requests with "stream": true get the
+same evaluation as chat.completion.chunk events: the first chunk after --first-token-ms,
+then one small chunk every --token-delay-ms.
+To exercise retry logic, --rate-limit-rate answers that fraction of requests with
+429 (and a Retry-After of --retry-after-s) and --error-rate that fraction with 500.
+--latency-dist shapes the per-request delay around --latency-ms:
+
+- fixed: --latency-ms plus up to --latency-jitter-ms of uniform random extra
+- normal: mean --latency-ms, standard deviation --latency-jitter-ms (never below 0)
+- lognormal: median --latency-ms with a long tail; --latency-jitter-ms sets its width
+- exponential: mean --latency-ms
+
+--canned replaces the canned evaluation with the JSON object in that file, and --seed
+makes the latency, 429 and 500 draws repeatable.
+
+    python -m benchmarks.fake_llm --port 9000 --latency-ms 200 --latency-dist lognormal --latency-jitter-ms 100
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import threading
+import time
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+CANNED_EVAL = {
+    "score": 7.0,
+    "strengths": ["Clear structure"],
+    "weaknesses": ["Could mention complexity"],
+    "feedback": "Solid answer overall.",
+    "suggested_improvement": "Add an edge case.",
+    "resources": ["https://example.com/interview-prep"],
+}
+
+
+CHUNK_CHARS = 8
+
+
+LATENCY_DISTS = ("fixed", "normal", "lognormal", "exponential")
+
+
+def sample_latency_ms(rng, dist, latency_ms, jitter_ms):
+    if dist == "normal":
+        return max(0.0, rng.gauss(latency_ms, jitter_ms))
+    if dist == "lognormal":
+        return rng.lognormvariate(math.log(max(latency_ms, 1e-3)), math.log1p(jitter_ms / max(latency_ms, 1e-3)))
+    if dist == "exponential":
+        return rng.expovariate(1 / latency_ms) if latency_ms > 0 else 0.0
+    return latency_ms + rng.random() * jitter_ms
+
+
+def canned_content(body, call_number, canned_eval=CANNED_EVAL):
+    """Canned evaluation, a batch of unique questions for question-generation prompts, or a summary."""
+    prompt = " ".join(str(m.get("content", "")) for m in body.get("messages", []))
+    if "Condense this part" in prompt:
+        # summary request: the tail of the chunk, within the requested max_tokens
+        return " ".join(prompt.split()[-body.get("max_tokens", 100) // 2:])
+    if "preparing questions" not in prompt:
+        return json.dumps(canned_eval)
+    return json.dumps({"questions": [
+        {"question": f"Generated question {call_number}.{i}: how would you approach this problem?",
+         "type": "concept", "difficulty": ("easy", "medium", "hard")[i % 3], "hint": "Think it through."}
+        for i in range(5)
+    ]})
+
+
+USAGE = {"prompt_tokens": 150, "completion_tokens": 60, "total_tokens": 210}
+
+
+def stream_chunks(model, completion_id, content, first_token_ms, token_delay_ms, include_usage=False):
+    async def events():
+        await asyncio.sleep(first_token_ms / 1000)
+        for i in range(0, len(content), CHUNK_CHARS):
+            if i:
+                await asyncio.sleep(token_delay_ms / 1000)
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": content[i:i + CHUNK_CHARS]}, "finish_reason": None}],
+            }
+            yield f"data: {json.dumps(chunk)}\n\n"
+        done = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+        }
+        yield f"data: {json.dumps(done)}\n\n"
+        if include_usage:
+            usage = {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                     "model": model, "choices": [], "usage": USAGE}
+            yield f"data: {json.dumps(usage)}\n\n"
+        yield "data: [DONE]\n\n"
+    return events()
+
+
+def create_app(latency_ms=200.0, first_token_ms=50.0, token_delay_ms=10.0,
+               rate_limit_rate=0.0, retry_after_s=0.0, latency_jitter_ms=0.0, seed=None,
+               latency_dist="fixed", error_rate=0.0, canned_eval=None):
+    if latency_dist not in LATENCY_DISTS:
+        raise ValueError(f"unknown latency_dist {latency_dist!r} (expected one of {', '.join(LATENCY_DISTS)})")
+    app = FastAPI(title="Fake LLM")
+    app.state.latency_ms = latency_ms
+    app.state.first_token_ms = first_token_ms
+    app.state.token_delay_ms = token_delay_ms
+    app.state.rate_limit_rate = rate_limit_rate
+    app.state.retry_after_s = retry_after_s
+    app.state.latency_jitter_ms = latency_jitter_ms
+    app.state.latency_dist = latency_dist
+    app.state.error_rate = error_rate
+    app.state.canned_eval = canned_eval or CANNED_EVAL
+    app.state.calls = 0
+    app.state.rate_limited = 0
+    app.state.errors = 0
+    rng = random.Random(seed)
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        if rng.random() < app.state.rate_limit_rate:
+            app.state.rate_limited += 1
+            headers = {"retry-after": str(app.state.retry_after_s)} if app.state.retry_after_s else {}
+            return JSONResponse(status_code=429, headers=headers, content={"error": {
+                "message": "Rate limit reached for requests", "type": "requests", "code": "rate_limit_exceeded"}})
+        if rng.random() < app.state.error_rate:
+            app.state.errors += 1
+            return JSONResponse(status_code=500, content={"error": {
+                "message": "The server had an error while processing your request.", "type": "server_error"}})
+        app.state.calls += 1
+        completion_id = f"chatcmpl-fake-{app.state.calls}"
+        if body.get("stream"):
+            return StreamingResponse(
+                stream_chunks(body.get("model", "fake"), completion_id, canned_content(body, app.state.calls, app.state.canned_eval),
+                              app.state.first_token_ms, app.state.token_delay_ms,
+                              include_usage=(body.get("stream_options") or {}).get("include_usage", False)),
+                media_type="text/event-stream",
+            )
+        await asyncio.sleep(sample_latency_ms(rng, app.state.latency_dist, app.state.latency_ms,
+                                              app.state.latency_jitter_ms) / 1000)
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": canned_content(body, app.state.calls, app.state.canned_eval)},
+                "finish_reason": "stop",
+            }],
+            "usage": USAGE,
+        }
+
+    return app
+
+
+def serve_in_thread(port, latency_ms=200.0, **options):
+    """Start the fake server on a daemon thread and block until it accepts connections."""
+    app = create_app(latency_ms, **options)
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--first-token-ms", type=float, default=50.0)
+    parser.add_argument("--token-delay-ms", type=float, default=10.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after-s", type=float, default=0.0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--latency-dist", choices=LATENCY_DISTS, default="fixed")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 500")
+    parser.add_argument("--canned", type=argparse.FileType("r"), help="JSON file with the evaluation to return")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+    app = create_app(args.latency_ms, first_token_ms=args.first_token_ms, token_delay_ms=args.token_delay_ms,
+                     rate_limit_rate=args.rate_limit_rate, retry_after_s=args.retry_after_s,
+                     latency_jitter_ms=args.latency_jitter_ms, seed=args.seed, latency_dist=args.latency_dist,
+                     error_rate=args.error_rate, canned_eval=json.load(args.canned) if args.canned else None)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
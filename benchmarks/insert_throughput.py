@@ -0,0 +1,82 @@
+"""
+Evaluation-row insert throughput: one commit per row (the old /evaluate pattern)
+versus group commits through the write-behind buffer.
+
+--concurrency tasks insert --rows rows in total into a throwaway SQLite database
+(WAL and the other pragmas from backend.models apply to both runs).
+
+    python -m benchmarks.insert_throughput --rows 5000 --concurrency 50
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+
+def make_row(i):
+    from backend.models import InterviewSession
+    return InterviewSession(role="Software Engineer", domain="Backend", mode="Technical",
+                            question=f"Question {i % 50}", answer="answer text " * 20,
+                            score=7.0, feedback="feedback text " * 10)
+
+
+async def per_row_commits(rows, concurrency):
+    from backend.models import AsyncSessionLocal
+
+    async def worker(offset):
+        for i in range(offset, rows, concurrency):
+            async with AsyncSessionLocal() as db:
+                db.add(make_row(i))
+                await db.commit()
+
+    await asyncio.gather(*(worker(k) for k in range(concurrency)))
+
+
+async def write_behind(rows, concurrency, interval_ms, max_rows):
+    from backend.writebehind import WriteBehindBuffer
+
+    buffer = WriteBehindBuffer(interval_ms=interval_ms, max_rows=max_rows)
+    buffer.start()
+
+    async def worker(offset):
+        for i in range(offset, rows, concurrency):
+            await buffer.add([make_row(i)])
+            await asyncio.sleep(0)  # yield like a request handler would
+
+    await asyncio.gather(*(worker(k) for k in range(concurrency)))
+    await buffer.stop()
+    return buffer.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--interval-ms", type=float, default=200)
+    parser.add_argument("--max-rows", type=int, default=100)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix="bench-insert-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{tmpdir}/bench.db"
+    os.environ.setdefault("OPENAI_API_KEY", "sk-fake")
+    from backend.models import init_db
+    init_db()
+
+    t0 = time.perf_counter()
+    asyncio.run(per_row_commits(args.rows, args.concurrency))
+    per_row = args.rows / (time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    stats = asyncio.run(write_behind(args.rows, args.concurrency, args.interval_ms, args.max_rows))
+    grouped = args.rows / (time.perf_counter() - t0)
+
+    print(f"{args.rows} rows, {args.concurrency} concurrent writers")
+    print(f"commit per row      {per_row:10.0f} rows/s")
+    print(f"write-behind        {grouped:10.0f} rows/s  ({stats['flushes']} flushes, "
+          f"max {args.max_rows} rows / {args.interval_ms:.0f} ms)")
+    print(f"speedup             {grouped / per_row:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
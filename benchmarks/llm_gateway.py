@@ -0,0 +1,99 @@
+"""
+LLM gateway under upstream rate limiting.
+
+Starts the fake LLM server with a fraction of requests answered 429 plus latency
+jitter, then calls llm.evaluate_answer directly. Every distinct answer is submitted
+--dupes times at once (double submits, client retries). Two configurations are compared:
+
+- bare: no retries, no coalescing, no client-side limits (any 429 becomes a fallback)
+- gateway: the defaults from backend.llm_gateway (retries with jittered backoff,
+  single-flight coalescing, RPM/TPM buckets)
+
+Reports real evaluations vs fallbacks, upstream requests made, 429s received and latency.
+
+    python -m benchmarks.llm_gateway --answers 200 --dupes 3 --rate-limit-rate 0.2
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from benchmarks.load_evaluate import percentile
+
+
+async def run(answers, dupes, concurrency, tag):
+    from backend import llm
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def submit(i):
+        async with semaphore:
+            t0 = time.perf_counter()
+            result = await llm.evaluate_answer(f"Question {i % 20}", f"{tag} answer number {i}", "Technical")
+            latencies.append(time.perf_counter() - t0)
+            return result
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(submit(i) for i in range(answers) for _ in range(dupes)))
+    elapsed = time.perf_counter() - started
+    fallbacks = sum(1 for r in results if llm.is_fallback(r))
+    return {
+        "ok": len(results) - fallbacks,
+        "fallbacks": fallbacks,
+        "seconds": elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--answers", type=int, default=200, help="distinct answers")
+    parser.add_argument("--dupes", type=int, default=3, help="concurrent submissions of each answer")
+    parser.add_argument("--concurrency", type=int, default=64, help="submissions in flight")
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=100.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.2, help="fraction of requests answered 429")
+    parser.add_argument("--retry-after-s", type=float, default=0.0)
+    parser.add_argument("--llm-port", type=int, default=9130)
+    args = parser.parse_args()
+
+    os.environ["OPENAI_API_KEY"] = "sk-fake"
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{args.llm_port}/v1"
+    os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+    from backend import llm
+    from backend.cache import evaluation_cache
+    from backend.llm_gateway import LLMGateway
+    from benchmarks.fake_llm import serve_in_thread
+
+    _, fake = serve_in_thread(args.llm_port, args.latency_ms, rate_limit_rate=args.rate_limit_rate,
+                              retry_after_s=args.retry_after_s, latency_jitter_ms=args.latency_jitter_ms, seed=1)
+    configs = {
+        "bare": LLMGateway(llm.make_client(), rpm=0, tpm=0, max_concurrency=args.concurrency, max_retries=0, coalesce=False),
+        "gateway": LLMGateway(llm.make_client(), max_concurrency=args.concurrency),
+    }
+
+    print(f"{args.answers} answers x {args.dupes} submissions, {args.rate_limit_rate:.0%} of upstream requests get 429")
+    print(f"{'config':>8} {'ok':>6} {'fallback':>9} {'upstream':>9} {'429s':>6} {'coalesced':>10} "
+          f"{'seconds':>8} {'p50 ms':>8} {'p95 ms':>8}")
+
+    async def run_all():
+        # one event loop for every config: the OpenAI client's connection pool is bound to it
+        for name, gateway in configs.items():
+            llm.gateway = gateway
+            evaluation_cache.clear()
+            calls_before, limited_before = fake.state.calls, fake.state.rate_limited
+            r = await run(args.answers, args.dupes, args.concurrency, name)
+            limited = fake.state.rate_limited - limited_before
+            upstream = fake.state.calls - calls_before + limited
+            print(f"{name:>8} {r['ok']:>6} {r['fallbacks']:>9} {upstream:>9} {limited:>6} {gateway.coalesced:>10} "
+                  f"{r['seconds']:>8.2f} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f}")
+
+    asyncio.run(run_all())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Concurrency scaling benchmark for POST /evaluate.
+
+Starts the fake LLM server and the backend (both on uvicorn, in this process) against a
+throwaway SQLite database, then drives /evaluate at increasing numbers of in-flight
+requests and reports throughput and latency for each level.
+
+    python -m benchmarks.load_evaluate --latency-ms 200 --concurrency 8 32 128 500
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    k = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[k]
+
+
+async def run_level(base_url, concurrency, total):
+    import httpx
+
+    latencies = []
+    errors = 0
+    queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(i)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as http:
+        async def worker():
+            nonlocal errors
+            while True:
+                try:
+                    i = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                payload = {"question": f"Question {i % 50}", "answer": f"Answer number {i}", "mode": "Technical"}
+                t0 = time.perf_counter()
+                try:
+                    resp = await http.post("/evaluate", json=payload)
+                    resp.raise_for_status()
+                except Exception:
+                    errors += 1
+                latencies.append(time.perf_counter() - t0)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "rps": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="fake LLM response delay")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[8, 32, 128, 500])
+    parser.add_argument("--rounds", type=int, default=4, help="requests per in-flight slot at each level")
+    parser.add_argument("--llm-port", type=int, default=9100)
+    parser.add_argument("--backend-port", type=int, default=9101)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix="bench-evaluate-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{tmpdir}/bench.db"
+    os.environ["OPENAI_API_KEY"] = "sk-fake"
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{args.llm_port}/v1"
+    # measure the backend itself, not the gateway's client-side rate limits
+    os.environ.setdefault("LLM_RPM", "0")
+    os.environ.setdefault("LLM_TPM", "0")
+    os.environ.setdefault("LLM_MAX_CONCURRENCY", str(max(args.concurrency)))
+
+    import uvicorn
+    from benchmarks.fake_llm import serve_in_thread
+    from backend.main import app
+
+    serve_in_thread(args.llm_port, args.latency_ms)
+    backend = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=args.backend_port,
+                                            log_level="warning", backlog=4096))
+    threading.Thread(target=backend.run, daemon=True).start()
+    while not backend.started:
+        time.sleep(0.05)
+
+    base_url = f"http://127.0.0.1:{args.backend_port}"
+    print(f"fake LLM latency: {args.latency_ms:.0f} ms")
+    print(f"{'in-flight':>9} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for level in args.concurrency:
+        r = asyncio.run(run_level(base_url, level, level * args.rounds))
+        print(f"{r['concurrency']:>9} {r['requests']:>9} {r['errors']:>7} {r['rps']:>9.1f} "
+              f"{r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f}")
+
+    backend.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Microbenchmarks for the frontend's local hot paths, with JSON results for regression checks.
+
+- mock_evaluate_answer (Mock Mode scoring) on a short and a long answer
+- make_pdf_bytes: the session PDF download. main.py's make_pdf_bytes is an
+  st.cache_data wrapper around backend.pdf.session_pdf_bytes, and main.py can't be
+  imported outside `streamlit run`, so the uncached function is timed: 5 typical
+  answers and 5 long ones
+- generate_questions: main.py's generate_questions samples the shared QuestionBank,
+  so QuestionBank.sample is timed on the shipped bank (3 and 5 questions), plus
+  QuestionBank.load, which the frontend pays once per process
+
+Each case runs enough calls to take about 0.2 s, repeated --repeat times. The
+reported figure is the fastest repeat, which is the least noisy on a shared machine.
+
+    python -m benchmarks.micro --json current.json --baseline benchmarks/baselines/micro.json
+"""
+import argparse
+import random
+import timeit
+
+from backend.offline_scorer import mock_evaluate_answer
+from backend.pdf import session_pdf_bytes
+from backend.question_bank import QUESTION_BANK_PATH, QuestionBank
+from benchmarks.results import add_arguments, check, write_results
+
+SHORT_ANSWER = "Use a hash map."
+LONG_ANSWER = " ".join(
+    ["I would start with the brute force approach and then discuss the time complexity and space trade-off,"
+     " cover an edge case like empty input, and add tests for scalable inputs."] * 40)
+SESSION_META = {"role": "Software Engineer", "domain": "Backend", "mode": "Technical", "avg_score": "6.40"}
+
+
+def qa_list(answer):
+    return [{"question": f"Question {i}: explain how you would design a rate limiter?", "answer": answer,
+             "eval": mock_evaluate_answer("q", answer, "Technical")} for i in range(5)]
+
+
+def cases():
+    bank = QuestionBank.load(QUESTION_BANK_PATH)
+    rng = random.Random(0)
+    typical, long_qa = qa_list(LONG_ANSWER[:600]), qa_list(LONG_ANSWER)
+    return {
+        "mock_evaluate_answer.short": lambda: mock_evaluate_answer("q", SHORT_ANSWER, "Technical"),
+        "mock_evaluate_answer.long": lambda: mock_evaluate_answer("q", LONG_ANSWER, "Technical"),
+        "make_pdf_bytes.5_answers": lambda: session_pdf_bytes(SESSION_META, typical),
+        "make_pdf_bytes.5_long_answers": lambda: session_pdf_bytes(SESSION_META, long_qa),
+        "generate_questions.n3": lambda: bank.sample("Software Engineer", "General", 3, rng=rng),
+        "generate_questions.n5": lambda: bank.sample("Software Engineer", "General", 5, rng=rng),
+        "question_bank.load": lambda: QuestionBank.load(QUESTION_BANK_PATH),
+    }
+
+
+def time_case(fn, repeat):
+    """Fastest time per call in microseconds over `repeat` runs of ~0.2 s each."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", nargs="+", metavar="CASE", help="run only cases starting with these names")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    metrics = {}
+    print(f"{'case':<34} {'us/call':>10} {'calls/s':>10}")
+    for name, fn in cases().items():
+        if args.only and not name.startswith(tuple(args.only)):
+            continue
+        us = time_case(fn, args.repeat)
+        metrics[f"{name}.us"] = us
+        print(f"{name:<34} {us:>10.2f} {1e6 / us:>10.0f}")
+
+    if args.json:
+        write_results(args.json, "micro", metrics)
+    if args.baseline:
+        check(metrics, args.baseline, args.tolerance)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Throughput of the batch offline scorer versus per-call mock_evaluate_answer. (That the
+two agree is checked by tests/test_offline_scorer.py.)
+
+Generates --answers synthetic answers (word counts around the 15/60-word thresholds,
+key terms in mixed case, overlapping terms), then times:
+  - mock_evaluate_answer called once per answer
+  - evaluate_batch (per-answer features in a batched loop, NumPy scores, dict results)
+  - score_jsonl end to end, JSONL in -> JSONL out, with 1 and --workers processes;
+    --workers is capped at the usable cores, so on a single-core host only the
+    in-process run is timed (a pool there is slower, not faster)
+
+    python -m benchmarks.offline_scorer --answers 1000000 --workers 4
+"""
+import argparse
+import io
+import json
+import os
+import random
+import tempfile
+import time
+
+from backend.offline_scorer import evaluate_batch, mock_evaluate_answer, score_jsonl, usable_cores
+
+VOCAB = ("the a we it is to of and in that for with on this as by process thread memory queue cache index "
+         "Complexity time space edge case scalable tests trade-off STAR impact testspace sometimes").split()
+
+
+def synthetic_answers(count, rng):
+    return [" ".join(rng.choice(VOCAB) for _ in range(rng.choice((5, 14, 16, 40, 61, 90)))) for _ in range(count)]
+
+
+def rate(count, seconds):
+    return f"{count / seconds:12,.0f} answers/s  ({count / seconds * 60 / 1e6:5.2f} M/min)"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--answers", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, default=usable_cores())
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    answers = synthetic_answers(args.answers, random.Random(11))
+
+    t0 = time.perf_counter()
+    reference = [mock_evaluate_answer("", a, "Technical") for a in answers]
+    print(f"mock_evaluate_answer per call  {rate(len(answers), time.perf_counter() - t0)}")
+
+    t0 = time.perf_counter()
+    for i in range(0, len(answers), args.batch_size):
+        evaluate_batch(answers[i:i + args.batch_size])
+    print(f"evaluate_batch                 {rate(len(answers), time.perf_counter() - t0)}")
+
+    path = os.path.join(tempfile.mkdtemp(prefix="bench-scorer-"), "answers.jsonl")
+    with open(path, "w", encoding="utf-8") as f:
+        for i, a in enumerate(answers):
+            f.write(json.dumps({"id": i, "question": "", "answer": a, "mode": "Technical"}) + "\n")
+
+    cores = usable_cores()
+    if args.workers > cores:
+        print(f"note: {cores} usable core(s); score_jsonl caps --workers {args.workers} at {cores}")
+    for workers in sorted({1, min(args.workers, cores)}):
+        out = io.StringIO()
+        t0 = time.perf_counter()
+        with open(path, encoding="utf-8") as src:
+            count = score_jsonl(src, out, args.batch_size, workers)
+        print(f"score_jsonl ({workers} worker{'s' if workers > 1 else ''})".ljust(31) + rate(count, time.perf_counter() - t0))
+        first = json.loads(out.getvalue().split("\n", 1)[0])
+        assert first == {"id": 0, **reference[0]}
+
+
+if __name__ == "__main__":
+    main()
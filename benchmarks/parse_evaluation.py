@@ -0,0 +1,85 @@
+"""
+Parse + validate throughput and success rate for evaluation completions.
+
+Uses the corpus in benchmarks/data/evaluation_responses.jsonl: one completion per
+shape seen from chat models (bare and pretty JSON, markdown fences, prose before or
+after the object, string scores, a string where a list belongs, null fields, extra
+fields, trailing commas, a truncated completion, a refusal). Compares:
+
+- json.loads: the old path (no validation; anything else was a fallback)
+- json.loads + validate: decode, then EvaluationResult.model_validate
+- parse_evaluation: pydantic-core validates straight from the JSON text, with the
+  tolerant extractor for everything else
+
+First over the whole corpus, then over the structured-output case alone (what the
+model returns with response_format=json_schema).
+
+    python -m benchmarks.parse_evaluation --repeat 20000
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+
+from backend.schemas import EvaluationResult, parse_evaluation
+
+CORPUS = Path(__file__).parent / "data" / "evaluation_responses.jsonl"
+
+
+def old_parse(text):
+    data = json.loads(text)
+    if not isinstance(data, dict):
+        raise ValueError("Response not dict")
+    return data
+
+
+def loads_and_validate(text):
+    return EvaluationResult.model_validate(json.loads(text))
+
+
+METHODS = {
+    "json.loads": old_parse,
+    "json.loads + validate": loads_and_validate,
+    "parse_evaluation": parse_evaluation,
+}
+
+
+def run(method, texts, repeat):
+    ok = 0
+    for text in texts:
+        try:
+            method(text)
+            ok += 1
+        except Exception:
+            pass
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            try:
+                method(text)
+            except Exception:
+                pass
+    elapsed = time.perf_counter() - started
+    return ok, repeat * len(texts) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20000, help="passes over each corpus")
+    args = parser.parse_args()
+
+    rows = [json.loads(line) for line in CORPUS.read_text(encoding="utf-8").splitlines() if line.strip()]
+    corpora = {
+        "all shapes": [row["content"] for row in rows],
+        "json_schema only": [row["content"] for row in rows if row["kind"] == "json_schema"],
+    }
+    for name, texts in corpora.items():
+        print(f"{name} ({len(texts)} completions)")
+        print(f"  {'method':<22} {'parsed':>8} {'parses/s':>10}")
+        for label, method in METHODS.items():
+            ok, rate = run(method, texts, max(1, args.repeat // len(texts)))
+            print(f"  {label:<22} {ok:>4}/{len(texts):<3} {rate:>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Load and sampling cost of backend.question_bank on a large synthetic bank.
+
+Writes --questions synthetic questions (spread over roles, domains, types and
+difficulties, with --dup-rate exact/near duplicates) to a temp file, loads it, and
+times QuestionBank.sample for n mixed-difficulty questions, with and without a
+per-user history of already served questions.
+
+    python -m benchmarks.question_bank --questions 100000 --n 5
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from backend.question_bank import QuestionBank
+
+ROLES = [f"Role {i}" for i in range(10)]
+DOMAINS = [f"Domain {i}" for i in range(10)]
+TYPES = ["concept", "algorithm", "system-design", "behavioral"]
+DIFFICULTIES = ["easy", "medium", "hard"]
+
+
+def synthetic_questions(count, dup_rate, rng):
+    questions = []
+    for i in range(count):
+        if questions and rng.random() < dup_rate:
+            q = dict(rng.choice(questions), id=i + 1)
+            q["question"] = "  " + q["question"].upper() + "?"  # same text after normalization
+        else:
+            q = {"id": i + 1, "role": rng.choice(ROLES), "domain": rng.choice(DOMAINS),
+                 "question": f"Synthetic question number {i} about topic {i % 997}.",
+                 "type": rng.choice(TYPES), "difficulty": rng.choice(DIFFICULTIES), "hint": ""}
+        questions.append(q)
+    return questions
+
+
+def time_samples(bank, calls, n, user_ids, rng):
+    timings = []
+    for k in range(calls):
+        role, domain = rng.choice(ROLES), rng.choice(DOMAINS)
+        user_id = user_ids[k % len(user_ids)] if user_ids else None
+        t0 = time.perf_counter()
+        picked = bank.sample(role, domain, n, user_id=user_id, rng=rng)
+        timings.append((time.perf_counter() - t0) * 1e6)
+        assert len({q["id"] for q in picked}) == len(picked)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.99)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=100_000)
+    parser.add_argument("--dup-rate", type=float, default=0.05)
+    parser.add_argument("--n", type=int, default=5)
+    parser.add_argument("--calls", type=int, default=20_000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    path = os.path.join(tempfile.mkdtemp(prefix="bench-bank-"), "questions.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(synthetic_questions(args.questions, args.dup_rate, rng), f)
+
+    t0 = time.perf_counter()
+    bank = QuestionBank.load(path)
+    load_s = time.perf_counter() - t0
+    print(f"loaded {args.questions} questions -> {len(bank)} after dedup in {load_s * 1000:.0f} ms")
+
+    p50, p99 = time_samples(bank, args.calls, args.n, None, rng)
+    print(f"sample n={args.n} anonymous          p50 {p50:7.1f} us   p99 {p99:7.1f} us")
+    p50, p99 = time_samples(bank, args.calls, args.n, [f"user-{i}" for i in range(50)], rng)
+    print(f"sample n={args.n} with user history  p50 {p50:7.1f} us   p99 {p99:7.1f} us")
+
+
+if __name__ == "__main__":
+    main()
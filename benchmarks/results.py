@@ -0,0 +1,101 @@
+"""
+JSON benchmark results and regression checks against a stored baseline.
+
+A results file is {"benchmark": ..., "environment": {...}, "metrics": {name: value}}.
+Metric names ending in "rps" or "per_s" are better when higher; every other metric
+(latencies, error rates, bytes) is better when lower. A metric regresses when it is
+worse than the baseline by more than --tolerance (a fraction); a baseline of 0 (no
+errors, no DB growth) allows nothing above 0. Metrics missing on either side are listed
+but don't fail the check.
+
+    python -m benchmarks.micro --json current.json
+    python -m benchmarks.results current.json benchmarks/baselines/micro.json --tolerance 0.25
+
+Scripts that write results also take --baseline/--tolerance and exit with status 1 on a
+regression, so the check can run in CI.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+from pathlib import Path
+
+HIGHER_IS_BETTER = ("rps", "per_s")
+
+
+def environment():
+    return {"python": platform.python_version(), "platform": platform.platform(), "cpu_count": os.cpu_count()}
+
+
+def write_results(path, benchmark, metrics, **extra):
+    results = {"benchmark": benchmark, "environment": environment(), **extra, "metrics": metrics}
+    Path(path).write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+    return results
+
+
+def load_metrics(path):
+    return json.loads(Path(path).read_text())["metrics"]
+
+
+def higher_is_better(name):
+    return name.endswith(HIGHER_IS_BETTER)
+
+
+def compare(current, baseline, tolerance=0.25):
+    """
+    One row per metric in either dict: (name, baseline, current, change, regressed).
+    change is the relative difference (None when the baseline is 0 or the metric is missing).
+    """
+    rows = []
+    for name in sorted(set(current) | set(baseline)):
+        base, value = baseline.get(name), current.get(name)
+        if base is None or value is None:
+            rows.append((name, base, value, None, False))
+            continue
+        change = (value - base) / base if base else None
+        if higher_is_better(name):
+            regressed = value < base * (1 - tolerance)
+        else:
+            regressed = value > base * (1 + tolerance)
+        rows.append((name, base, value, change, regressed))
+    return rows
+
+
+def report(rows, tolerance):
+    """Print the comparison table; returns the number of regressions."""
+    print(f"\n{'metric':<48} {'baseline':>12} {'current':>12} {'change':>8}")
+    regressions = 0
+    for name, base, value, change, regressed in rows:
+        shown = "-" if change is None else f"{change:+.0%}"
+        flag = "  REGRESSION" if regressed else ("  (missing)" if base is None or value is None else "")
+        print(f"{name:<48} {'-' if base is None else f'{base:.4g}':>12} "
+              f"{'-' if value is None else f'{value:.4g}':>12} {shown:>8}{flag}")
+        regressions += regressed
+    print(f"\n{regressions} regression(s) beyond {tolerance:.0%}")
+    return regressions
+
+
+def check(metrics, baseline_path, tolerance):
+    """Compare against the baseline file and exit with status 1 on any regression."""
+    if report(compare(metrics, load_metrics(baseline_path), tolerance), tolerance):
+        sys.exit(1)
+
+
+def add_arguments(parser):
+    parser.add_argument("--json", metavar="PATH", help="write the results to this JSON file")
+    parser.add_argument("--baseline", metavar="PATH", help="compare with a stored results file; exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown (default 0.25)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("current")
+    parser.add_argument("baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+    check(load_metrics(args.current), args.baseline, args.tolerance)
+
+
+if __name__ == "__main__":
+    main()
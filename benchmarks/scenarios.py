@@ -0,0 +1,234 @@
+"""
+End-to-end load scenarios at a target request rate, against the fake LLM.
+
+Starts benchmarks.fake_llm and `python -m backend.serve` as subprocesses (so the load
+generator doesn't share a GIL with the server) on a throwaway SQLite database seeded
+with --seed-rows sessions, then for each scenario and each --rps level sends requests
+open-loop for --duration seconds:
+
+- generate: POST /generate (3 questions from the bank)
+- evaluate: POST /evaluate with a unique answer (a cache miss: one LLM call and one insert)
+- sessions: GET /sessions, first page of 50, alternating full and summary fields
+- mixed: 50% evaluate, 30% sessions, 20% generate
+
+Requests go out on schedule (Poisson or evenly spaced arrivals) whether or not earlier
+ones have finished, and latency is measured from the scheduled send time, so a server
+that falls behind shows up in the percentiles instead of slowing the load down.
+Reported per scenario: achieved req/s, errors (transport errors and HTTP >= 400),
+evaluations that came back as fallbacks, p50/p95/p99/max latency, and how much the
+database grew (sessions rows, and bytes on disk after a WAL checkpoint).
+
+The fake LLM options shape the upstream: e.g. --latency-dist lognormal
+--latency-jitter-ms 150 for a long tail, --error-rate 0.02 for 500s the gateway retries,
+--canned file.json for a different evaluation.
+
+    python -m benchmarks.scenarios --rps 10 50 --duration 20 --json baseline.json
+    python -m benchmarks.scenarios --rps 10 50 --duration 20 --baseline baseline.json
+"""
+import argparse
+import asyncio
+import os
+import random
+import signal
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.analytics import fill
+from benchmarks.fake_llm import LATENCY_DISTS
+from benchmarks.load_evaluate import percentile
+from benchmarks.results import add_arguments, check, write_results
+from benchmarks.serve_scaling import answers, wait_until
+
+ROLES = ["Software Engineer", "Product Manager", "Data Analyst"]
+MIXED = [("evaluate", 0.5), ("sessions", 0.3), ("generate", 0.2)]
+
+
+def generate_request(i, rng):
+    return "POST", "/generate", {"json": {"role": rng.choice(ROLES), "domain": "General",
+                                          "mode": "Technical", "n": 3}}
+
+
+def evaluate_request(i, rng):
+    return "POST", "/evaluate", {"json": {"question": f"Question {i % 50}", "mode": "Technical",
+                                          "answer": f"Answer {i}-{rng.random():.12f}: use a hash map, O(n) time."}}
+
+
+def sessions_request(i, rng):
+    return "GET", "/sessions", {"params": {"limit": 50, "fields": "summary" if i % 2 else "full"}}
+
+
+def mixed_request(i, rng):
+    name = rng.choices([name for name, _ in MIXED], weights=[w for _, w in MIXED])[0]
+    return SCENARIOS[name](i, rng)
+
+
+SCENARIOS = {
+    "generate": generate_request,
+    "evaluate": evaluate_request,
+    "sessions": sessions_request,
+    "mixed": mixed_request,
+}
+
+
+def db_stats(db_path):
+    """(sessions rows, database bytes) after checkpointing the WAL into the main file."""
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        rows = conn.execute("SELECT count(*) FROM sessions").fetchone()[0]
+    finally:
+        conn.close()
+    return rows, sum(os.path.getsize(p) for p in (db_path, db_path + "-wal") if os.path.exists(p))
+
+
+async def send(http, method, path, kwargs, scheduled, results):
+    errors = fallback = 0
+    try:
+        resp = await http.request(method, path, **kwargs)
+        if resp.status_code >= 400:
+            errors = 1
+        elif path == "/evaluate" and resp.json()["eval"].get("fallback"):
+            fallback = 1
+    except httpx.HTTPError:
+        errors = 1
+    results.append((time.perf_counter() - scheduled, errors, fallback))
+
+
+async def run_scenario(base_url, name, rps, duration, arrivals, max_in_flight, rng):
+    count = max(1, int(rps * duration))
+    offsets, t = [], 0.0
+    for i in range(count):
+        offsets.append(t)
+        t += rng.expovariate(rps) if arrivals == "poisson" else 1 / rps
+
+    results = []
+    limits = httpx.Limits(max_connections=max_in_flight, max_keepalive_connections=max_in_flight)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as http:
+        tasks = []
+        started = time.perf_counter()
+        for i, offset in enumerate(offsets):
+            delay = started + offset - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            method, path, kwargs = SCENARIOS[name](i, rng)
+            tasks.append(asyncio.create_task(send(http, method, path, kwargs, started + offset, results)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+    latencies = [r[0] for r in results]
+    errors = sum(r[1] for r in results)
+    return {
+        "requests": count,
+        "rps": count / elapsed,
+        "errors": errors,
+        "error_rate": errors / count,
+        "fallback_rate": sum(r[2] for r in results) / count,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": max(latencies) * 1000,
+    }
+
+
+def start_servers(args, tmpdir, db_path):
+    llm_cmd = [sys.executable, "-m", "benchmarks.fake_llm", "--port", str(args.llm_port),
+               "--latency-ms", str(args.latency_ms), "--latency-dist", args.latency_dist,
+               "--latency-jitter-ms", str(args.latency_jitter_ms), "--error-rate", str(args.error_rate),
+               "--seed", str(args.seed)] + (["--canned", args.canned] if args.canned else [])
+    env = dict(os.environ,
+               DATABASE_URL=f"sqlite:///{db_path}",
+               STATE_URL=os.path.join(tmpdir, "state.db"),
+               OPENAI_API_KEY="sk-fake",
+               OPENAI_BASE_URL=f"http://127.0.0.1:{args.llm_port}/v1",
+               LLM_RPM="0", LLM_TPM="0",  # measure the backend, not client-side rate limits
+               LLM_MAX_CONCURRENCY=str(args.max_in_flight))
+    backend_cmd = [sys.executable, "-m", "backend.serve", "--workers", str(args.workers), "--port", str(args.port),
+                   "--no-migrate", "--log-level", "warning"]
+    llm = subprocess.Popen(llm_cmd)
+    backend = subprocess.Popen(backend_cmd, env=env)
+    if not wait_until(lambda: answers(args.port)):
+        raise RuntimeError("backend did not come up")
+    return llm, backend
+
+
+def stop(proc):
+    proc.send_signal(signal.SIGTERM)
+    try:
+        proc.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--rps", type=float, nargs="+", default=[20.0], help="target request rates")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per scenario and rate")
+    parser.add_argument("--arrivals", choices=["poisson", "uniform"], default="poisson")
+    parser.add_argument("--max-in-flight", type=int, default=256)
+    parser.add_argument("--seed-rows", type=int, default=10_000, help="sessions in the database before the run")
+    parser.add_argument("--workers", type=int, default=1, help="backend worker processes")
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="fake LLM response delay")
+    parser.add_argument("--latency-dist", choices=LATENCY_DISTS, default="lognormal")
+    parser.add_argument("--latency-jitter-ms", type=float, default=100.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of fake LLM calls answered with 500")
+    parser.add_argument("--canned", metavar="PATH", help="JSON file with the evaluation the fake LLM returns")
+    parser.add_argument("--seed", type=int, default=1, help="seeds arrivals, payloads and the fake LLM")
+    parser.add_argument("--port", type=int, default=9160)
+    parser.add_argument("--llm-port", type=int, default=9161)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix="bench-scenarios-")
+    db_path = os.path.join(tmpdir, "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    from backend.models import engine, init_db
+
+    init_db()
+    engine.dispose()
+    fill(db_path, args.seed_rows)
+
+    llm, backend = start_servers(args, tmpdir, db_path)
+    base_url = f"http://127.0.0.1:{args.port}"
+    rng = random.Random(args.seed)
+    metrics = {}
+    try:
+        # warm up connections, the question bank and the LLM client; not measured
+        asyncio.run(run_scenario(base_url, "mixed", 20, 1, "uniform", args.max_in_flight, random.Random(0)))
+        print(f"fake LLM: {args.latency_dist} {args.latency_ms:.0f} ms (jitter {args.latency_jitter_ms:.0f} ms), "
+              f"error rate {args.error_rate:.0%}; {args.workers} worker(s), {args.seed_rows} seeded rows, "
+              f"{args.duration:.0f}s per run")
+        print(f"{'scenario':<9} {'target':>7} {'req/s':>7} {'errors':>6} {'fallbk':>6} {'p50 ms':>8} "
+              f"{'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'rows+':>6} {'db KB+':>8}")
+        for name in args.scenarios:
+            for rps in args.rps:
+                rows, size = db_stats(db_path)
+                r = asyncio.run(run_scenario(base_url, name, rps, args.duration, args.arrivals,
+                                             args.max_in_flight, rng))
+                rows_after, size_after = db_stats(db_path)
+                r["db_growth_bytes"] = size_after - size
+                rows_added = rows_after - rows
+                print(f"{name:<9} {rps:>7.0f} {r['rps']:>7.1f} {r['errors']:>6} {r['fallback_rate']:>6.1%} "
+                      f"{r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} {r['max_ms']:>8.1f} "
+                      f"{rows_added:>6} {r['db_growth_bytes'] / 1024:>8.1f}")
+                for key in ("rps", "error_rate", "fallback_rate", "p50_ms", "p95_ms", "p99_ms", "db_growth_bytes"):
+                    metrics[f"{name}@{rps:g}.{key}"] = r[key]
+    finally:
+        stop(backend)
+        stop(llm)
+
+    if args.json:
+        write_results(args.json, "scenarios", metrics, options={
+            k: getattr(args, k) for k in ("duration", "arrivals", "seed_rows", "workers", "latency_ms",
+                                          "latency_dist", "latency_jitter_ms", "error_rate", "canned", "seed")})
+    if args.baseline:
+        check(metrics, args.baseline, args.tolerance)
+
+
+if __name__ == "__main__":
+    main()
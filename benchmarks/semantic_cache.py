@@ -0,0 +1,91 @@
+"""
+LLM-call savings and lookup cost of the semantic answer cache on synthetic traffic.
+
+Each question gets a few distinct "original" answers; submissions are either a new
+original or a light rewording of an earlier one (a word dropped, swapped or added).
+Every submission that misses is "sent to the LLM" and stored. Reports the savings
+rate, how many reused evaluations came from a different original (false matches),
+lookup latency and index memory.
+
+    python -m benchmarks.semantic_cache --questions 200 --submissions 20000 --threshold 0.9
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from backend.semantic_cache import SemanticCache  # noqa: E402
+
+WORDS = ("process thread memory scheduler stack heap kernel context switch cache lock mutex queue latency "
+         "throughput index database query transaction isolation replica shard partition hash tree graph "
+         "cycle search sort complexity time space edge case test scalable design trade-off impact").split()
+
+
+def original_answer(rng):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(25, 60)))
+
+
+def reword(answer, rng):
+    words = answer.split()
+    for _ in range(rng.randint(1, 2)):
+        op = rng.random()
+        i = rng.randrange(len(words))
+        if op < 0.33 and len(words) > 10:
+            del words[i]
+        elif op < 0.66:
+            words[i] = rng.choice(WORDS)
+        else:
+            words.insert(i, rng.choice(WORDS))
+    return " ".join(words)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=200)
+    parser.add_argument("--submissions", type=int, default=20_000)
+    parser.add_argument("--reword-rate", type=float, default=0.6, help="share of submissions that reword an earlier answer")
+    parser.add_argument("--threshold", type=float, default=0.9)
+    parser.add_argument("--max-entries", type=int, default=5000)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    cache = SemanticCache(enabled=True, threshold=args.threshold, max_entries=args.max_entries)
+    originals = {q: [] for q in range(args.questions)}
+    llm_calls = false_matches = 0
+    timings = []
+
+    for n in range(args.submissions):
+        q = rng.randrange(args.questions)
+        if originals[q] and rng.random() < args.reword_rate:
+            origin = rng.randrange(len(originals[q]))
+            answer = reword(originals[q][origin], rng)
+        else:
+            origin = len(originals[q])
+            answer = original_answer(rng)
+            originals[q].append(answer)
+
+        t0 = time.perf_counter()
+        hit = cache.lookup(f"Question {q}", answer, "Technical")
+        timings.append((time.perf_counter() - t0) * 1e6)
+        if hit is None:
+            llm_calls += 1
+            cache.add(f"Question {q}", answer, "Technical", {"score": 5.0, "origin": origin})
+        elif hit["origin"] != origin:
+            false_matches += 1
+
+    stats = cache.stats()
+    timings.sort()
+    print(f"{args.submissions} submissions over {args.questions} questions, threshold {args.threshold}")
+    print(f"LLM calls            {llm_calls}")
+    print(f"savings rate         {stats['savings_rate']:.1%}  ({stats['hits']} reused evaluations)")
+    print(f"false matches        {false_matches}")
+    print(f"lookup latency       p50 {statistics.median(timings):.0f} us   p99 {timings[int(len(timings) * 0.99)]:.0f} us")
+    print(f"index                {stats['entries']} entries, {stats['evictions']} evictions, "
+          f"{stats['memory_bytes'] / 2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Cold start and /evaluate throughput of backend.serve by worker count.
+
+For each --workers value: starts the fake LLM and `python -m backend.serve --workers N`
+as subprocesses against a fresh SQLite database and shared-state file, then reports:
+
+- migrate: the one-shot schema migration in the launcher
+- first ready / all ready: seconds from launch until the first worker answers, and
+  until every worker has finished lifespan startup
+- req/s and latency percentiles for /evaluate at --concurrency in-flight requests
+  (unique answers, so every request is a cache miss and reaches the fake LLM)
+- shutdown: seconds from SIGTERM until the launcher exits
+
+Throughput can only scale up to the number of CPU cores available.
+
+    python -m benchmarks.serve_scaling --workers 1 2 4 --concurrency 64 --latency-ms 50
+"""
+import argparse
+import asyncio
+import os
+import re
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import httpx
+
+from benchmarks.load_evaluate import run_level
+
+
+def watch_output(proc, events):
+    """Timestamp the launcher's log lines we care about."""
+    for line in proc.stdout:
+        now = time.perf_counter()
+        if "Application startup complete" in line:
+            events.setdefault("ready", []).append(now)
+        match = re.search(r"schema migrated in ([\d.]+)s", line)
+        if match:
+            events["migrate"] = float(match.group(1))
+
+
+def wait_until(predicate, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def answers(port):
+    try:
+        return httpx.get(f"http://127.0.0.1:{port}/", timeout=1).status_code == 200
+    except httpx.HTTPError:
+        return False
+
+
+def run_workers(workers, args, llm_port):
+    tmpdir = tempfile.mkdtemp(prefix="bench-serve-")
+    env = dict(os.environ,
+               DATABASE_URL=f"sqlite:///{tmpdir}/bench.db",
+               STATE_URL=f"{tmpdir}/state.db",
+               OPENAI_API_KEY="sk-fake",
+               OPENAI_BASE_URL=f"http://127.0.0.1:{llm_port}/v1",
+               LLM_RPM="0", LLM_TPM="0",  # measure the backend, not client-side rate limits
+               LLM_MAX_CONCURRENCY=str(args.concurrency),
+               PYTHONUNBUFFERED="1")
+    cmd = [sys.executable, "-m", "backend.serve", "--workers", str(workers), "--port", str(args.port),
+           "--log-level", "info", "--state-backend", args.state_backend]
+    events = {}
+    started = time.perf_counter()
+    proc = subprocess.Popen(cmd, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    threading.Thread(target=watch_output, args=(proc, events), daemon=True).start()
+    try:
+        if not wait_until(lambda: answers(args.port)):
+            raise RuntimeError("backend did not come up")
+        first_ready = time.perf_counter() - started
+        wait_until(lambda: len(events.get("ready", [])) >= workers)
+        all_ready = max(events.get("ready", [started])) - started
+
+        # warm up every worker's connections before measuring
+        asyncio.run(run_level(f"http://127.0.0.1:{args.port}", args.concurrency, args.concurrency))
+        result = asyncio.run(run_level(f"http://127.0.0.1:{args.port}", args.concurrency,
+                                       args.concurrency * args.rounds))
+    finally:
+        stop_started = time.perf_counter()
+        proc.send_signal(signal.SIGTERM)
+        try:
+            proc.wait(timeout=60)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+        shutdown = time.perf_counter() - stop_started
+    return {"workers": workers, "migrate": events.get("migrate", 0.0), "first_ready": first_ready,
+            "all_ready": all_ready, "shutdown": shutdown, **result}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--rounds", type=int, default=10, help="requests per in-flight slot")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="fake LLM response delay")
+    parser.add_argument("--state-backend", default="sqlite", choices=["memory", "sqlite", "redis"])
+    parser.add_argument("--port", type=int, default=9150)
+    parser.add_argument("--llm-port", type=int, default=9151)
+    args = parser.parse_args()
+
+    llm = subprocess.Popen([sys.executable, "-m", "benchmarks.fake_llm", "--port", str(args.llm_port),
+                            "--latency-ms", str(args.latency_ms)])
+    try:
+        wait_until(lambda: subprocess.call(
+            [sys.executable, "-c", f"import socket; socket.create_connection(('127.0.0.1', {args.llm_port}))"],
+            stderr=subprocess.DEVNULL) == 0)
+        print(f"CPU cores: {os.cpu_count()}, fake LLM latency {args.latency_ms:.0f} ms, "
+              f"{args.concurrency} in flight, state backend {args.state_backend}")
+        print(f"{'workers':>7} {'migrate s':>9} {'first s':>8} {'all s':>7} {'req/s':>8} {'errors':>6} "
+              f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'stop s':>7}")
+        for workers in args.workers:
+            r = run_workers(workers, args, args.llm_port)
+            print(f"{r['workers']:>7} {r['migrate']:>9.2f} {r['first_ready']:>8.2f} {r['all_ready']:>7.2f} "
+                  f"{r['rps']:>8.1f} {r['errors']:>6} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} "
+                  f"{r['p99_ms']:>8.1f} {r['shutdown']:>7.2f}")
+    finally:
+        llm.terminate()
+        llm.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Page-fetch latency of GET /sessions on a large synthetic sessions table.
+
+Fills a throwaway SQLite database with --rows sessions (1M by default), then times a
+page fetch at several depths with keyset pagination, next to the equivalent OFFSET
+query, unfiltered and filtered by role, role+domain and role+domain+mode. Keyset
+fetches should stay flat as the depth grows and as the filter widens (each filter
+combination has its own (..., created_at, id) index); OFFSET fetches grow linearly.
+
+    python -m benchmarks.sessions_pagination --rows 1000000 --page-size 50
+"""
+import argparse
+import asyncio
+import datetime
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+
+ROLES = ["Software Engineer", "Product Manager", "Data Analyst"]
+DOMAINS = ["General", "Backend", "Frontend", "Machine Learning", "System Design"]
+MODES = ["Technical", "Behavioral"]
+FILTERS = [
+    ("all rows", {}),
+    ("role", {"role": "Software Engineer"}),
+    ("role+domain", {"role": "Software Engineer", "domain": "Backend"}),
+    ("role+domain+mode", {"role": "Software Engineer", "domain": "Backend", "mode": "Technical"}),
+]
+
+
+def fill(db_path, rows, batch=50_000):
+    conn = sqlite3.connect(db_path)
+    start = datetime.datetime(2024, 1, 1)
+    rng = random.Random(7)
+    sql = ("INSERT INTO sessions (role, domain, mode, question, answer, score, feedback, created_at) "
+           "VALUES (?, ?, ?, ?, ?, ?, ?, ?)")
+    for offset in range(0, rows, batch):
+        conn.executemany(sql, [
+            (rng.choice(ROLES), rng.choice(DOMAINS), rng.choice(MODES), f"Question {i % 500}",
+             "answer text " * 20, round(rng.uniform(0, 10), 1), "feedback text " * 10,
+             (start + datetime.timedelta(seconds=i * 3)).isoformat(sep=" ", timespec="microseconds"))
+            for i in range(offset, min(rows, offset + batch))
+        ])
+        conn.commit()
+    conn.close()
+
+
+async def time_call(http, params, repeat):
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        resp = await http.get("/sessions", params=params)
+        resp.raise_for_status()
+        timings.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(timings), resp.json()
+
+
+def offset_query_ms(db_path, depth, page_size, where="", repeat=3):
+    conn = sqlite3.connect(db_path)
+    sql = (f"SELECT id, role, domain, mode, question, score, created_at FROM sessions {where} "
+           f"ORDER BY created_at DESC, id DESC LIMIT {page_size} OFFSET {depth}")
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        conn.execute(sql).fetchall()
+        timings.append((time.perf_counter() - t0) * 1000)
+    conn.close()
+    return statistics.median(timings)
+
+
+async def run(args, db_path):
+    import httpx
+    from backend.main import app, encode_cursor
+
+    conn = sqlite3.connect(db_path)
+    for label, params in FILTERS:
+        clause = ("WHERE " + " AND ".join(f"{k} = '{v}'" for k, v in params.items())) if params else ""
+        total = conn.execute(f"SELECT count(*) FROM sessions {clause}").fetchone()[0]
+        print(f"\n{label}: {total} matching rows, page size {args.page_size}")
+        print(f"{'depth':>10} {'keyset ms':>10} {'offset ms':>10}")
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as http:
+            for fraction in (0, 0.1, 0.5, 0.9):
+                depth = int(total * fraction)
+                page = dict(params, limit=args.page_size, fields="summary")
+                if depth:
+                    created_at, session_id = conn.execute(
+                        f"SELECT created_at, id FROM sessions {clause} ORDER BY created_at DESC, id DESC "
+                        f"LIMIT 1 OFFSET {depth - 1}").fetchone()
+                    page["cursor"] = encode_cursor(datetime.datetime.fromisoformat(created_at), session_id)
+                keyset_ms, body = await time_call(http, page, args.repeat)
+                assert len(body["items"]) == min(args.page_size, total - depth)
+                print(f"{depth:>10} {keyset_ms:>10.2f} {offset_query_ms(db_path, depth, args.page_size, clause):>10.2f}")
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="bench-sessions-"), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ.setdefault("OPENAI_API_KEY", "sk-fake")
+
+    from backend.models import init_db
+    init_db()
+
+    t0 = time.perf_counter()
+    fill(db_path, args.rows)
+    print(f"inserted {args.rows} rows in {time.perf_counter() - t0:.1f}s")
+    asyncio.run(run(args, db_path))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Time-to-first-field for POST /evaluate/stream versus the blocking POST /evaluate.
+
+The fake LLM streams the canned evaluation in small chunks; for a fair comparison its
+non-streaming latency is set to the time the full stream takes. Every request uses a
+unique answer so the evaluation cache never short-circuits the LLM call.
+
+    python -m benchmarks.stream_ttff --requests 20 --first-token-ms 150 --token-delay-ms 15
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+
+def read_stream(http, payload):
+    """Returns (time to first field event, total time) in ms for one streamed evaluation."""
+    started = time.perf_counter()
+    first = None
+    event = None
+    with http.stream("POST", "/evaluate/stream", json=payload) as resp:
+        resp.raise_for_status()
+        for line in resp.iter_lines():
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: ") and event == "field" and first is None:
+                first = (time.perf_counter() - started) * 1000
+            elif line.startswith("data: ") and event == "done":
+                json.loads(line[len("data: "):])
+    return first, (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--first-token-ms", type=float, default=150.0)
+    parser.add_argument("--token-delay-ms", type=float, default=15.0)
+    parser.add_argument("--llm-port", type=int, default=9110)
+    parser.add_argument("--backend-port", type=int, default=9111)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix="bench-stream-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{tmpdir}/bench.db"
+    os.environ["OPENAI_API_KEY"] = "sk-fake"
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{args.llm_port}/v1"
+
+    import httpx
+    import uvicorn
+    from benchmarks.fake_llm import CANNED_EVAL, CHUNK_CHARS, serve_in_thread
+    from backend.main import app
+
+    n_chunks = -(-len(json.dumps(CANNED_EVAL)) // CHUNK_CHARS)
+    full_ms = args.first_token_ms + (n_chunks - 1) * args.token_delay_ms
+    serve_in_thread(args.llm_port, full_ms, first_token_ms=args.first_token_ms, token_delay_ms=args.token_delay_ms)
+    backend = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=args.backend_port, log_level="warning"))
+    threading.Thread(target=backend.run, daemon=True).start()
+    while not backend.started:
+        time.sleep(0.05)
+
+    blocking, ttff, stream_total = [], [], []
+    with httpx.Client(base_url=f"http://127.0.0.1:{args.backend_port}", timeout=60) as http:
+        for i in range(args.requests):
+            payload = {"question": "Explain ACID.", "answer": f"Blocking answer {i}", "mode": "Technical"}
+            t0 = time.perf_counter()
+            http.post("/evaluate", json=payload).raise_for_status()
+            blocking.append((time.perf_counter() - t0) * 1000)
+
+            first, total = read_stream(http, {**payload, "answer": f"Streamed answer {i}"})
+            ttff.append(first)
+            stream_total.append(total)
+
+    print(f"fake LLM: first token {args.first_token_ms:.0f} ms, {n_chunks} chunks, full completion {full_ms:.0f} ms")
+    print(f"/evaluate         p50 time to result       {statistics.median(blocking):8.1f} ms")
+    print(f"/evaluate/stream  p50 time to first field  {statistics.median(ttff):8.1f} ms")
+    print(f"/evaluate/stream  p50 time to done         {statistics.median(stream_total):8.1f} ms")
+    backend.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
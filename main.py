@@ -1,122 +1,134 @@
 # main.py (Streamlit frontend) — fixed to avoid out-of-bounds errors
-import requests
 import streamlit as st
-import random, json, io, datetime
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
+import json, datetime
+
+from backend.api_client import BackendClient
+from backend.interview_summary import apply_answer, empty_summary, summary_view
+from backend.offline_scorer import mock_evaluate_answer
+from backend.schemas import EvaluationResult
+from backend.pdf import session_pdf_bytes
+from backend.question_bank import QuestionBank, QUESTION_BANK_PATH
 
 # ----------------- Helper data (local question bank) -----------------
-QUESTION_BANK = {
-    "Software Engineer": {
-        "General": [
-            {"id": 1, "question":"Explain the difference between process and thread.", "type":"concept", "difficulty":"easy", "hint":"Consider memory and scheduling."},
-            {"id": 2, "question":"How would you find a cycle in a directed graph? Give approach and complexity.", "type":"algorithm","difficulty":"medium", "hint":"Think DFS and colors/stack."},
-            {"id": 3, "question":"Design a URL shortener service. Outline components and trade-offs.", "type":"system-design","difficulty":"hard", "hint":"Consider database, hashing, collision handling."}
-        ],
-        "Backend": [
-            {"id": 4, "question":"How does database indexing speed up queries? Types of indexes?", "type":"concept","difficulty":"medium","hint":"B-trees, hash indexes"},
-            {"id": 5, "question":"Explain ACID properties in databases.", "type":"concept","difficulty":"easy","hint":""}
-        ],
-        "Frontend": [
-            {"id": 6, "question":"How does the browser render a webpage (critical rendering path)?", "type":"concept","difficulty":"medium","hint":"HTML, CSS, JS parsing & layout."},
-            {"id": 7, "question":"Explain virtual DOM and its benefits.", "type":"concept","difficulty":"easy","hint":""}
-        ],
-        "Machine Learning": [
-            {"id": 8, "question":"How would you evaluate and compare two models with different class imbalance?", "type":"ml","difficulty":"medium","hint":"Precision/recall, ROC, PR curves."}
-        ],
-        "System Design": [
-        {"id": 6, "question": "Design a URL shortener (like bit.ly).", "type": "technical", "difficulty": "hard", "hint": "Think database, hashing, scalability."},
-        {"id": 7, "question": "How would you design a scalable chat system?", "type": "technical", "difficulty": "hard", "hint": "Message queues, storage, real-time updates."},
-        ],
-        "Full Stack Development": [
-            {"id": 8, "question": "What is the role of middleware in Express.js?", "type": "technical", "difficulty": "medium", "hint": "Request/response lifecycle."},
-            {"id": 9, "question": "How do you secure a full-stack web application?", "type": "technical", "difficulty": "hard", "hint": "Authentication, authorization, input validation."},
-        ]
-
-
-    },
-    "Product Manager": {
-        "General": [
-            {"id": 11, "question":"Describe a time you prioritized features under tight deadline (STAR).", "type":"behavioral","difficulty":"medium","hint":"Be specific about trade-offs."},
-            {"id": 12, "question":"How do you define success metrics for a new feature?", "type":"behavioral","difficulty":"easy","hint":"Think quantitative + qualitative metrics."}
-        ]
-    },
-    "Data Analyst": {
-        "General":[
-            {"id": 21, "question":"How would you clean a dataset with many missing values?", "type":"concept","difficulty":"medium","hint":"Imputation, dropping, modeling missingness."},
-            {"id": 22, "question":"Which chart would you use to compare distribution of a continuous variable across groups?", "type":"concept","difficulty":"easy","hint":"Box plot, violin plot."}
-        ]
-    }
-}
+@st.cache_resource
+def load_question_bank():
+    """Load and index backend/data/questions.json once per Streamlit server process."""
+    return QuestionBank.load(QUESTION_BANK_PATH)
+
+@st.cache_resource
+def backend_client():
+    """One pooled HTTP client (keep-alive connections, timeouts, retries) for all sessions; see backend/api_client.py."""
+    return BackendClient()
 
 # ----------------- Utility functions -----------------
 def generate_questions(role, domain, mode, n=3):
-    """Pick n questions from the local QUESTION_BANK according to role/domain."""
-    bank = QUESTION_BANK.get(role, {})
-    # if domain not available, use 'General'
-    q_list = bank.get(domain) or bank.get("General") or []
-    if not q_list:
-        return []
-    if n >= len(q_list):
-        return q_list.copy()
-    return random.sample(q_list, n)
-
-def mock_evaluate_answer(question_text, answer_text, mode):
-    score = 4.0
-    words = answer_text.strip().split()
-    if len(words) > 15: score += 2.0
-    if len(words) > 60: score += 2.0
-    key_terms = ["complexity","time","space","edge case","scalable","tests","trade-off","STAR","impact"]
-    matches = sum(1 for k in key_terms if k in answer_text.lower())
-    score += min(matches, 2)
-    score = max(0, min(10, score))
-    strengths = ["Good detail and explanation"] if len(words) > 15 else []
-    weaknesses = ["Answer too short — add more specifics"] if len(words) <= 15 else []
-    strengths += ["Used relevant keywords"] if matches else []
-    weaknesses += ["Missing technical keywords or trade-offs"] if not matches else []
-    feedback = "Nice attempt. " + ("Expand with edge-cases and complexity analysis." if "complexity" not in answer_text.lower() else "Good complexity analysis.")
-    suggested = "Mention time/space complexity and give one edge-case or test example."
-    resources = ["Cracking the Coding Interview (book)", "System Design Primer (GitHub)"]
-    return {
-        "score": round(score,1),
-        "strengths": strengths,
-        "weaknesses": weaknesses,
-        "feedback": feedback,
-        "suggested_improvement": suggested,
-        "resources": resources
-    }
-
+    """Pick n questions of mixed difficulty from the local question bank according to role/domain."""
+    return load_question_bank().sample(role, domain, n)
+
+def as_eval(data):
+    """Every evaluation kept in session state has all EvaluationResult fields, so the UI can index it directly."""
+    return EvaluationResult.model_validate(data).model_dump()
+
+def render_partial_eval(placeholder, partial):
+    """Render whatever evaluation fields have arrived so far."""
+    parts = []
+    if partial.get("score") is not None:
+        parts.append(f"**Score:** {partial['score']} / 10")
+    if partial.get("strengths"):
+        parts.append("**Strengths**\n" + "\n".join("- " + s for s in partial["strengths"]))
+    if partial.get("weaknesses"):
+        parts.append("**Weaknesses**\n" + "\n".join("- " + w for w in partial["weaknesses"]))
+    if partial.get("feedback"):
+        parts.append("**Feedback**\n\n" + partial["feedback"])
+    placeholder.markdown("\n\n".join(parts) or "_Evaluating..._")
+
+def stream_backend_evaluation(path, payload, placeholder, method="POST"):
+    """Call a streaming evaluation endpoint (SSE) and render fields progressively. Returns the `done` event; raises on an `error` event."""
+    partial = {}
+    render_partial_eval(placeholder, partial)
+    for event, data in backend_client().stream(method, path, payload):
+        if event == "field":
+            partial[data["name"]] = data["value"]
+            render_partial_eval(placeholder, partial)
+        elif event == "done":
+            return data
+        elif event == "error":
+            raise RuntimeError(data.get("detail", "evaluation failed"))
+    raise RuntimeError("stream ended without a result")
+
+def format_score(score):
+    return "-" if score is None else str(score)
+
+def load_interview(interview_id):
+    """Restore state from the backend's copy of the interview (after a browser refresh or on a shared link)."""
+    interview = backend_client().get_interview(interview_id)
+    entries = interview["answers"]
+    st.session_state.interview_id = interview["id"]
+    st.session_state.questions = interview["questions"]
+    st.session_state.answers = [None] * len(entries)
+    st.session_state.evals = [None] * len(entries)
+    st.session_state.local_summary = empty_summary()
+    st.session_state.pending = {}
+    for i, entry in enumerate(entries):
+        if entry is not None:
+            record_locally(i, entry["answer"], as_eval(entry["eval"]))
+    st.session_state.current = next((i for i, entry in enumerate(entries) if entry is None), len(entries) - 1)
+    st.session_state.started = True
+    st.session_state.started_at = interview["created_at"]
+    for i, answer in enumerate(st.session_state.answers):
+        st.session_state[f"answer_{i}"] = answer or ""
+
+def record_locally(index, answer, evaluation):
+    """
+    Store an answer in session state and update the running summary by the difference it
+    makes (the same arithmetic the backend applies to its copy of the interview).
+    """
+    old = st.session_state.evals[index]
+    old_entry = None if old is None else {"answer": st.session_state.answers[index],
+                                          "skipped": not st.session_state.answers[index], "eval": old}
+    new_entry = {"answer": answer, "skipped": not answer, "eval": evaluation}
+    apply_answer(st.session_state.local_summary, old_entry, new_entry)
+    st.session_state.summary = summary_view(st.session_state.local_summary)
+    st.session_state.answers[index] = answer
+    st.session_state.evals[index] = evaluation
+
+def submit_in_background(index, question, answer):
+    """Queue the evaluation on the client's thread pool; collect_pending() picks up the result on a later rerun."""
+    client = backend_client()
+    if st.session_state.interview_id:
+        future = client.submit(client.answer, st.session_state.interview_id, index, answer)
+    else:
+        future = client.submit(client.evaluate, question, answer, mode, role, domain)
+    st.session_state.pending[index] = (answer, future)
+
+def collect_pending():
+    """Record every background evaluation that has finished since the last rerun."""
+    for index, (answer, future) in list(st.session_state.pending.items()):
+        if not future.done():
+            continue
+        del st.session_state.pending[index]
+        try:
+            eval_result = as_eval(future.result()["eval"])
+        except Exception as e:
+            eval_result = as_eval({"score": None, "fallback": True, "feedback": f"Backend call failed: {e}"})
+        record_locally(index, answer, eval_result)
+
+@st.fragment(run_every=1.0)
+def watch_pending():
+    """Poll background evaluations; rerun the app once one of them has finished."""
+    pending = st.session_state.pending
+    st.caption(f"Scoring {len(pending)} answer(s) in the background...")
+    if any(future.done() for _, future in pending.values()):
+        st.rerun()
+
+@st.cache_data(max_entries=32)
+def make_session_json(session_meta, qa_list):
+    return json.dumps({"meta": session_meta, "qa": qa_list}, indent=2)
+
+@st.cache_data(max_entries=32)
 def make_pdf_bytes(session_meta, qa_list):
-    """Generate a simple PDF summary using reportlab and return bytes."""
-    buf = io.BytesIO()
-    c = canvas.Canvas(buf, pagesize=letter)
-    w, h = letter
-    margin = 40
-    y = h - margin
-    c.setFont("Helvetica-Bold", 16)
-    c.drawString(margin, y, f"Interview Summary — {session_meta['role']} ({session_meta['mode']})")
-    y -= 28
-    c.setFont("Helvetica", 11)
-    c.drawString(margin, y, f"Domain: {session_meta['domain']}   Questions: {len(qa_list)}   Avg score: {session_meta.get('avg_score','-')}")
-    y -= 20
-    for i, item in enumerate(qa_list, start=1):
-        if y < 120:
-            c.showPage()
-            y = h - margin
-        c.setFont("Helvetica-Bold", 12)
-        qline = f"Q{i}: {item['question'][:100]}"
-        c.drawString(margin, y, qline)
-        y -= 14
-        c.setFont("Helvetica", 10)
-        a = item.get('answer','(skipped)') or '(skipped)'
-        c.drawString(margin, y, "Answer: " + (a[:180].replace('\n',' ')))
-        y -= 14
-        evals = item.get('eval',{})
-        c.drawString(margin, y, f"Score: {evals.get('score','-')}  Feedback: {evals.get('feedback','')[:200]}")
-        y -= 20
-    c.save()
-    buf.seek(0)
-    return buf.getvalue()
+    """PDF summary with answers and feedback wrapped in full; cached, so re-preparing unchanged downloads is free."""
+    return session_pdf_bytes(session_meta, qa_list)
 
 # ----------------- Streamlit UI -----------------
 st.set_page_config(page_title="LLM Interview Simulator", layout="wide")
@@ -125,15 +137,19 @@ st.title("🤖 LLM Interview Simulator")
 # Sidebar controls
 with st.sidebar:
     st.subheader("Interview setup")
-    role = st.selectbox("Role", list(QUESTION_BANK.keys()))
+    role = st.selectbox("Role", load_question_bank().roles())
     # gather domains for selected role
-    domains = list(QUESTION_BANK.get(role, {}).keys())
+    domains = load_question_bank().domains(role)
     domain = st.selectbox("Domain", domains)
     mode = st.radio("Mode", ["Technical", "Behavioral"])
     n_q = st.slider("Number of questions", 1, 5, 3)
     mock_mode = st.checkbox("Mock Mode ", value=True)
+    background = st.checkbox("Score in background", value=True,
+                             help="Move on to the next question while the backend scores your answer.")
     st.markdown("---")
 # Session state initialization
+# answers/evals have one slot per question (None until answered); summary is the running
+# summary_view, kept up to date per answer instead of being recomputed on every rerun
 if "questions" not in st.session_state: 
     st.session_state.questions = []
 if "current" not in st.session_state: 
@@ -144,14 +160,52 @@ if "evals" not in st.session_state:
     st.session_state.evals = []
 if "started" not in st.session_state: 
     st.session_state.started = False
+if "interview_id" not in st.session_state:
+    st.session_state.interview_id = None
+if "summary" not in st.session_state:
+    st.session_state.summary = summary_view(empty_summary())
+if "local_summary" not in st.session_state:
+    st.session_state.local_summary = empty_summary()
+if "pending" not in st.session_state:
+    st.session_state.pending = {}  # question index -> (answer, Future) for background evaluations
+
+# Fresh browser session on an interview link: restore it from the backend
+if not st.session_state.started and st.query_params.get("interview"):
+    try:
+        load_interview(st.query_params["interview"])
+    except Exception as e:
+        st.warning(f"Could not restore interview: {e}")
+        del st.query_params["interview"]
+
+# Evaluations submitted in the background that finished since the last rerun
+collect_pending()
 
 # Start / Restart
 if st.sidebar.button("Start / Restart Interview"):
-    st.session_state.questions = generate_questions(role, domain, mode, n_q)
+    st.session_state.interview_id = None
+    st.session_state.local_summary = empty_summary()
+    st.session_state.pending = {}
+    questions = None
+    if not mock_mode:
+        try:
+            interview = backend_client().start_interview(role, domain, mode, n_q)
+            questions = interview["questions"]
+            st.session_state.interview_id = interview["id"]
+            st.query_params["interview"] = interview["id"]
+        except Exception as e:
+            st.warning(f"Could not start the interview on the backend ({e}); answers will not be saved.")
+    if questions is None:
+        questions = generate_questions(role, domain, mode, n_q)
+        st.query_params.pop("interview", None)
+    st.session_state.questions = questions
     st.session_state.current = 0
-    st.session_state.answers = []
-    st.session_state.evals = []
+    st.session_state.answers = [None] * len(questions)
+    st.session_state.evals = [None] * len(questions)
+    st.session_state.summary = summary_view(empty_summary())
     st.session_state.started = True
+    st.session_state.started_at = datetime.datetime.utcnow().isoformat()
+    for key in [k for k in st.session_state if k.startswith("answer_")]:
+        del st.session_state[key]
 
 # Stop if not started or no questions
 if not st.session_state.started or not st.session_state.questions:
@@ -196,40 +250,35 @@ with left:
 
     c1, c2, c3 = st.columns([1,1,1])
     with c1:
-        if st.button("Submit Answer"):
+        if st.button("Submit Answer", disabled=q_index in st.session_state.pending):
             answer_text = st.session_state[answer_key].strip()
             if not answer_text:
                 st.warning("Please write an answer before submitting.")
             else:
-                if mock_mode:
-                    # Use your existing mock evaluator
-                    eval_result = mock_evaluate_answer(question_obj.get('question'), answer_text, mode)
-                else:
-                    # Call backend API
-                    import requests
-                    backend_url = "http://127.0.0.1:8000/evaluate"  # your backend endpoint
-                    payload = {
-                        "question": question_obj.get("question"),
-                        "answer": answer_text,
-                        "mode": mode
-                    }
-                    try:
-                        resp = requests.post(backend_url, json=payload)
-                        resp.raise_for_status()
-                        eval_result = resp.json().get("eval", {"score":0, "feedback":"No feedback", "strengths":[], "weaknesses":[], "suggested_improvement":"", "resources":[]})
-                    except Exception as e:
-                        eval_result = {"score":0, "feedback": f"Backend call failed: {e}", "strengths":[], "weaknesses":[], "suggested_improvement":"", "resources":[]}
-
-                # Ensure answers/evals lists have correct length
-                if len(st.session_state.answers) > q_index:
-                    st.session_state.answers[q_index] = answer_text
+                use_backend = not mock_mode or st.session_state.interview_id
+                if use_backend and background:
+                    # scored on the client's thread pool; the result is recorded on a later rerun
+                    submit_in_background(q_index, question_obj.get("question"), answer_text)
                 else:
-                    st.session_state.answers.append(answer_text)
-
-                if len(st.session_state.evals) > q_index:
-                    st.session_state.evals[q_index] = eval_result
-                else:
-                    st.session_state.evals.append(eval_result)
+                    if not use_backend:
+                        # Use your existing mock evaluator
+                        eval_result = as_eval(mock_evaluate_answer(question_obj.get('question'), answer_text, mode))
+                    else:
+                        # Call backend API (streamed, so feedback shows up field by field)
+                        try:
+                            if st.session_state.interview_id:
+                                path = f"/interviews/{st.session_state.interview_id}/answers/{q_index}?stream=true"
+                                done = stream_backend_evaluation(path, {"answer": answer_text}, st.empty(), method="PATCH")
+                            else:
+                                payload = {"question": question_obj.get("question"), "answer": answer_text,
+                                           "mode": mode, "role": role, "domain": domain}
+                                done = stream_backend_evaluation("/evaluate/stream", payload, st.empty())
+                            eval_result = as_eval(done["eval"])
+                            st.session_state.last_ttff_ms = done.get("time_to_first_field_ms")
+                        except Exception as e:
+                            eval_result = as_eval({"score": None, "fallback": True, "feedback": f"Backend call failed: {e}"})
+
+                    record_locally(q_index, answer_text, eval_result)
 
                 # Move to next question
                 if st.session_state.current < len(st.session_state.questions)-1:
@@ -238,14 +287,14 @@ with left:
                 st.session_state.update()  # refresh page to show feedback
 
     with c2:
-        if st.button("Skip"):
-            while len(st.session_state.answers) <= q_index:
-                st.session_state.answers.append("")
-
-            while len(st.session_state.evals) <= q_index:
-                st.session_state.evals.append({"score": 0, "feedback":"", "strengths":[], "weaknesses":[]})
-
-            st.session_state.evals[q_index] = {"score": 0, "feedback":"Skipped", "strengths":[], "weaknesses":[]}
+        if st.button("Skip", disabled=q_index in st.session_state.pending):
+            skipped = as_eval({"feedback": "Skipped"})
+            if st.session_state.interview_id:
+                try:
+                    backend_client().answer(st.session_state.interview_id, q_index, skip=True)
+                except Exception as e:
+                    st.warning(f"Could not save the skip: {e}")
+            record_locally(q_index, "", skipped)
 
             if q_index < len(st.session_state.questions)-1:
                 st.session_state.current += 1
@@ -257,32 +306,32 @@ with left:
 
 with right:
     st.subheader("Live Feedback")
-    if q_index < len(st.session_state.evals):
-        ev = st.session_state.evals[q_index]
-    else:
-        ev = {}
-
-    # show last evaluation if available
-    last_idx = len(st.session_state.evals) - 1
-    if last_idx >= 0 and last_idx >= q_index:
-        ev = st.session_state.evals[q_index]
-        st.metric("Score", f"{ev.get('score','-')} / 10")
+    # show this question's evaluation if available
+    ev = st.session_state.evals[q_index]
+    if q_index in st.session_state.pending:
+        st.info("Scoring your answer... you can move on, feedback will appear here.")
+    elif ev is not None:
+        st.metric("Score", f"{format_score(ev['score'])} / 10")
+        if ev['fallback']:
+            st.warning("This answer could not be evaluated right now, so it is left unscored. Try submitting it again.")
+        if st.session_state.get("last_ttff_ms") is not None:
+            st.caption(f"First feedback after {st.session_state.last_ttff_ms:.0f} ms")
         st.markdown("**Feedback**")
-        st.write(ev.get('feedback',''))
-        if ev.get('strengths'):
+        st.write(ev['feedback'])
+        if ev['strengths']:
             st.markdown("**Strengths**")
-            for s in ev.get('strengths'):
+            for s in ev['strengths']:
                 st.write("• " + s)
-        if ev.get('weaknesses'):
+        if ev['weaknesses']:
             st.markdown("**Weaknesses**")
-            for w in ev.get('weaknesses'):
+            for w in ev['weaknesses']:
                 st.write("• " + w)
-        if ev.get('suggested_improvement'):
+        if ev['suggested_improvement']:
             with st.expander("Suggested improvement / model answer"):
-                st.write(ev.get('suggested_improvement'))
-        if ev.get('resources'):
+                st.write(ev['suggested_improvement'])
+        if ev['resources']:
             with st.expander("Resources"):
-                for r in ev.get('resources'):
+                for r in ev['resources']:
                     st.write("• " + r)
         if st.button("Next Question"):
             if st.session_state.current < len(st.session_state.questions)-1:
@@ -291,24 +340,28 @@ with right:
     else:
         st.info("Submit an answer to see feedback here.")
 
+if st.session_state.pending:
+    with st.sidebar:
+        watch_pending()
+
 # Final summary when all questions have been answered
-if len(st.session_state.evals) >= len(st.session_state.questions):
+if not st.session_state.pending and all(e is not None for e in st.session_state.evals):
     st.markdown("---")
     st.header("Final Summary")
-    scores = [e.get('score',0) for e in st.session_state.evals]
-    avg = sum(scores)/len(scores) if scores else 0
+    # the running summary: skipped and unscored (fallback) answers are left out of the average
+    summary = st.session_state.summary
+    avg = summary["avg_score"] or 0
     st.metric("Average score", f"{avg:.2f} / 10")
-    # aggregate strengths/weaknesses
-    strengths = []
-    weaknesses = []
-    for ev in st.session_state.evals:
-        strengths += ev.get('strengths', [])
-        weaknesses += ev.get('weaknesses', [])
+    unscored = summary["answered"] - summary["scored"]
+    if unscored:
+        st.caption(f"{unscored} answer(s) could not be evaluated and are not included in the average.")
+    if summary["skipped"]:
+        st.caption(f"{summary['skipped']} question(s) skipped.")
     st.subheader("Top strengths")
-    for s in set(strengths) or ["(none)"]:
+    for s in summary["top_strengths"] or ["(none)"]:
         st.write("• " + s)
     st.subheader("Top weaknesses")
-    for w in set(weaknesses) or ["(none)"]:
+    for w in summary["top_weaknesses"] or ["(none)"]:
         st.write("• " + w)
 
     # full Q/A list
@@ -316,16 +369,16 @@ if len(st.session_state.evals) >= len(st.session_state.questions):
     for i, q in enumerate(st.session_state.questions):
         st.markdown(f"**Q{i+1}:** {q.get('question')}")
         st.write("**A:** " + (st.session_state.answers[i] or "(skipped)"))
-        st.write("**Score:** " + str(st.session_state.evals[i].get('score', '-')))
+        st.write("**Score:** " + format_score(st.session_state.evals[i]['score']))
         st.write("---")
 
     # Download JSON
     if st.button("Prepare session downloads"):
-        session_meta = {"role": role, "domain": domain, "mode": mode, "avg_score": f"{avg:.2f}", "created_at": datetime.datetime.utcnow().isoformat()}
+        session_meta = {"role": role, "domain": domain, "mode": mode, "avg_score": f"{avg:.2f}", "created_at": st.session_state.get("started_at")}
         qa_items = []
         for i,q in enumerate(st.session_state.questions):
             qa_items.append({"question": q.get('question'), "answer": st.session_state.answers[i], "eval": st.session_state.evals[i]})
-        st.session_state._download_json = json.dumps({"meta": session_meta, "qa": qa_items}, indent=2)
+        st.session_state._download_json = make_session_json(session_meta, qa_items)
         st.session_state._download_pdf = make_pdf_bytes(session_meta, qa_items)
         st.success("Prepared downloads!")
 
@@ -0,0 +1,76 @@
+"""
+Shared fixtures. The environment is set before any backend module is imported, since
+settings are read at import: a throwaway SQLite database, process-local shared state,
+no persistent cache.
+"""
+import json
+import os
+import socket
+import tempfile
+
+import pytest
+
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='tests-')}/test.db"
+os.environ["OPENAI_API_KEY"] = "sk-fake"
+os.environ["STATE_BACKEND"] = "memory"
+os.environ["EVAL_CACHE_PERSIST"] = "0"
+os.environ["BACKEND_ENV_LOADED"] = "1"  # don't let a developer's .env override the above
+
+from benchmarks.fake_llm import CANNED_EVAL, serve_in_thread  # noqa: E402
+
+FAKE_LLM_DEFAULTS = {"latency_ms": 0.0, "first_token_ms": 0.0, "token_delay_ms": 0.0, "rate_limit_rate": 0.0,
+                     "retry_after_s": 0.0, "latency_jitter_ms": 0.0, "latency_dist": "fixed", "error_rate": 0.0,
+                     "canned_eval": CANNED_EVAL}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(scope="session")
+def fake_llm_server():
+    port = free_port()
+    server, app = serve_in_thread(port)
+    app.state.base_url = f"http://127.0.0.1:{port}/v1"
+    yield app
+    server.should_exit = True
+
+
+@pytest.fixture
+def fake_llm(fake_llm_server):
+    """The fake OpenAI server's state (options and counters), reset for each test."""
+    state = fake_llm_server.state
+    for name, value in FAKE_LLM_DEFAULTS.items():
+        setattr(state, name, value)
+    state.calls = state.rate_limited = state.errors = 0
+    return state
+
+
+@pytest.fixture
+def client(fake_llm, monkeypatch):
+    """TestClient for the backend, with the LLM gateway pointed at the fake server (one retry, no rate limits)."""
+    from fastapi.testclient import TestClient
+    from openai import AsyncOpenAI
+
+    from backend import llm
+    from backend.llm_gateway import LLMGateway
+    from backend.main import app
+    from backend.shared_state import MemoryState
+
+    # a fresh gateway per test: the OpenAI client belongs to the TestClient's event loop
+    gateway = LLMGateway(AsyncOpenAI(api_key="sk-fake", base_url=fake_llm.base_url), rpm=0, tpm=0,
+                         max_retries=1, backoff_base_ms=1, backoff_max_ms=5, state=MemoryState())
+    monkeypatch.setattr(llm, "gateway", gateway)
+    with TestClient(app) as client:
+        yield client
+
+
+def sse_events(text):
+    """[(event, data)] from a server-sent events response body."""
+    events = []
+    for block in text.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
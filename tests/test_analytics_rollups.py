@@ -0,0 +1,139 @@
+"""
+The rollup flush hooks keep session_rollups equal to what a backfill computes from the
+sessions rows. Each test uses its own role, so its buckets are its own.
+"""
+import asyncio
+import datetime
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from backend import analytics, interviews
+from backend.models import InterviewSession, SessionRollup, async_engine, engine, init_db
+from backend.writebehind import WriteBehindBuffer
+from tests.test_writebehind import FailFirstCommit
+
+DAY = datetime.datetime(2025, 3, 14, 12, 0)
+
+
+@pytest.fixture(autouse=True)
+def schema():
+    init_db()
+
+
+def rollup(role):
+    """(n, score_sum, score_sq_sum) over the role's buckets."""
+    with Session(engine) as db:
+        rows = db.execute(select(SessionRollup.n, SessionRollup.score_sum, SessionRollup.score_sq_sum)
+                          .where(SessionRollup.role == role)).all()
+    return (sum(r[0] for r in rows), sum(r[1] for r in rows), sum(r[2] for r in rows))
+
+
+def expected(*scores):
+    return (len(scores), pytest.approx(sum(scores)), pytest.approx(sum(s * s for s in scores)))
+
+
+def session_row(role, score, **kwargs):
+    return InterviewSession(role=role, domain="Backend", mode="Technical", question="q", answer="a",
+                            score=score, feedback="f", created_at=DAY, **kwargs)
+
+
+def run_async(fn):
+    """Run fn(sessionmaker) on a fresh async engine, like another worker would."""
+    async def run():
+        other = create_async_engine(async_engine.url)
+        try:
+            return await fn(async_sessionmaker(other, expire_on_commit=False))
+        finally:
+            await other.dispose()
+    return asyncio.run(run())
+
+
+def test_insert_update_and_delete():
+    role = "Rollup test: insert"
+    with Session(engine) as db:
+        rows = [session_row(role, 6.0), session_row(role, 8.0), session_row(role, None)]
+        db.add_all(rows)
+        db.commit()
+        assert rollup(role) == expected(6.0, 8.0)  # unscored rows aren't counted
+
+        rows[0].score = 3.0
+        db.commit()
+        assert rollup(role) == expected(3.0, 8.0)
+
+        db.delete(rows[1])
+        db.commit()
+        assert rollup(role) == expected(3.0)
+
+
+def test_rolled_back_changes_are_not_counted():
+    role = "Rollup test: rollback"
+    with Session(engine) as db:
+        db.add(session_row(role, 5.0))
+        db.flush()
+        db.rollback()
+    assert rollup(role) == (0, 0, 0)
+
+
+def test_interview_re_answer_replaces_the_score():
+    role = "Rollup test: interview"
+    evaluation = {"score": 4.0, "feedback": "f", "strengths": [], "weaknesses": []}
+
+    async def answer_twice(sessions):
+        async with sessions() as db:
+            interview = await interviews.create_interview(db, role, "Backend", "Technical", [{"question": "q"}])
+        async with sessions() as db:
+            await interviews.record_answer(db, interview.id, 0, "first", evaluation)
+        assert rollup(role) == expected(4.0)
+        async with sessions() as db:
+            await interviews.record_answer(db, interview.id, 0, "second", dict(evaluation, score=9.0))
+        assert rollup(role) == expected(9.0)
+        async with sessions() as db:
+            await interviews.record_answer(db, interview.id, 0, "", {"feedback": "Skipped"}, skipped=True)
+
+    run_async(answer_twice)
+    assert rollup(role) == (0, 0, 0)
+
+
+def test_write_behind_retry_counts_once():
+    role = "Rollup test: write-behind"
+
+    async def write(sessions):
+        buffer = WriteBehindBuffer(session_factory=FailFirstCommit(sessions), interval_ms=10_000)
+        await buffer.add([session_row(role, 7.0), session_row(role, 2.0)])
+        assert await buffer.flush() == 0
+        assert rollup(role) == (0, 0, 0)
+        assert await buffer.flush() == 2
+
+    run_async(write)
+    assert rollup(role) == expected(7.0, 2.0)
+
+
+def test_backfill_matches_incremental_rollups():
+    role = "Rollup test: backfill"
+    with Session(engine) as db:
+        rows = [session_row(role, score) for score in (1.0, 4.5, 10.0)]
+        rows.append(InterviewSession(role=role, domain=None, mode="Behavioral", score=6.0,
+                                     created_at=DAY + datetime.timedelta(days=1)))
+        db.add_all(rows)
+        db.commit()
+        rows[0].score = 2.0
+        db.delete(rows[1])
+        db.commit()
+
+    def snapshot():
+        with Session(engine) as db:
+            return sorted(db.execute(select(SessionRollup.day, SessionRollup.role, SessionRollup.domain,
+                                            SessionRollup.mode, SessionRollup.n, SessionRollup.score_sum,
+                                            SessionRollup.score_sq_sum)).all())
+
+    # buckets whose sessions were all deleted stay behind with n = 0; a backfill has no row for them
+    incremental = [row for row in snapshot() if row.n]
+    assert analytics.backfill() == len(incremental)
+    rebuilt = snapshot()
+    assert [row[:5] for row in rebuilt] == [row[:5] for row in incremental]
+    for new, old in zip(rebuilt, incremental):
+        assert new[5:] == pytest.approx(old[5:])
+    assert rollup(role) == expected(2.0, 10.0, 6.0)
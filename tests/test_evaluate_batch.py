@@ -0,0 +1,49 @@
+from benchmarks.fake_llm import CANNED_EVAL
+
+
+def evaluate_batch(client, *answers):
+    items = [{"question": "What is a hash map?", "answer": answer, "mode": "Technical"} for answer in answers]
+    resp = client.post("/evaluate/batch", json={"items": items, "role": "Software Engineer", "domain": "Backend"})
+    assert resp.status_code == 200
+    return resp.json()
+
+
+def session_count(client):
+    return len(client.get("/sessions", params={"limit": 500}).json()["items"])
+
+
+def test_scored_items_are_saved(client, fake_llm):
+    before = session_count(client)
+
+    body = evaluate_batch(client, "batch test: buckets", "batch test: hashing")
+    assert body["failed"] == 0
+    assert body["unscored"] == 0
+    assert [r["index"] for r in body["results"]] == [0, 1]
+    assert all(r["saved"] and r["eval"]["score"] == CANNED_EVAL["score"] for r in body["results"])
+    assert session_count(client) == before + 2
+
+
+def test_unavailable_llm_counts_as_failed(client, fake_llm):
+    fake_llm.rate_limit_rate = 1.0
+    before = session_count(client)
+
+    body = evaluate_batch(client, "batch test: rate limited 1", "batch test: rate limited 2")
+    assert body["failed"] == 2
+    assert body["unscored"] == 2
+    for result in body["results"]:
+        assert result["saved"] is False
+        assert result["eval"]["fallback"] is True
+    assert session_count(client) == before
+
+
+def test_item_role_and_domain_override_the_batch(client, fake_llm):
+    items = [{"question": "What is a hash map?", "answer": "batch test: per-item role", "mode": "Technical",
+              "role": "Data Analyst", "domain": "Machine Learning"},
+             {"question": "What is a hash map?", "answer": "batch test: batch role", "mode": "Technical"}]
+    resp = client.post("/evaluate/batch", json={"items": items, "role": "Software Engineer", "domain": "Backend"})
+    assert resp.status_code == 200
+
+    saved = {row["answer"]: (row["role"], row["domain"])
+             for row in client.get("/sessions", params={"limit": 500}).json()["items"]}
+    assert saved["batch test: per-item role"] == ("Data Analyst", "Machine Learning")
+    assert saved["batch test: batch role"] == ("Software Engineer", "Backend")
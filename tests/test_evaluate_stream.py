@@ -0,0 +1,54 @@
+from benchmarks.fake_llm import CANNED_EVAL
+from tests.conftest import sse_events
+
+
+def stream(client, answer):
+    payload = {"question": "What is a hash map?", "answer": answer, "mode": "Technical"}
+    with client.stream("POST", "/evaluate/stream", json=payload) as resp:
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/event-stream")
+        return sse_events(resp.read().decode())
+
+
+def session_count(client):
+    return len(client.get("/sessions", params={"limit": 500}).json()["items"])
+
+
+def test_fields_then_done(client, fake_llm):
+    fake_llm.first_token_ms = 5
+    fake_llm.token_delay_ms = 1
+    before = session_count(client)
+
+    events = stream(client, "stream test: a hash map gives O(1) average lookups")
+    kinds = [kind for kind, _ in events]
+    assert kinds == ["field"] * len(CANNED_EVAL) + ["done"]
+    assert [data["name"] for _, data in events[:-1]] == list(CANNED_EVAL)
+    assert {data["name"]: data["value"] for _, data in events[:-1]} == CANNED_EVAL
+
+    done = events[-1][1]
+    assert done["eval"]["score"] == CANNED_EVAL["score"]
+    assert not done["eval"].get("fallback")
+    assert done["time_to_first_field_ms"] <= done["total_ms"]
+    assert session_count(client) == before + 1
+
+
+def test_unavailable_llm_ends_with_fallback(client, fake_llm):
+    fake_llm.rate_limit_rate = 1.0
+    before = session_count(client)
+
+    events = stream(client, "stream test: the upstream is rate limiting")
+    assert [kind for kind, _ in events] == ["done"]
+    result = events[0][1]["eval"]
+    assert result["fallback"] is True
+    assert result["score"] is None
+    assert fake_llm.rate_limited == 2  # the first attempt and one retry
+    assert session_count(client) == before  # fallbacks are not stored
+
+
+def test_upstream_errors_are_retried(client, fake_llm):
+    fake_llm.error_rate = 1.0
+
+    events = stream(client, "stream test: the upstream is failing")
+    assert [kind for kind, _ in events] == ["done"]
+    assert events[0][1]["eval"]["fallback"] is True
+    assert fake_llm.errors == 2
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+from sqlalchemy import delete
+
+from backend import main
+from backend.models import AsyncSessionLocal, Interview
+from tests.conftest import sse_events
+
+QUESTIONS = [{"question": "What is a hash map?"}, {"question": "Describe a time you disagreed."}]
+
+
+def create_interview(client):
+    resp = client.post("/interviews", json={"role": "Software Engineer", "domain": "General",
+                                            "mode": "Technical", "questions": QUESTIONS})
+    assert resp.status_code == 201
+    return resp.json()["id"]
+
+
+@pytest.fixture
+def deleted_before_recording(monkeypatch):
+    """The interview is deleted after the answer is evaluated but before it is recorded."""
+    record_answer = main.record_answer
+
+    async def delete_then_record(db, interview_id, *args, **kwargs):
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(Interview).where(Interview.id == interview_id))
+            await session.commit()
+        return await record_answer(db, interview_id, *args, **kwargs)
+
+    monkeypatch.setattr(main, "record_answer", delete_then_record)
+
+
+def test_answer_updates_summary(client):
+    interview_id = create_interview(client)
+    resp = client.patch(f"/interviews/{interview_id}/answers/0", json={"answer": "Buckets and a hash function."})
+    assert resp.status_code == 200
+    assert resp.json()["summary"]["answered"] == 1
+
+
+def test_unknown_interview_or_index_is_404(client):
+    interview_id = create_interview(client)
+    assert client.patch("/interviews/missing/answers/0", json={"answer": "a"}).status_code == 404
+    assert client.patch(f"/interviews/{interview_id}/answers/5", json={"answer": "a"}).status_code == 404
+
+
+@pytest.mark.parametrize("payload", [{"answer": "An answer."}, {"skip": True}])
+def test_deleted_while_evaluating_is_404(client, deleted_before_recording, payload):
+    interview_id = create_interview(client)
+    resp = client.patch(f"/interviews/{interview_id}/answers/0", json=payload)
+    assert resp.status_code == 404
+    assert resp.json()["detail"] == main.INTERVIEW_GONE
+
+
+def test_deleted_while_streaming_ends_with_error_event(client, deleted_before_recording):
+    interview_id = create_interview(client)
+    with client.stream("PATCH", f"/interviews/{interview_id}/answers/0", params={"stream": "true"},
+                       json={"answer": "An answer."}) as resp:
+        events = sse_events(resp.read().decode())
+    assert events[-1][0] == "error"
+    assert events[-1][1]["status"] == 404
+    assert "done" not in [kind for kind, _ in events]
+
+
+def test_concurrent_answers_from_different_workers_are_both_kept(monkeypatch):
+    """Two workers record answers to the same interview at once; neither overwrites the other."""
+    from contextlib import nullcontext
+
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    from backend import interviews
+    from backend.models import async_engine, init_db
+
+    init_db()
+    monkeypatch.setattr(interviews, "interview_lock", lambda interview_id: nullcontext())  # separate processes
+    evaluation = {"score": 7.0, "feedback": "Good.", "strengths": ["clarity"], "weaknesses": []}
+
+    async def run():
+        engine = create_async_engine(async_engine.url)
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        try:
+            async with sessions() as db:
+                interview = await interviews.create_interview(db, "Software Engineer", "General", "Technical",
+                                                              QUESTIONS)
+
+            async def answer(index):
+                async with sessions() as db:
+                    return await interviews.record_answer(db, interview.id, index, f"Answer {index}", evaluation)
+
+            await asyncio.gather(answer(0), answer(1))
+            async with sessions() as db:
+                return await interviews.get_interview(db, interview.id)
+        finally:
+            await engine.dispose()
+
+    interview = asyncio.run(run())
+    assert [entry["answer"] for entry in interview.answers] == ["Answer 0", "Answer 1"]
+    assert interview.summary["answered"] == 2
+    assert interview.summary["score_sum"] == 14.0
+    assert interview.summary["strengths"] == {"clarity": 2}
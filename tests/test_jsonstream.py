@@ -0,0 +1,84 @@
+import json
+
+from backend.jsonstream import IncrementalObjectParser, extract_object
+
+EVALUATION = {
+    "score": 7.5,
+    "strengths": ["Clear, \"structured\" answer", "Mentions {braces} and [brackets]"],
+    "weaknesses": [],
+    "feedback": "Path C:\\temp\\new; unicode \u00e9\u4e2d; a tab\there, a quote \" and a backslash \\",
+    "nested": {"levels": [[1, 2], [3, [4, {"deep": "}],"}]]], "empty": {}},
+    "resources": ["https://example.com/a,b"],
+}
+TEXT = json.dumps(EVALUATION, ensure_ascii=False)
+
+
+def feed_all(chunks):
+    parser = IncrementalObjectParser()
+    members = []
+    for chunk in chunks:
+        members.extend(parser.feed(chunk))
+    return parser, members
+
+
+def test_single_chunk():
+    parser, members = feed_all([TEXT])
+    assert parser.done
+    assert members == list(EVALUATION.items())
+
+
+def test_every_two_chunk_split():
+    # boundaries inside strings, right after a backslash, inside nested arrays/objects
+    for i in range(1, len(TEXT)):
+        parser, members = feed_all([TEXT[:i], TEXT[i:]])
+        assert parser.done, i
+        assert dict(members) == EVALUATION, i
+
+
+def test_one_character_chunks():
+    parser, members = feed_all(list(TEXT))
+    assert parser.done
+    assert members == list(EVALUATION.items())
+
+
+def test_members_are_returned_as_soon_as_complete():
+    parser = IncrementalObjectParser()
+    assert parser.feed('{"score": 8, "strengths": ["a", ') == [("score", 8)]
+    assert parser.feed('"b"]') == []
+    assert parser.feed(', "feedback": "x, y"') == [("strengths", ["a", "b"])]
+    assert parser.feed("}") == [("feedback", "x, y")]
+    assert parser.done
+
+
+def test_escaped_quote_split_from_its_backslash():
+    parser = IncrementalObjectParser()
+    assert parser.feed('{"feedback": "say \\') == []
+    assert parser.feed('"hi\\"", "score": 1}') == [("feedback", 'say "hi"'), ("score", 1)]
+
+
+def test_escaped_backslash_before_closing_quote():
+    parser = IncrementalObjectParser()
+    assert parser.feed('{"path": "C:\\\\') == []
+    assert parser.feed('", "score": 2}') == [("path", "C:\\"), ("score", 2)]
+
+
+def test_fence_and_trailing_text_are_ignored():
+    parser, members = feed_all(["```json\n", TEXT[:10], TEXT[10:] + "\n```", " and more {"])
+    assert parser.done
+    assert dict(members) == EVALUATION
+
+
+def test_incomplete_object_is_not_done():
+    parser, members = feed_all([TEXT[:-1]])
+    assert not parser.done
+    assert [name for name, _ in members] == list(EVALUATION)[:-1]
+
+
+def test_empty_object():
+    parser, members = feed_all(["{", " }"])
+    assert parser.done
+    assert members == []
+
+
+def test_extract_object_skips_prose():
+    assert extract_object('Sure! {not json} Here: {"score": 3} Thanks.') == {"score": 3}
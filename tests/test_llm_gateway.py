@@ -0,0 +1,129 @@
+import asyncio
+import time
+
+import pytest
+from openai import AsyncOpenAI
+
+from backend import llm
+from backend.llm_gateway import LLMGateway, LLMUnavailable
+from backend.shared_state import MemoryState
+
+MESSAGES = [{"role": "user", "content": "Evaluate this answer."}]
+
+
+def make_gateway(fake_llm, **options):
+    options = {"rpm": 0, "tpm": 0, "backoff_base_ms": 1, "backoff_max_ms": 5, "deadline_s": 10,
+               "state": MemoryState(), **options}
+    return LLMGateway(AsyncOpenAI(api_key="sk-fake", base_url=fake_llm.base_url), **options)
+
+
+def complete(gateway, **params):
+    return gateway.complete(model="fake", messages=MESSAGES, **params)
+
+
+def test_retries_rate_limited_calls(fake_llm):
+    fake_llm.rate_limit_rate = 0.5
+    gateway = make_gateway(fake_llm, max_retries=30)
+
+    async def run():
+        return [await complete(gateway) for _ in range(10)]
+
+    responses = asyncio.run(run())
+    assert len(responses) == 10
+    assert fake_llm.rate_limited > 0
+    assert gateway.rate_limited == fake_llm.rate_limited
+    assert gateway.retries == fake_llm.rate_limited
+    assert gateway.succeeded == fake_llm.calls == 10
+
+
+def test_gives_up_after_max_retries(fake_llm):
+    fake_llm.rate_limit_rate = 1.0
+    gateway = make_gateway(fake_llm, max_retries=2)
+
+    with pytest.raises(LLMUnavailable):
+        asyncio.run(complete(gateway))
+    assert fake_llm.rate_limited == 3
+    assert gateway.retries == 2
+    assert gateway.failed == 1
+
+
+def test_honours_retry_after(fake_llm):
+    fake_llm.rate_limit_rate = 1.0
+    fake_llm.retry_after_s = 0.3
+    gateway = make_gateway(fake_llm, max_retries=1)
+
+    started = time.monotonic()
+    with pytest.raises(LLMUnavailable):
+        asyncio.run(complete(gateway))
+    # backoff alone is at most 5 ms; the retry waited for Retry-After
+    assert time.monotonic() - started >= 0.3
+    assert fake_llm.rate_limited == 2
+
+
+def test_retry_after_pauses_other_callers(fake_llm):
+    fake_llm.rate_limit_rate = 1.0
+    fake_llm.retry_after_s = 0.3
+    gateway = make_gateway(fake_llm, max_retries=0)
+
+    async def run():
+        with pytest.raises(LLMUnavailable):
+            await complete(gateway)
+        fake_llm.rate_limit_rate = 0.0
+        started = time.monotonic()
+        await complete(gateway)
+        return time.monotonic() - started
+
+    assert asyncio.run(run()) >= 0.25
+
+
+def test_raises_unavailable_at_deadline(fake_llm):
+    fake_llm.latency_ms = 2000
+    gateway = make_gateway(fake_llm, max_retries=5)
+
+    started = time.monotonic()
+    with pytest.raises(LLMUnavailable):
+        asyncio.run(complete(gateway, deadline_s=0.3))
+    assert time.monotonic() - started < 1.5
+
+
+def test_coalesces_identical_keys(fake_llm):
+    fake_llm.latency_ms = 100
+    gateway = make_gateway(fake_llm)
+
+    async def run():
+        return await asyncio.gather(*(complete(gateway, key="same") for _ in range(5)))
+
+    responses = asyncio.run(run())
+    assert fake_llm.calls == 1
+    assert gateway.coalesced == 4
+    assert len({response.id for response in responses}) == 1
+
+
+def test_distinct_keys_are_not_coalesced(fake_llm):
+    fake_llm.latency_ms = 50
+    gateway = make_gateway(fake_llm)
+
+    async def run():
+        return await asyncio.gather(*(complete(gateway, key=f"key-{i}") for i in range(3)))
+
+    asyncio.run(run())
+    assert fake_llm.calls == 3
+    assert gateway.coalesced == 0
+
+
+def test_evaluation_falls_back_when_llm_unavailable(fake_llm, monkeypatch):
+    fake_llm.rate_limit_rate = 1.0
+    monkeypatch.setattr(llm, "gateway", make_gateway(fake_llm, max_retries=1))
+
+    async def run():
+        unavailable = await llm.evaluate_answer("Explain a hash map.", "fallback-test answer", "Technical")
+        # the fallback is not cached: once the LLM is back, the same answer is scored
+        fake_llm.rate_limit_rate = 0.0
+        return unavailable, await llm.evaluate_answer("Explain a hash map.", "fallback-test answer", "Technical")
+
+    unavailable, result = asyncio.run(run())
+    assert unavailable["fallback"] is True
+    assert unavailable["score"] is None
+    assert llm.is_fallback(unavailable)
+    assert not llm.is_fallback(result)
+    assert result["score"] == 7.0
@@ -0,0 +1,37 @@
+import io
+import json
+import random
+
+import pytest
+
+from backend import offline_scorer
+from backend.offline_scorer import evaluate_batch, mock_evaluate_answer, score_jsonl
+from benchmarks.offline_scorer import synthetic_answers
+
+ANSWERS = synthetic_answers(5000, random.Random(11)) + [
+    "", "   ", "Edge Case and EDGE CASE", "time-space trade-off: O(n) time, O(1) space, tests.",
+    "Complexity complexity " * 40, "STAR impact", "scalable\ttests\nedge case",
+]
+
+
+def test_batch_matches_per_call():
+    reference = [mock_evaluate_answer("", answer, "Technical") for answer in ANSWERS]
+    assert evaluate_batch(ANSWERS) == reference
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_jsonl_matches_per_call(workers, monkeypatch):
+    monkeypatch.setattr(offline_scorer, "usable_cores", lambda: workers)  # exercise the pool on any host
+    src = io.StringIO("".join(json.dumps({"id": i, "answer": answer}) + "\n" for i, answer in enumerate(ANSWERS)))
+    dst = io.StringIO()
+
+    assert score_jsonl(src, dst, batch_size=700, workers=workers) == len(ANSWERS)
+    lines = [json.loads(line) for line in dst.getvalue().splitlines()]
+    assert lines == [{"id": i, **mock_evaluate_answer("", answer, "Technical")} for i, answer in enumerate(ANSWERS)]
+
+
+def test_workers_are_capped_at_usable_cores(monkeypatch):
+    monkeypatch.setattr(offline_scorer, "usable_cores", lambda: 1)
+    monkeypatch.setattr(offline_scorer, "Pool", lambda workers: pytest.fail("started a pool on one core"))
+    dst = io.StringIO()
+    assert score_jsonl(io.StringIO('{"answer": "a"}\n'), dst, workers=8) == 1
@@ -0,0 +1,69 @@
+"""parse_evaluation over the completion shapes in the benchmark corpus, plus extract_object and validation edge cases."""
+import json
+
+import pytest
+
+from backend.jsonstream import extract_object, strip_trailing_commas
+from backend.schemas import EvaluationParseError, parse_evaluation, validate_evaluation
+from benchmarks.parse_evaluation import CORPUS
+
+COMPLETIONS = {row["kind"]: row["content"] for row in map(json.loads, CORPUS.read_text(encoding="utf-8").splitlines())}
+UNUSABLE = {"truncated", "no_json"}
+SCORES = {"score_int": 8.0, "score_out_of_ten": 7.0}
+
+
+@pytest.mark.parametrize("kind", sorted(set(COMPLETIONS) - UNUSABLE))
+def test_corpus_shapes_parse(kind):
+    result = parse_evaluation(COMPLETIONS[kind])
+    assert result.score == SCORES.get(kind, 7.5)
+    assert result.strengths == ["Explains the B-tree lookup path clearly", "Mentions write amplification"]
+    assert all(isinstance(getattr(result, name), list) for name in ("weaknesses", "resources"))
+    assert isinstance(result.feedback, str) and isinstance(result.suggested_improvement, str)
+    assert not result.fallback
+
+
+@pytest.mark.parametrize("kind", sorted(UNUSABLE))
+def test_unusable_completions_raise(kind):
+    with pytest.raises(EvaluationParseError):
+        parse_evaluation(COMPLETIONS[kind])
+
+
+def test_near_miss_fields_are_coerced():
+    assert parse_evaluation(COMPLETIONS["string_list"]).resources == ["https://use-the-index-luke.com/"]
+    result = parse_evaluation(COMPLETIONS["null_fields"])
+    assert result.weaknesses == []
+    assert result.suggested_improvement == ""
+    assert parse_evaluation(COMPLETIONS["score_string"]).score == 7.5
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('```json\n{"a": 1}\n```', {"a": 1}),
+    ('Here you go: {"a": {"b": [1, 2]}} Hope that helps!', {"a": {"b": [1, 2]}}),
+    ('Draft {not json}\n{"a": "{braces}"}', {"a": "{braces}"}),
+    ('{"a": [1, 2,], "b": 3,}', {"a": [1, 2], "b": 3}),
+    ('{"a": "keep, } and ,] inside strings",}', {"a": "keep, } and ,] inside strings"}),
+])
+def test_extract_object(text, expected):
+    assert extract_object(text) == expected
+
+
+@pytest.mark.parametrize("text", ["", "no object here", '{"a": 1', '{"a": [1, 2'])
+def test_extract_object_without_an_object(text):
+    with pytest.raises(ValueError):
+        extract_object(text)
+
+
+def test_strip_trailing_commas_leaves_valid_json_alone():
+    text = '{"a": [1, 2], "b": "x,]", "c": {}}'
+    assert strip_trailing_commas(text) == text
+
+
+def test_schema_validation():
+    assert parse_evaluation('{"score": 12, "feedback": "Great"}').score == 10.0  # clamped into 0-10
+    assert parse_evaluation('{"score": 6, "unknown": true}').model_dump()["score"] == 6.0  # extra keys ignored
+    with pytest.raises(EvaluationParseError):
+        parse_evaluation('{"feedback": "no score"}')
+    with pytest.raises(EvaluationParseError):
+        parse_evaluation('{"score": "n/a"}')
+    with pytest.raises(EvaluationParseError):
+        validate_evaluation(["not", "an", "object"])
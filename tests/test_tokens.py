@@ -0,0 +1,73 @@
+import asyncio
+import json
+import logging
+import threading
+
+import pytest
+
+from backend import llm, tokens
+
+
+def test_missing_encoding_is_approximated_without_downloading(tmp_path, monkeypatch, caplog):
+    monkeypatch.setattr(tokens, "TOKENIZER_DIR", tmp_path)
+    monkeypatch.setattr(tokens, "MANIFEST", tmp_path / "encodings.json")
+    monkeypatch.setattr(tokens, "TOKENIZER_DOWNLOAD", False)
+    monkeypatch.setattr(tokens, "_load", lambda name: pytest.fail(f"tried to load {name}"))
+    tokens.get_encoding.cache_clear()
+    try:
+        with caplog.at_level(logging.WARNING, logger="backend.tokens"):
+            assert tokens.count_tokens("a hash map, O(1)") == 8
+            assert tokens.count_tokens("again") == 1
+        assert len([r for r in caplog.records if "approximate token counts" in r.message]) == 1
+    finally:
+        tokens.get_encoding.cache_clear()
+
+
+def test_vendored_encoding_is_loaded(tmp_path, monkeypatch):
+    (tmp_path / "0123abcd").write_bytes(b"ranks")
+    (tmp_path / "encodings.json").write_text(json.dumps({"o200k_base": "0123abcd"}))
+    monkeypatch.setattr(tokens, "TOKENIZER_DIR", tmp_path)
+    monkeypatch.setattr(tokens, "MANIFEST", tmp_path / "encodings.json")
+    monkeypatch.setattr(tokens, "TOKENIZER_ENCODING", "o200k_base")
+    loaded = []
+    monkeypatch.setattr(tokens, "_load", lambda name: loaded.append(name) or "encoding")
+    tokens.get_encoding.cache_clear()
+    try:
+        assert tokens.get_encoding() == "encoding"
+        assert loaded == ["o200k_base"]
+    finally:
+        tokens.get_encoding.cache_clear()
+
+
+def test_fetch_records_the_downloaded_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(tokens, "TOKENIZER_DIR", tmp_path)
+    monkeypatch.setattr(tokens, "MANIFEST", tmp_path / "encodings.json")
+    monkeypatch.setattr(tokens, "_load", lambda name: (tmp_path / f"hash-of-{name}").write_bytes(b"ranks"))
+
+    tokens.fetch(["o200k_base"])
+    assert json.loads((tmp_path / "encodings.json").read_text()) == {"o200k_base": "hash-of-o200k_base"}
+    assert tokens.is_vendored("o200k_base")
+
+
+async def fake_summary(text):
+    return "A summary.", 10
+
+
+def test_long_answers_are_prepared_off_the_event_loop(monkeypatch):
+    threads = []
+    compact = llm._compact
+
+    def recording_compact(answer):
+        threads.append(threading.current_thread())
+        return compact(answer)
+
+    monkeypatch.setattr(llm, "_compact", recording_compact)
+    monkeypatch.setattr(llm, "summarize_answer", fake_summary)
+
+    async def run():
+        await llm.prepare_answer("A short answer.")
+        await llm.prepare_answer("word " * llm.EVAL_MAX_ANSWER_TOKENS)
+
+    asyncio.run(run())
+    assert threads[0] is threading.main_thread()
+    assert threads[1] is not threading.main_thread()
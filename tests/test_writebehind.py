@@ -0,0 +1,165 @@
+import asyncio
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from backend.models import InterviewSession, async_engine, init_db
+from backend.writebehind import WriteBehindBuffer
+
+
+class FakeSession:
+    """Stands in for an AsyncSession; commits fail while `db.failures` is positive."""
+
+    def __init__(self, db):
+        self.db = db
+        self.rows = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def add_all(self, rows):
+        self.rows.extend(rows)
+
+    async def commit(self):
+        self.db.commits += 1
+        if self.db.failures > 0:
+            self.db.failures -= 1
+            raise RuntimeError("database is down")
+        self.db.written.extend(self.rows)
+
+
+class FakeDB:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.commits = 0
+        self.written = []
+
+    def __call__(self):
+        return FakeSession(self)
+
+
+def make_buffer(db, **kwargs):
+    return WriteBehindBuffer(session_factory=db, interval_ms=10_000, **kwargs)
+
+
+def test_failed_rows_are_retried_on_the_next_flush():
+    db = FakeDB(failures=1)
+    buffer = make_buffer(db, max_attempts=3)
+
+    async def run():
+        await buffer.add(["a", "b"])
+        assert await buffer.flush() == 0
+        assert await buffer.flush() == 2
+
+    asyncio.run(run())
+    assert db.written == ["a", "b"]
+    assert buffer.stats()["failed_flushes"] == 1
+    assert buffer.stats()["dropped_rows"] == 0
+
+
+def test_rows_are_dropped_after_max_attempts():
+    db = FakeDB(failures=10)
+    buffer = make_buffer(db, max_attempts=3)
+
+    async def run():
+        await buffer.add(["a"])
+        for _ in range(3):
+            await buffer.flush()
+        await buffer.add(["b"])
+        await buffer.flush()
+
+    asyncio.run(run())
+    stats = buffer.stats()
+    assert db.commits == 4
+    assert stats["dropped_rows"] == 1
+    assert stats["pending"] == 1  # "b" has attempts left
+
+
+def test_full_buffer_commits_in_the_caller():
+    db = FakeDB()
+    buffer = make_buffer(db, max_rows=100, max_pending=3)
+
+    async def run():
+        await buffer.add(["a", "b"])
+        await buffer.add(["c", "d"])  # would make 4 pending: written directly
+        assert db.written == ["c", "d"]
+        await buffer.add(["e"])
+        assert buffer.stats()["pending"] == 3
+        await buffer.flush()
+
+    asyncio.run(run())
+    assert db.written == ["c", "d", "a", "b", "e"]
+    assert buffer.stats()["direct_writes"] == 1
+    assert buffer.stats()["rows_written"] == 5
+
+
+def test_direct_write_failure_reaches_the_caller():
+    db = FakeDB(failures=1)
+    buffer = make_buffer(db, max_pending=0)
+
+    async def run():
+        try:
+            await buffer.add(["a"])
+        except RuntimeError:
+            return True
+        return False
+
+    assert asyncio.run(run())
+    assert buffer.stats()["pending"] == 0
+
+
+class FailFirstCommit:
+    """AsyncSession factory whose first commit fails after the flush ran (ids assigned, flush hooks run)."""
+
+    def __init__(self, sessions):
+        self.sessions = sessions
+        self.failed = False
+
+    def __call__(self):
+        return _Session(self)
+
+
+class _Session:
+    def __init__(self, factory):
+        self.factory = factory
+        self.db = factory.sessions()
+
+    async def __aenter__(self):
+        await self.db.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc):
+        return await self.db.__aexit__(*exc)
+
+    def add_all(self, rows):
+        self.db.add_all(rows)
+
+    async def commit(self):
+        if not self.factory.failed:
+            self.factory.failed = True
+            await self.db.flush()
+            raise RuntimeError("connection lost")
+        await self.db.commit()
+
+
+def test_rows_from_a_failed_commit_are_inserted_on_retry():
+    init_db()
+    role = "Write-behind test: retry"
+
+    async def run():
+        engine = create_async_engine(async_engine.url)
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        try:
+            buffer = WriteBehindBuffer(session_factory=FailFirstCommit(sessions), interval_ms=10_000)
+            await buffer.add([InterviewSession(role=role, score=float(i)) for i in range(2)])
+            assert await buffer.flush() == 0  # flushed (ids assigned), then the commit failed
+            assert await buffer.flush() == 2
+            async with sessions() as db:
+                return await db.scalar(select(func.count()).where(InterviewSession.role == role))
+        finally:
+            await engine.dispose()
+
+    assert asyncio.run(run()) == 2